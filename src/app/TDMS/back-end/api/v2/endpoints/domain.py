@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from config.settings import settings
-from database.fastapi_deps import _get_db
+from database.fastapi_deps import _get_async_db, _get_db
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from jose import JWTError, jwt
 from schemas.domain import (
@@ -15,6 +15,7 @@ from sqlalchemy.exc import IntegrityError
 from utils.activity_logger import log_activity
 
 from lib.orm.DB import DB
+from lib.orm.async_db import AsyncDB
 from lib.orm.tables import Domains
 
 domain_router = APIRouter(prefix="/api/v2/domains")
@@ -46,9 +47,9 @@ def _get_username_from_token(authorization: Optional[str]) -> Optional[str]:
     response_model=List[DomainListResponse],
     summary="List all domains (v2)",
 )
-def list_domains(db: DB = Depends(_get_db)):
+async def list_domains(db: AsyncDB = Depends(_get_async_db)):
     try:
-        domains = db.domains or []
+        domains = await db.domains() or []
         return [
             DomainListResponse(
                 domain_id=d.code,  # assuming 'code' is the ID attribute; adjust if domain_id
@@ -152,8 +153,8 @@ def create_domain(
     response_model=DomainDetailResponse,
     summary="Get a domain by ID (v2)",
 )
-def get_domain(domain_id: int, db: DB = Depends(_get_db)):
-    domain_name = db.get_domain_name(domain_id)
+async def get_domain(domain_id: int, db: AsyncDB = Depends(_get_async_db)):
+    domain_name = await db.get_domain_name(domain_id)
     if domain_name is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Domain not found"
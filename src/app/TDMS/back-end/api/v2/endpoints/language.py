@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from config.settings import settings
-from database.fastapi_deps import _get_db
+from database.fastapi_deps import _get_async_db, _get_db
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from jose import JWTError, jwt
 from schemas.language import (
@@ -16,6 +16,7 @@ from sqlalchemy.exc import IntegrityError
 from utils.activity_logger import log_activity
 
 from lib.orm.DB import DB
+from lib.orm.async_db import AsyncDB
 from lib.orm.tables import Languages
 
 language_router = APIRouter(prefix="/api/v2/languages")
@@ -47,9 +48,9 @@ def _get_username_from_token(authorization: Optional[str] = Header(None)) -> Opt
     response_model=List[LanguageListResponse],
     summary="List all languages (v2)",
 )
-def list_languages(db: DB = Depends(_get_db)):
+async def list_languages(db: AsyncDB = Depends(_get_async_db)):
     try:
-        languages = db.languages or []
+        languages = await db.languages() or []
         return [
             LanguageListResponse(
                 lang_id=lang.code,
@@ -70,9 +71,9 @@ def list_languages(db: DB = Depends(_get_db)):
     response_model=List[LanguageListResponse],
     summary="List all languages (v2)",
 )
-def list_languages(db: DB = Depends(_get_db)):
+async def list_languages(db: AsyncDB = Depends(_get_async_db)):
     try:
-        languages = db.languages or []
+        languages = await db.languages() or []
         return [
             LanguageListResponse(
                 lang_id=lang.code,
@@ -100,8 +101,8 @@ def list_languages(db: DB = Depends(_get_db)):
     response_model=LanguageDetailResponse,
     summary="Get a language by ID (v2)",
 )
-def get_language(lang_id: int, db: DB = Depends(_get_db)):
-    lang_name = db.get_language_name(lang_id)
+async def get_language(lang_id: int, db: AsyncDB = Depends(_get_async_db)):
+    lang_name = await db.get_language_name(lang_id)
     if lang_name is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from config.settings import settings
-from database.fastapi_deps import _get_db
+from database.fastapi_deps import _get_async_db, _get_db
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from jose import JWTError, jwt
 from schemas.llmPrompt import (
@@ -15,6 +15,7 @@ from sqlalchemy.exc import IntegrityError
 from utils.activity_logger import log_activity
 
 from lib.orm.DB import DB
+from lib.orm.async_db import AsyncDB
 from lib.orm.tables import LLMJudgePrompts
 
 llm_prompt_router = APIRouter(prefix="/api/v2/llm-prompts")
@@ -46,13 +47,15 @@ def _get_username_from_token(authorization: Optional[str]) -> Optional[str]:
     response_model=List[LlmPromptListResponse],
     summary="List all LLM prompts (v2)",
 )
-def list_llm_prompts(db: DB = Depends(_get_db)):
-    llmjudgeprompt = db.llm_judge_prompts
+async def list_llm_prompts(db: AsyncDB = Depends(_get_async_db)):
+    llmjudgeprompt = await db.llm_judge_prompts()
+    # one query for the language names rather than one per prompt.
+    language_names = {lang.code: lang.name for lang in await db.languages()}
     return [
         LlmPromptListResponse(
             llmPromptId=llm.prompt_id,
             prompt=llm.prompt,
-            language=db.get_language_name(llm.lang_id)
+            language=language_names.get(llm.lang_id)
         )
         for llm in llmjudgeprompt
     ]
@@ -73,8 +76,8 @@ def list_llm_prompts(db: DB = Depends(_get_db)):
     response_model=LlmPromptDetailResponse,
     summary="Get an LLM prompt by ID (v2)",
 )
-def get_llm_prompt(llm_prompt_id: int, db: DB = Depends(_get_db)):
-    llm_prompt = db.get_llm_prompt_by_id(llm_prompt_id)
+async def get_llm_prompt(llm_prompt_id: int, db: AsyncDB = Depends(_get_async_db)):
+    llm_prompt = await db.get_llm_prompt_by_id(llm_prompt_id)
     if llm_prompt is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -83,7 +86,7 @@ def get_llm_prompt(llm_prompt_id: int, db: DB = Depends(_get_db)):
     # Assuming language name can be fetched via relation or method, else None
     #language_name = getattr(llm_prompt.language, "lang_name", None) if hasattr(llm_prompt, "language") else None
 
-    language_name = db.get_language_name(llm_prompt.lang_id)
+    language_name = await db.get_language_name(llm_prompt.lang_id)
 
     return LlmPromptDetailResponse(
         llmPromptId=llm_prompt.prompt_id,
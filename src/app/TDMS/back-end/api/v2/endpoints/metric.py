@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from config.settings import settings
-from database.fastapi_deps import _get_db
+from database.fastapi_deps import _get_async_db, _get_db
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from jose import JWTError, jwt
 from schemas.metric import (
@@ -10,10 +10,12 @@ from schemas.metric import (
     MetricListResponse,
     MetricUpdateV2,
 )
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from utils.activity_logger import log_activity
 
 from lib.orm.DB import DB
+from lib.orm.async_db import AsyncDB
 from lib.orm.tables import Metrics, Domains, TestRunDetails
 from sqlalchemy.orm import joinedload
 
@@ -46,13 +48,11 @@ def _get_username_from_token(authorization: Optional[str]) -> Optional[str]:
     response_model=List[MetricListResponse],
     summary="List all metrics (v2)",
 )
-def list_metrics(db: DB = Depends(_get_db)):
-    with db.Session() as session:
+async def list_metrics(db: AsyncDB = Depends(_get_async_db)):
+    async with db.Session() as session:
         metrics = (
-            session.query(Metrics)
-            .options(joinedload(Metrics.domain))
-            .all()
-        )
+            await session.execute(select(Metrics).options(joinedload(Metrics.domain)))
+        ).scalars().all()
         
         if not metrics:
             return []
@@ -75,14 +75,15 @@ def list_metrics(db: DB = Depends(_get_db)):
     response_model=MetricDetailResponse,
     summary="Get a metric by ID (v2)",
 )
-def get_metric(metric_id: int, db: DB = Depends(_get_db)):
-    with db.Session() as session:
+async def get_metric(metric_id: int, db: AsyncDB = Depends(_get_async_db)):
+    async with db.Session() as session:
         metric = (
-            session.query(Metrics)
-            .options(joinedload(Metrics.domain))
-            .filter(Metrics.metric_id == metric_id)
-            .first()
-        )
+            await session.execute(
+                select(Metrics)
+                .options(joinedload(Metrics.domain))
+                .where(Metrics.metric_id == metric_id)
+            )
+        ).scalars().first()
         
         if metric is None:
             raise HTTPException(
@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from config.settings import settings
-from database.fastapi_deps import _get_db
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from database.fastapi_deps import _get_async_db, _get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi import Response as HTTPResponse
 from jose import JWTError, jwt
 from schemas.prompt import (
     PromptCreateV2,
@@ -12,11 +13,15 @@ from schemas.prompt import (
     UserPrompt,
     SystemPrompt
 )
+from sqlalchemy import or_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 from utils.activity_logger import log_activity
+from utils.pagination import MAX_PAGE_SIZE, count_rows, keyset_page, set_page_headers
 
 from lib.orm.DB import DB
+from lib.orm.async_db import AsyncDB
+from lib.orm.tables import Domains, Languages
 from lib.orm.tables import Prompts as PromptsTable
 
 prompt_router = APIRouter(prefix="/api/v2/prompts")
@@ -48,19 +53,44 @@ def _get_username_from_token(authorization: Optional[str]) -> Optional[str]:
     response_model=List[PromptDetailResponse],
     summary="List all prompts (v2)",
 )
-def list_prompts(db: DB = Depends(_get_db)):
+def list_prompts(
+    response: HTTPResponse,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size, every prompt when omitted."),
+    after_id: Optional[int] = Query(None, description="prompt_id of the last prompt of the previous page."),
+    domain: Optional[str] = Query(None, description="Only the prompts of this domain."),
+    language: Optional[str] = Query(None, description="Only the prompts of this language."),
+    q: Optional[str] = Query(None, description="Text searched in the user and system prompts."),
+    sort: Literal["prompt_id", "user_prompt"] = Query("prompt_id"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    db: DB = Depends(_get_db),
+):
     # Query ORM model directly with relationships loaded
     with db.Session() as session:
-        prompts = session.query(PromptsTable).options(
-            joinedload(PromptsTable.lang),
-            joinedload(PromptsTable.domain)
-        ).all()
-        
-        if not prompts:
+        query = session.query(PromptsTable)
+        if domain:
+            query = query.filter(PromptsTable.domain.has(Domains.domain_name == domain))
+        if language:
+            query = query.filter(PromptsTable.lang.has(Languages.lang_name == language))
+        if q:
+            pattern = f"%{q}%"
+            query = query.filter(or_(PromptsTable.user_prompt.ilike(pattern), PromptsTable.system_prompt.ilike(pattern)))
+
+        total = count_rows(query, PromptsTable.prompt_id)
+        if total == 0 and after_id is None and not any((domain, language, q)):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Prompts not found"
             )
-        
+
+        prompts, next_after_id = keyset_page(
+            query.options(joinedload(PromptsTable.lang), joinedload(PromptsTable.domain)),
+            PromptsTable.prompt_id,
+            sort_column=getattr(PromptsTable, sort),
+            descending=order == "desc",
+            limit=limit,
+            after_id=after_id,
+        )
+        set_page_headers(response, total, next_after_id)
+
         return [
             PromptDetailResponse(
                 prompt_id=prompt.prompt_id,
@@ -74,8 +104,8 @@ def list_prompts(db: DB = Depends(_get_db)):
 
 
 @prompt_router.get("/user-prompt", response_model=List[UserPrompt], summary="List all user prompts (v2)")
-def list_user_prompts(db: DB = Depends(_get_db)):
-    prompts = db.prompts
+async def list_user_prompts(db: AsyncDB = Depends(_get_async_db)):
+    prompts = await db.prompts()
     if prompts is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Prompts not found"
@@ -89,8 +119,8 @@ def list_user_prompts(db: DB = Depends(_get_db)):
     ]
 
 @prompt_router.get("/system-prompt", response_model=List[SystemPrompt], summary="List all system prompts (v2)")
-def list_system_prompts(db: DB = Depends(_get_db)):
-    prompts = db.prompts
+async def list_system_prompts(db: AsyncDB = Depends(_get_async_db)):
+    prompts = await db.prompts()
     if prompts is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Prompts not found"
@@ -124,21 +154,21 @@ def list_system_prompts(db: DB = Depends(_get_db)):
     response_model=PromptDetailResponse,
     summary="Get a prompt by ID (v2)",
 )
-def get_prompt(prompt_id: int, db: DB = Depends(_get_db)):
-    prompt = db.get_prompt(prompt_id)
+async def get_prompt(prompt_id: int, db: AsyncDB = Depends(_get_async_db)):
+    prompt = await db.get_prompt(prompt_id)
     if prompt is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found"
         )
 
-    language = db.get_language_name(prompt.lang_id)
+    language = await db.get_language_name(prompt.lang_id)
 
     if language is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Language not found"
         )
 
-    domain = db.get_domain_name(prompt.domain_id)
+    domain = await db.get_domain_name(prompt.domain_id)
 
     if domain is None:
         raise HTTPException(
@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from config.settings import settings
-from database.fastapi_deps import _get_db
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from database.fastapi_deps import _get_async_db, _get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi import Response as HTTPResponse
 from jose import JWTError, jwt
 from schemas.response import (
     ResponseCreateV2,
@@ -13,8 +14,12 @@ from schemas.response import (
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 from utils.activity_logger import log_activity
+from utils.export import ExportFormat, stream_export
+from utils.pagination import MAX_PAGE_SIZE, count_rows, keyset_page, set_page_headers
 
 from lib.orm.DB import DB
+from lib.orm.async_db import AsyncDB
+from lib.orm.tables import Languages
 from lib.orm.tables import Responses as ResponsesTable
 from lib.data import Response, Prompt
 
@@ -42,18 +47,47 @@ def _get_username_from_token(authorization: Optional[str]) -> Optional[str]:
         return None
 
 
+def _filter_responses(query, language=None, response_type=None, q=None):
+    if language:
+        query = query.filter(ResponsesTable.lang.has(Languages.lang_name == language))
+    if response_type:
+        query = query.filter(ResponsesTable.response_type == response_type)
+    if q:
+        query = query.filter(ResponsesTable.response_text.ilike(f"%{q}%"))
+    return query
+
+
 @response_router.get(
     "",
     response_model=List[ResponseDetailResponse],
     summary="List all responses (v2)",
 )
-def list_responses(db: DB = Depends(_get_db)):
+def list_responses(
+    http_response: HTTPResponse,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size, every response when omitted."),
+    after_id: Optional[int] = Query(None, description="response_id of the last response of the previous page."),
+    language: Optional[str] = Query(None, description="Only the responses in this language."),
+    response_type: Optional[Literal["GT", "GTDesc", "NA"]] = Query(None, description="Only the responses of this type."),
+    q: Optional[str] = Query(None, description="Text searched in the responses."),
+    sort: Literal["response_id", "response_type"] = Query("response_id"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    db: DB = Depends(_get_db),
+):
     session = db.Session()
     try:
-        responses = session.query(ResponsesTable).options(
-            joinedload(ResponsesTable.prompt),
-            joinedload(ResponsesTable.lang)
-        ).all()
+        query = _filter_responses(session.query(ResponsesTable), language, response_type, q)
+
+        total = count_rows(query, ResponsesTable.response_id)
+        responses, next_after_id = keyset_page(
+            query.options(joinedload(ResponsesTable.prompt), joinedload(ResponsesTable.lang)),
+            ResponsesTable.response_id,
+            sort_column=getattr(ResponsesTable, sort),
+            descending=order == "desc",
+            limit=limit,
+            after_id=after_id,
+        )
+        set_page_headers(http_response, total, next_after_id)
+
         return [
             ResponseDetailResponse(
                 response_id=r.response_id,
@@ -78,26 +112,61 @@ def list_responses(db: DB = Depends(_get_db)):
 #     return db.list_responses_with_metadata() or []
 
 
+RESPONSE_EXPORT_COLUMNS = ["response_id", "response_text", "response_type", "user_prompt", "system_prompt", "language"]
+
+
+@response_router.get(
+    "/export",
+    summary="Export the responses as NDJSON or CSV (v2)",
+)
+def export_responses(
+    format: ExportFormat = Query("ndjson", description="ndjson or csv."),
+    gzip: bool = Query(False, description="Compress the export."),
+    language: Optional[str] = Query(None, description="Only the responses in this language."),
+    response_type: Optional[Literal["GT", "GTDesc", "NA"]] = Query(None, description="Only the responses of this type."),
+    q: Optional[str] = Query(None, description="Text searched in the responses."),
+    db: DB = Depends(_get_db),
+):
+    def build_query(session):
+        return (
+            _filter_responses(session.query(ResponsesTable), language, response_type, q)
+            .options(joinedload(ResponsesTable.prompt), joinedload(ResponsesTable.lang))
+            .order_by(ResponsesTable.response_id)
+        )
+
+    def to_row(r):
+        return {
+            "response_id": r.response_id,
+            "response_text": r.response_text,
+            "response_type": r.response_type,
+            "user_prompt": getattr(r.prompt, "user_prompt", None),
+            "system_prompt": getattr(r.prompt, "system_prompt", None),
+            "language": getattr(r.lang, "lang_name", None),
+        }
+
+    return stream_export(db, build_query, to_row, RESPONSE_EXPORT_COLUMNS, "responses", fmt=format, gzip=gzip)
+
+
 @response_router.get(
     "/{response_id}",
     response_model=ResponseDetailResponse,
     summary="Get a response by ID (v2)",
 )
-def get_response(response_id: int, db: DB = Depends(_get_db)):
-    response = db.get_response(response_id)
+async def get_response(response_id: int, db: AsyncDB = Depends(_get_async_db)):
+    response = await db.get_response(response_id)
     if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Response not found"
         )
 
-    language_name = db.get_language_name(response.lang_id)
+    language_name = await db.get_language_name(response.lang_id)
     
     if language_name is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Language not found"
         )
 
-    prompt = db.get_prompt(response.prompt_id)
+    prompt = await db.get_prompt(response.prompt_id)
     
     if prompt is None:
         raise HTTPException(
@@ -0,0 +1,85 @@
+from typing import Optional
+
+from database.fastapi_deps import _get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from utils.export import ExportFormat, stream_export
+
+from lib.orm.DB import DB
+from lib.orm.tables import (
+    Conversations,
+    Metrics,
+    Prompts,
+    Targets,
+    TestCases,
+    TestPlans,
+    TestRunDetails,
+    TestRuns,
+)
+
+run_router = APIRouter(prefix="/api/v2/runs")
+
+RUN_EXPORT_COLUMNS = [
+    "run_id", "run_name", "target_name", "detail_id", "plan_name", "metric_name", "testcase_id",
+    "testcase_name", "testcase_status", "user_prompt", "agent_response", "prompt_ts", "first_token_ts", "response_ts",
+    "prompt_tokens", "completion_tokens", "evaluation_score", "evaluation_reason", "evaluation_ts",
+]
+
+
+@run_router.get(
+    "/{run_id:int}/export",
+    summary="Export the results of a run as NDJSON or CSV (v2)",
+)
+def export_run_results(
+    run_id: int,
+    format: ExportFormat = Query("ndjson", description="ndjson or csv."),
+    gzip: bool = Query(False, description="Compress the export."),
+    testcase_status: Optional[str] = Query(None, description="Only the test cases in this status."),
+    db: DB = Depends(_get_db),
+):
+    with db.Session() as session:
+        run_name = session.query(TestRuns.run_name).filter(TestRuns.run_id == run_id).scalar()
+    if run_name is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+
+    def build_query(session):
+        # plain columns rather than entities, the rows are not tracked by the session while they stream.
+        query = (
+            session.query(
+                TestRuns.run_id,
+                TestRuns.run_name,
+                Targets.target_name,
+                TestRunDetails.detail_id,
+                TestPlans.plan_name,
+                Metrics.metric_name,
+                TestCases.testcase_id,
+                TestCases.testcase_name,
+                TestRunDetails.testcase_status,
+                Prompts.user_prompt,
+                Conversations.agent_response,
+                Conversations.prompt_ts,
+                Conversations.first_token_ts,
+                Conversations.response_ts,
+                Conversations.prompt_tokens,
+                Conversations.completion_tokens,
+                Conversations.evaluation_score,
+                Conversations.evaluation_reason,
+                Conversations.evaluation_ts,
+            )
+            .select_from(TestRunDetails)
+            .join(TestRuns, TestRunDetails.run_id == TestRuns.run_id)
+            .join(Targets, TestRuns.target_id == Targets.target_id)
+            .join(TestPlans, TestRunDetails.plan_id == TestPlans.plan_id)
+            .join(Metrics, TestRunDetails.metric_id == Metrics.metric_id)
+            .join(TestCases, TestRunDetails.testcase_id == TestCases.testcase_id)
+            .join(Prompts, TestCases.prompt_id == Prompts.prompt_id)
+            .outerjoin(Conversations, Conversations.detail_id == TestRunDetails.detail_id)
+            .filter(TestRunDetails.run_id == run_id)
+        )
+        if testcase_status:
+            query = query.filter(TestRunDetails.testcase_status == testcase_status)
+        return query.order_by(TestRunDetails.detail_id)
+
+    def to_row(result):
+        return dict(result._mapping)
+
+    return stream_export(db, build_query, to_row, RUN_EXPORT_COLUMNS, f"run_{run_id}", fmt=format, gzip=gzip)
@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from config.settings import settings
-from database.fastapi_deps import _get_db
+from database.fastapi_deps import _get_async_db, _get_db
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from jose import JWTError, jwt
 from schemas.strategy import (
@@ -11,10 +11,10 @@ from schemas.strategy import (
     StrategyUpdateV2,
 )
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
 from utils.activity_logger import log_activity
 
 from lib.orm.DB import DB
+from lib.orm.async_db import AsyncDB
 from lib.orm.tables import TestCases, Strategies as StrategiesTable
 from lib.data import Strategy
 
@@ -41,32 +41,21 @@ def _get_username_from_token(authorization: Optional[str]) -> Optional[str]:
     except JWTError:
         return None
 
-def _get_strategy_ids_requiring_llm_prompt(session: Session) -> set[int]:
-    return {
-        strategy_id
-        for (strategy_id,) in (
-            session.query(TestCases.strategy_id)
-            .filter(TestCases.judge_prompt_id.isnot(None))
-            .distinct()
-        )
-        if strategy_id is not None
-    }
-
 
 @strategy_router.get(
     "",
     response_model=List[StrategyListResponse],
     summary="List all strategies (v2)",
 )
-def list_strategies(db: DB = Depends(_get_db)):
-    strategies = db.strategies
+async def list_strategies(db: AsyncDB = Depends(_get_async_db)):
+    strategies = await db.strategies()
 
     if strategies is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Strategies not found"
         )
 
-    strategy_ids_with_llm_prompt = _get_strategy_ids_requiring_llm_prompt(db.Session())
+    strategy_ids_with_llm_prompt = await db.strategy_ids_requiring_llm_prompt()
 
     return [
         StrategyListResponse(
@@ -93,15 +82,15 @@ def list_strategies(db: DB = Depends(_get_db)):
     response_model=StrategyDetailResponse,
     summary="Get a strategy by ID (v2)",
 )
-def get_strategy(strategy_id: int, db: DB = Depends(_get_db)):
-    strategy = db.get_strategy_id(strategy_id)
+async def get_strategy(strategy_id: int, db: AsyncDB = Depends(_get_async_db)):
+    strategy = await db.get_strategy_id(strategy_id)
 
     if strategy is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Strategy not found"
         )
 
-    strategy_ids_with_llm_prompt = _get_strategy_ids_requiring_llm_prompt(db.Session())    
+    strategy_ids_with_llm_prompt = await db.strategy_ids_requiring_llm_prompt()
 
     return StrategyDetailResponse(
         strategy_id=strategy.strategy_id,
@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from config.settings import settings
-from database.fastapi_deps import _get_db
+from database.fastapi_deps import _get_async_db, _get_db
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from jose import JWTError, jwt
 from schemas.target import (
@@ -14,6 +14,7 @@ from sqlalchemy.exc import IntegrityError
 from utils.activity_logger import log_activity
 
 from lib.orm.DB import DB
+from lib.orm.async_db import AsyncDB
 from lib.orm.tables import Targets
 from sqlalchemy.orm import joinedload
 from enum import Enum
@@ -56,9 +57,9 @@ def _get_username_from_token(authorization: Optional[str]) -> Optional[str]:
     response_model=List[TargetDetailResponse],
     summary="List all targets (v2)",
 )
-def list_targets(db: DB = Depends(_get_db)):
+async def list_targets(db: AsyncDB = Depends(_get_async_db)):
     
-    targets = db.targets
+    targets = await db.targets()
 
     return [
         TargetDetailResponse(
@@ -89,8 +90,8 @@ def list_targets(db: DB = Depends(_get_db)):
     response_model=TargetDetailResponse,
     summary="Get a target by ID (v2)",
 )
-def get_target(target_id: int, db: DB = Depends(_get_db)):
-    target = db.get_target_by_id(target_id)
+async def get_target(target_id: int, db: AsyncDB = Depends(_get_async_db)):
+    target = await db.get_target_by_id(target_id)
     if target is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Target not found"
@@ -1,10 +1,10 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 import json
 import time
 from config.settings import settings
-from database.fastapi_deps import _get_db
-from fastapi import APIRouter, Depends, Header, HTTPException, status
-from fastapi.responses import StreamingResponse
+from database.fastapi_deps import _get_async_db, _get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi import Response as HTTPResponse
 from jose import JWTError, jwt
 from schemas import (
     TestCaseCreateV2,
@@ -12,8 +12,11 @@ from schemas import (
     TestCaseListResponse,
     TestCaseUpdateV2,
 )
-from sqlalchemy.orm import joinedload
+from sqlalchemy import or_, select
+from sqlalchemy.orm import joinedload, selectinload
 from utils.activity_logger import log_activity
+from utils.export import ExportFormat, stream_export
+from utils.pagination import MAX_PAGE_SIZE, count_rows, keyset_page, set_page_headers
 
 from lib.data.llm_judge_prompt import LLMJudgePrompt
 from lib.data.prompt import Prompt
@@ -21,7 +24,8 @@ from lib.data.response import Response as ResponseData
 from lib.data.response import Response
 from lib.data.test_case import TestCase as TestCaseModel
 from lib.orm.DB import DB
-from lib.orm.tables import Prompts, TestCases, Metrics
+from lib.orm.async_db import AsyncDB
+from lib.orm.tables import Domains, Languages, Metrics, Prompts, Strategies, TestCases
 
 testcase_router = APIRouter(prefix="/api/v2/testcases")
 
@@ -52,25 +56,68 @@ def _get_username_from_token(authorization: Optional[str]) -> Optional[str]:
     except JWTError:
         return None
 
+def _filter_testcases(query, domain=None, language=None, strategy=None, metric=None, q=None):
+    if domain:
+        query = query.filter(TestCases.prompt.has(Prompts.domain.has(Domains.domain_name == domain)))
+    if language:
+        query = query.filter(TestCases.prompt.has(Prompts.lang.has(Languages.lang_name == language)))
+    if strategy:
+        query = query.filter(TestCases.strategy.has(Strategies.strategy_name == strategy))
+    if metric:
+        query = query.filter(TestCases.metrics.any(Metrics.metric_name == metric))
+    if q:
+        pattern = f"%{q}%"
+        query = query.filter(or_(
+            TestCases.testcase_name.ilike(pattern),
+            TestCases.prompt.has(or_(Prompts.user_prompt.ilike(pattern), Prompts.system_prompt.ilike(pattern))),
+        ))
+    return query
+
+
 @testcase_router.get(
     "",
     response_model=List[TestCaseListResponse],
     summary="List all test cases (v2)",
 )
-def list_testcases(db: DB = Depends(_get_db)):
+def list_testcases(
+    response: HTTPResponse,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size, every test case when omitted."),
+    after_id: Optional[int] = Query(None, description="testcase_id of the last test case of the previous page."),
+    domain: Optional[str] = Query(None, description="Only the test cases of this domain."),
+    language: Optional[str] = Query(None, description="Only the test cases of this language."),
+    strategy: Optional[str] = Query(None, description="Only the test cases of this strategy."),
+    metric: Optional[str] = Query(None, description="Only the test cases mapped to this metric."),
+    q: Optional[str] = Query(None, description="Text searched in the name and the prompts of the test cases."),
+    sort: Literal["testcase_id", "testcase_name"] = Query("testcase_id"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    db: DB = Depends(_get_db),
+):
     with db.Session() as session:
-        testcases = (
-            session.query(TestCases)
-            .options(joinedload(TestCases.judge_prompt))
-            .options(joinedload(TestCases.prompt))
-            .options(joinedload(TestCases.response))
-            .options(joinedload(TestCases.strategy))
-            .options(joinedload(TestCases.metrics))
-            .all()
-        )
-        if not testcases:
+        query = _filter_testcases(session.query(TestCases), domain, language, strategy, metric, q)
+
+        total = count_rows(query, TestCases.testcase_id)
+        if total == 0 and after_id is None and not any((domain, language, strategy, metric, q)):
             raise HTTPException(status_code=404, detail="No test cases found")
-        
+
+        # the many to one relations are joined in the page query, the metrics come in one extra IN query.
+        query = query.options(
+            joinedload(TestCases.judge_prompt),
+            joinedload(TestCases.prompt).joinedload(Prompts.domain),
+            joinedload(TestCases.prompt).joinedload(Prompts.lang),
+            joinedload(TestCases.response),
+            joinedload(TestCases.strategy),
+            selectinload(TestCases.metrics),
+        )
+        testcases, next_after_id = keyset_page(
+            query,
+            TestCases.testcase_id,
+            sort_column=getattr(TestCases, sort),
+            descending=order == "desc",
+            limit=limit,
+            after_id=after_id,
+        )
+        set_page_headers(response, total, next_after_id)
+
         results = []
         
         for testcase in testcases:
@@ -128,6 +175,60 @@ def list_testcases(db: DB = Depends(_get_db)):
     # return results
 
 
+
+TESTCASE_EXPORT_COLUMNS = [
+    "testcase_id", "testcase_name", "user_prompt", "system_prompt", "response_text", "strategy_name",
+    "llm_judge_prompt", "domain_name", "lang_name", "metric_names",
+]
+
+
+@testcase_router.get(
+    "/export",
+    summary="Export the test cases as NDJSON or CSV (v2)",
+)
+def export_testcases(
+    format: ExportFormat = Query("ndjson", description="ndjson or csv."),
+    gzip: bool = Query(False, description="Compress the export."),
+    domain: Optional[str] = Query(None, description="Only the test cases of this domain."),
+    language: Optional[str] = Query(None, description="Only the test cases of this language."),
+    strategy: Optional[str] = Query(None, description="Only the test cases of this strategy."),
+    metric: Optional[str] = Query(None, description="Only the test cases mapped to this metric."),
+    q: Optional[str] = Query(None, description="Text searched in the name and the prompts of the test cases."),
+    db: DB = Depends(_get_db),
+):
+    def build_query(session):
+        # joinedload is only used on the many to one relations, yield_per can not batch a joined collection.
+        return (
+            _filter_testcases(session.query(TestCases), domain, language, strategy, metric, q)
+            .options(
+                joinedload(TestCases.judge_prompt),
+                joinedload(TestCases.prompt).joinedload(Prompts.domain),
+                joinedload(TestCases.prompt).joinedload(Prompts.lang),
+                joinedload(TestCases.response),
+                joinedload(TestCases.strategy),
+                selectinload(TestCases.metrics),
+            )
+            .order_by(TestCases.testcase_id)
+        )
+
+    def to_row(testcase):
+        return {
+            "testcase_id": testcase.testcase_id,
+            "testcase_name": testcase.testcase_name,
+            "user_prompt": testcase.prompt.user_prompt,
+            "system_prompt": testcase.prompt.system_prompt,
+            "response_text": getattr(testcase.response, "response_text", None),
+            "strategy_name": getattr(testcase.strategy, "strategy_name", None),
+            "llm_judge_prompt": getattr(testcase.judge_prompt, "prompt", None),
+            "domain_name": getattr(testcase.prompt.domain, "domain_name", None),
+            "lang_name": getattr(testcase.prompt.lang, "lang_name", None),
+            "metric_names": [m.metric_name for m in testcase.metrics] if format == "ndjson"
+                            else ", ".join(m.metric_name for m in testcase.metrics),
+        }
+
+    return stream_export(db, build_query, to_row, TESTCASE_EXPORT_COLUMNS, "testcases", fmt=format, gzip=gzip)
+
+
 # @testcase_router.get(
 #     "",
 #     response_model=List[TestCaseListResponse],
@@ -143,20 +244,23 @@ def list_testcases(db: DB = Depends(_get_db)):
     response_model=TestCaseListResponse,
     summary="Get a test case by ID (v2)",
 )
-def get_testcase(testcase_id: int, db: DB = Depends(_get_db)):
-    with db.Session() as session:
+async def get_testcase(testcase_id: int, db: AsyncDB = Depends(_get_async_db)):
+    async with db.Session() as session:
+        # the async session can not lazy load, the domain and language of the prompt are loaded here too.
         testcase = (
-            session.query(TestCases)
-            .options(
-                joinedload(TestCases.prompt),
-                joinedload(TestCases.response),
-                joinedload(TestCases.strategy),
-                joinedload(TestCases.judge_prompt),
-                joinedload(TestCases.metrics),
+            await session.execute(
+                select(TestCases)
+                .options(
+                    joinedload(TestCases.prompt).joinedload(Prompts.domain),
+                    joinedload(TestCases.prompt).joinedload(Prompts.lang),
+                    joinedload(TestCases.response),
+                    joinedload(TestCases.strategy),
+                    joinedload(TestCases.judge_prompt),
+                    selectinload(TestCases.metrics),
+                )
+                .where(TestCases.testcase_id == testcase_id)
             )
-            .filter(TestCases.testcase_id == testcase_id)
-            .first()
-        )
+        ).scalars().first()
         
         if testcase is None:
             raise HTTPException(
@@ -2,6 +2,8 @@ import os
 from typing import Iterator
 from fastapi import Depends, HTTPException
 from lib.orm.DB import DB
+from lib.orm.async_db import AsyncDB
+from lib.orm.engine import engine_options
 
 
 # from config.settings.settings import AIEVAL_DB_URL 
@@ -58,9 +60,29 @@ def _get_db() -> DB:
     db_url = _DEFAULT_DB_URL
     if not db_url:
         raise HTTPException(status_code=500, detail="Database URL not configured (_DEFAULT_DB_URL)")
-    _db_instance = DB(db_url=db_url, debug=False)
+    _db_instance = DB(db_url=db_url, debug=False, **engine_options(db_cfg))
     return _db_instance
 
+_async_db_instance: AsyncDB | None = None
+
+def _get_async_db() -> AsyncDB:
+    """
+    The asyncio access to the same database, for the async handlers. The schema is created and migrated by
+    the DB instance, which is built first.
+    """
+    global _async_db_instance
+    if _async_db_instance is not None:
+        return _async_db_instance
+    _get_db()
+    _async_db_instance = AsyncDB(db_url=_DEFAULT_DB_URL, debug=False, **engine_options(db_cfg))
+    return _async_db_instance
+
+async def _dispose_async_db():
+    global _async_db_instance
+    if _async_db_instance is not None:
+        await _async_db_instance.dispose()
+        _async_db_instance = None
+
 def get_session(db: DB = Depends(_get_db)) -> Iterator[object]:
     session = db.Session()
     try:
@@ -49,7 +49,11 @@ from api.v2.endpoints import (
     metric,
     testplan as testplan_v2,
 )
+from api.v2.endpoints import (
+    run as run_v2,
+)
 from database.database import init_db, seed_users
+from database.fastapi_deps import _dispose_async_db
 
 # from config.logger import get_logger
 from fastapi import FastAPI
@@ -69,6 +73,7 @@ async def lifespan(app: FastAPI):
     seed_users()
     yield
     logging.info("Shutting down application...")
+    await _dispose_async_db()
 
 
 app = FastAPI(
@@ -88,6 +93,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-After-Id"],
 )
 # app.add_middleware(AuthMiddleware)
 
@@ -113,6 +119,7 @@ app.include_router(response_v2.response_router, tags=["Response_v2"])
 app.include_router(strategy_v2.strategy_router, tags=["Strategy_v2"])
 app.include_router(metric.metric_router, tags=["Metric"])
 app.include_router(testplan_v2.testplan_router, tags=["TestPlan_v2"])
+app.include_router(run_v2.run_router, tags=["Run_v2"])
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,102 @@
+"""Streaming export of query results as NDJSON or CSV."""
+import csv
+import io
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query
+
+from lib.orm.DB import DB
+
+ExportFormat = Literal["ndjson", "csv"]
+
+DEFAULT_BATCH_SIZE = 1000
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _encode_rows(rows: Iterator[Dict[str, Any]], columns: List[str], fmt: ExportFormat, batch_size: int) -> Iterator[bytes]:
+    """Encode the rows, yielding one chunk per batch so the buffer stays bounded."""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+    pending = 0
+    for row in rows:
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row, default=str, ensure_ascii=False))
+            buffer.write("\n")
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(
+    db: DB,
+    build_query: Callable[[Any], Query],
+    to_row: Callable[[Any], Dict[str, Any]],
+    columns: List[str],
+    filename: str,
+    fmt: ExportFormat = "ndjson",
+    gzip: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> StreamingResponse:
+    """
+    Build a streaming response that exports the rows of a query.
+
+    The session is opened when the client starts reading and the rows are fetched
+    batch_size at a time through yield_per, so the memory used does not depend on
+    the size of the table.
+
+    Args:
+        db: The database
+        build_query: Builds the query from the session of the export
+        to_row: Converts a result of the query into a dict keyed by the columns
+        columns: The exported columns, in order (the CSV header)
+        filename: The name of the downloaded file, without extension
+        fmt: "ndjson" or "csv"
+        gzip: Compress the export as a .gz file
+        batch_size: Number of rows fetched and encoded at a time
+
+    Returns:
+        The StreamingResponse of the export
+    """
+
+    def generate() -> Iterator[bytes]:
+        with db.Session() as session:
+            results = build_query(session).yield_per(batch_size)
+            chunks = _encode_rows((to_row(result) for result in results), columns, fmt, batch_size)
+            if gzip:
+                chunks = _gzip_chunks(chunks)
+            yield from chunks
+
+    filename = f"{filename}.{fmt}"
+    media_type = _MEDIA_TYPES[fmt]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    # a sync generator, starlette iterates it in the thread pool so the event loop is not blocked.
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,84 @@
+"""Keyset pagination helpers for the list endpoints."""
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query
+
+MAX_PAGE_SIZE = 1000
+
+
+def count_rows(query: Query, id_column) -> int:
+    """
+    Count the rows matched by the filtered query.
+
+    The count runs on the primary key only, without the eager loads and the
+    ordering of the page query, so it stays a single cheap aggregate.
+    """
+    return query.order_by(None).with_entities(func.count(id_column)).scalar() or 0
+
+
+def keyset_page(
+    query: Query,
+    id_column,
+    sort_column=None,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    after_id: Optional[int] = None,
+) -> Tuple[List[Any], Optional[int]]:
+    """
+    Fetch one page of the query ordered by (sort_column, id_column).
+
+    Args:
+        query: The filtered query, with its eager loading options
+        id_column: The primary key column, used as the tie breaker and as the cursor
+        sort_column: The column to sort on (the primary key when None)
+        descending: Sort in descending order
+        limit: The page size, None returns every row after the cursor
+        after_id: The id of the last row of the previous page
+
+    Returns:
+        The rows of the page and the cursor of the next page (None on the last page)
+    """
+    sort_column = id_column if sort_column is None else sort_column
+
+    if after_id is not None:
+        if sort_column is id_column:
+            query = query.filter(id_column < after_id if descending else id_column > after_id)
+        else:
+            # the sort value of the cursor row, the rows are then compared on (sort value, id).
+            after_value = (
+                query.session.query(sort_column)
+                .select_from(id_column.class_)
+                .filter(id_column == after_id)
+                .scalar()
+            )
+            if after_value is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown cursor after_id={after_id}",
+                )
+            if descending:
+                query = query.filter(or_(sort_column < after_value, and_(sort_column == after_value, id_column < after_id)))
+            else:
+                query = query.filter(or_(sort_column > after_value, and_(sort_column == after_value, id_column > after_id)))
+
+    columns = [id_column] if sort_column is id_column else [sort_column, id_column]
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+
+    if limit is None:
+        return query.all(), None
+
+    # one extra row tells whether there is a next page without a second query.
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, getattr(rows[-1], id_column.key)
+
+
+def set_page_headers(response: Response, total: int, next_after_id: Optional[int]) -> None:
+    """Expose the total count and the next cursor, the body stays a plain list."""
+    response.headers["X-Total-Count"] = str(total)
+    if next_after_id is not None:
+        response.headers["X-Next-After-Id"] = str(next_after_id)
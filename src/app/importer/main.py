@@ -28,6 +28,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__) + '/../../'))  # Adjust t
 from lib.data import Prompt, TestCase, Response, TestPlan, Metric, LLMJudgePrompt, Target, Run, RunDetail, Conversation
 
 from lib.orm import DB  # Import the DB class from the orm module
+from lib.orm.engine import engine_options
 
 # adding arguments for including configuration
 parser = argparse.ArgumentParser(description="Data Importer")
@@ -93,7 +94,7 @@ plans = json.load(open(config['files']['plans'], 'r'))
 #testcases -> basically the data points
 prompts = json.load(open(config['files']['testcases'], 'r'))
 
-db = DB(db_url=db_url, debug=args.orm_debug)
+db = DB(db_url=db_url, debug=args.orm_debug, **engine_options(config["db"]))
 
 strategies = json.load(open(config["files"]["strategies"], "r"))
 
@@ -1,30 +1,119 @@
+import hashlib
+import json
+import os
+import threading
 import time
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Tuple
 
+import httpx
 from context import APIRuntimeContext
 from logger import get_logger
+from utils import load_config
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from google import genai
+from google.genai import types as genai_types
 
 logger = get_logger("interface_manager")
 
 
-def handle_api_chat(
-    ctx: APIRuntimeContext,
-    payload: Dict[str, Any],
-) -> Dict[str, Any]:
+# ------------------------------------------------------------------
+# Provider clients
+# ------------------------------------------------------------------
+# The clients are kept across the requests, with their connection pools (keep-alive
+# connections, TLS sessions), keyed by provider + base_url + credentials.
+# The defaults are overridden by the "api_client" block of config.json.
+DEFAULT_CLIENT_SETTINGS = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,    # seconds an idle connection is kept
+    "timeout": 120.0,            # seconds, for a whole completion
+    "connect_timeout": 10.0,
+    "max_retries": 2,
+}
+
+_clients: Dict[Tuple, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _client_settings() -> Dict[str, Any]:
+    settings = dict(DEFAULT_CLIENT_SETTINGS)
+    settings.update(load_config().get("api_client", {}))
+    return settings
+
+
+def _credentials(ctx: APIRuntimeContext) -> Tuple[str | None, str | None]:
     """
-    Executes one API chat request and returns a normalized response.
+    Returns the base_url and the API key of the context (api_key of extra, else the environment).
+    Only the LOCAL provider is served from ctx.base_url (the application URL of the target), OpenAI and Gemini
+    go to their provider endpoint unless extra holds an explicit base_url override.
+    """
+    if ctx.is_local():
+        if not ctx.base_url:
+            raise RuntimeError("LOCAL provider requires base_url")
+        return f"{ctx.base_url.rstrip('/')}/v1", ctx.extra.get("api_key", "local")   # required but unused
+    if ctx.is_gemini():
+        return ctx.extra.get("base_url"), ctx.extra.get("api_key") or os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    return ctx.extra.get("base_url"), ctx.extra.get("api_key") or os.getenv("OPENAI_API_KEY")
+
+
+def _create_client(kind: str, base_url: str | None, api_key: str | None, settings: Dict[str, Any]):
+    timeout = httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"])
+    limits = httpx.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive_connections"],
+        keepalive_expiry=settings["keepalive_expiry"],
+    )
+    if kind == "openai":
+        return OpenAI(base_url=base_url, api_key=api_key, max_retries=settings["max_retries"],
+                      http_client=httpx.Client(limits=limits, timeout=timeout))
+    if kind == "async_openai":
+        return AsyncOpenAI(base_url=base_url, api_key=api_key, max_retries=settings["max_retries"],
+                           http_client=httpx.AsyncClient(limits=limits, timeout=timeout))
+    # one Gemini client serves both paths, client.aio being its async API
+    http_options = genai_types.HttpOptions(timeout=int(settings["timeout"] * 1000), base_url=base_url)
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+
+def get_client(ctx: APIRuntimeContext, asynchronous: bool = False):
     """
+    Returns the cached client of the context provider, created on first use.
+    """
+    kind = "gemini" if ctx.is_gemini() else ("async_openai" if asynchronous else "openai")
+    base_url, api_key = _credentials(ctx)
+    # the key holds a digest of the API key, never the key itself
+    digest = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+    key = (kind, ctx.provider, base_url, digest)
 
-    # --------------------------------------------------
-    # Driver lifecycle start
-    # --------------------------------------------------
-    logger.info("Driver is ready for API")
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = _create_client(kind, base_url, api_key, _client_settings())
+            logger.info("API client created | provider=%s kind=%s base_url=%s", ctx.provider, kind, base_url)
+    return client
+
+
+async def close_clients() -> None:
+    """
+    Closes the connection pools of the cached clients (application shutdown).
+    """
+    with _clients_lock:
+        clients = list(_clients.items())
+        _clients.clear()
+    for (kind, *_), client in clients:
+        try:
+            if kind == "async_openai":
+                await client.close()
+            elif kind == "openai":
+                client.close()
+        except Exception as e:
+            logger.warning(f"Error while closing the {kind} client: {e}")
 
-    start_ts = time.time()
 
+# ------------------------------------------------------------------
+# Chat
+# ------------------------------------------------------------------
+def _prompt_of(ctx: APIRuntimeContext, payload: Dict[str, Any]) -> str:
     prompts: List[str] = payload.get("prompt_list", [])
     prompt = " ".join(prompts).strip()
 
@@ -39,6 +128,47 @@ def handle_api_chat(
         ctx.provider,
         ctx.agent_name,
     )
+    return prompt
+
+
+def _chat_result(ctx: APIRuntimeContext, text: str, start_ts: float) -> Dict[str, Any]:
+    elapsed = int(time.time() - start_ts)
+
+    logger.info(
+        "(Waited:%d) Received response from API (%s): %s",
+        elapsed,
+        ctx.agent_name,
+        text,
+    )
+
+    logger.info(
+        "API chat completed | chars=%d time=%ss",
+        len(text),
+        round(time.time() - start_ts, 3),
+    )
+
+    return {
+        "response": [
+            {"response": text}
+        ]
+    }
+
+
+def handle_api_chat(
+    ctx: APIRuntimeContext,
+    payload: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Executes one API chat request and returns a normalized response.
+    """
+
+    # --------------------------------------------------
+    # Driver lifecycle start
+    # --------------------------------------------------
+    logger.info("Driver is ready for API")
+
+    start_ts = time.time()
+    prompt = _prompt_of(ctx, payload)
 
     try:
         # --------------------------------------------------
@@ -56,26 +186,7 @@ def handle_api_chat(
         else:
             raise RuntimeError(f"Unsupported provider: {ctx.provider}")
 
-        elapsed = int(time.time() - start_ts)
-
-        logger.info(
-            "(Waited:%d) Received response from API (%s): %s",
-            elapsed,
-            ctx.agent_name,
-            text,
-        )
-
-        logger.info(
-            "API chat completed | chars=%d time=%ss",
-            len(text),
-            round(time.time() - start_ts, 3),
-        )
-
-        return {
-            "response": [
-                {"response": text}
-            ]
-        }
+        return _chat_result(ctx, text, start_ts)
 
     finally:
         # --------------------------------------------------
@@ -84,6 +195,37 @@ def handle_api_chat(
         logger.info("Driver quit successfully")
 
 
+async def handle_api_chat_async(
+    ctx: APIRuntimeContext,
+    payload: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Async variant of handle_api_chat, awaited on the event loop instead of holding a threadpool worker per call.
+    """
+    logger.info("Driver is ready for API")
+
+    start_ts = time.time()
+    prompt = _prompt_of(ctx, payload)
+
+    try:
+        if ctx.is_openai():
+            text = await _run_openai_async(ctx, prompt)
+
+        elif ctx.is_gemini():
+            text = await _run_gemini_async(ctx, prompt)
+
+        elif ctx.is_local():
+            text = await _run_local_async(ctx, prompt)
+
+        else:
+            raise RuntimeError(f"Unsupported provider: {ctx.provider}")
+
+        return _chat_result(ctx, text, start_ts)
+
+    finally:
+        logger.info("Driver quit successfully")
+
+
 # ------------------------------------------------------------------
 # Provider implementations
 # ------------------------------------------------------------------
@@ -91,7 +233,7 @@ def handle_api_chat(
 def _run_openai(ctx: APIRuntimeContext, prompt: str) -> str:
     logger.info("Calling OpenAI API | model=%s", ctx.agent_name)
 
-    client = OpenAI()
+    client = get_client(ctx)
 
     response = client.chat.completions.create(
         model=ctx.agent_name,
@@ -107,7 +249,7 @@ def _run_openai(ctx: APIRuntimeContext, prompt: str) -> str:
 def _run_gemini(ctx: APIRuntimeContext, prompt: str) -> str:
     logger.info("Calling Gemini API | model=%s", ctx.agent_name)
 
-    client = genai.Client()
+    client = get_client(ctx)
 
     response = client.models.generate_content(
         model=ctx.agent_name,
@@ -124,17 +266,198 @@ def _run_local(ctx: APIRuntimeContext, prompt: str) -> str:
         ctx.base_url,
     )
 
-    if not ctx.base_url:
-        raise RuntimeError("LOCAL provider requires base_url")
+    client = get_client(ctx)
 
-    client = OpenAI(
-        base_url=f"{ctx.base_url.rstrip('/')}/v1",
-        api_key="local",   # required but unused
+    response = client.chat.completions.create(
+        model=ctx.agent_name,
+        messages=[{"role": "user", "content": prompt}],
     )
 
-    response = client.chat.completions.create(
+    return response.choices[0].message.content.strip()
+
+
+async def _run_openai_async(ctx: APIRuntimeContext, prompt: str) -> str:
+    logger.info("Calling OpenAI API (async) | model=%s", ctx.agent_name)
+
+    client = get_client(ctx, asynchronous=True)
+
+    response = await client.chat.completions.create(
+        model=ctx.agent_name,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=ctx.temperature,
+        max_tokens=ctx.max_tokens,
+        top_p=ctx.top_p,
+    )
+
+    return response.choices[0].message.content.strip()
+
+
+async def _run_gemini_async(ctx: APIRuntimeContext, prompt: str) -> str:
+    logger.info("Calling Gemini API (async) | model=%s", ctx.agent_name)
+
+    client = get_client(ctx, asynchronous=True)
+
+    response = await client.aio.models.generate_content(
+        model=ctx.agent_name,
+        contents=prompt,
+    )
+
+    return response.text.strip()
+
+
+async def _run_local_async(ctx: APIRuntimeContext, prompt: str) -> str:
+    logger.info(
+        "Calling LOCAL OpenAI-compatible API (async) | model=%s base_url=%s",
+        ctx.agent_name,
+        ctx.base_url,
+    )
+
+    client = get_client(ctx, asynchronous=True)
+
+    response = await client.chat.completions.create(
         model=ctx.agent_name,
         messages=[{"role": "user", "content": prompt}],
     )
 
     return response.choices[0].message.content.strip()
+
+
+# ------------------------------------------------------------------
+# Streaming chat
+# ------------------------------------------------------------------
+def _event(**fields) -> str:
+    return json.dumps(fields) + "\n"
+
+
+async def stream_api_chat(
+    ctx: APIRuntimeContext,
+    payload: Dict[str, Any],
+) -> AsyncIterator[str]:
+    """
+    Executes one API chat request with a streaming call and yields NDJSON events:
+    {"event": "token", "text": ...} for each piece of the response as it arrives, then
+    {"event": "done", "response": ..., "first_token_ms": ..., "elapsed_ms": ..., "prompt_tokens": ..., "completion_tokens": ...}
+    or {"event": "error", "detail": ...}. The token counts are None when the provider does not report them.
+    """
+    start = time.perf_counter()
+    first_token_ms = None
+    parts: List[str] = []
+    usage = (None, None)
+
+    try:
+        prompt = _prompt_of(ctx, payload)
+
+        if ctx.is_openai():
+            stream = _stream_openai(ctx, prompt)
+
+        elif ctx.is_gemini():
+            stream = _stream_gemini(ctx, prompt)
+
+        elif ctx.is_local():
+            stream = _stream_local(ctx, prompt)
+
+        else:
+            raise RuntimeError(f"Unsupported provider: {ctx.provider}")
+
+        async for kind, value in stream:
+            if kind == "usage":
+                usage = value
+                continue
+            if not value:
+                continue
+            if first_token_ms is None:
+                first_token_ms = round((time.perf_counter() - start) * 1000, 1)
+                logger.info("First token from API (%s) after %sms", ctx.agent_name, first_token_ms)
+            parts.append(value)
+            yield _event(event="token", text=value)
+
+    except Exception as e:
+        logger.error("API chat stream failed | provider=%s model=%s: %s", ctx.provider, ctx.agent_name, e)
+        yield _event(event="error", detail=str(e))
+        return
+
+    text = "".join(parts).strip()
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    logger.info(
+        "API chat stream completed | chars=%d first_token=%sms time=%sms tokens=%s/%s",
+        len(text),
+        first_token_ms,
+        elapsed_ms,
+        usage[0],
+        usage[1],
+    )
+
+    yield _event(
+        event="done",
+        response=text,
+        first_token_ms=first_token_ms,
+        elapsed_ms=elapsed_ms,
+        prompt_tokens=usage[0],
+        completion_tokens=usage[1],
+    )
+
+
+async def _stream_openai_compatible(client, ctx: APIRuntimeContext, prompt: str, **options):
+    stream = await client.chat.completions.create(
+        model=ctx.agent_name,
+        messages=[{"role": "user", "content": prompt}],
+        stream=True,
+        stream_options={"include_usage": True},   # the usage comes in a last chunk without choices
+        **options,
+    )
+
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield "token", chunk.choices[0].delta.content
+        if chunk.usage:
+            yield "usage", (chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+
+
+async def _stream_openai(ctx: APIRuntimeContext, prompt: str):
+    logger.info("Streaming from OpenAI API | model=%s", ctx.agent_name)
+
+    client = get_client(ctx, asynchronous=True)
+
+    async for item in _stream_openai_compatible(
+        client,
+        ctx,
+        prompt,
+        temperature=ctx.temperature,
+        max_tokens=ctx.max_tokens,
+        top_p=ctx.top_p,
+    ):
+        yield item
+
+
+async def _stream_gemini(ctx: APIRuntimeContext, prompt: str):
+    logger.info("Streaming from Gemini API | model=%s", ctx.agent_name)
+
+    client = get_client(ctx, asynchronous=True)
+
+    usage = None
+    async for chunk in await client.aio.models.generate_content_stream(
+        model=ctx.agent_name,
+        contents=prompt,
+    ):
+        if chunk.text:
+            yield "token", chunk.text
+        if chunk.usage_metadata:
+            # cumulative, the last chunk holds the totals
+            usage = chunk.usage_metadata
+
+    if usage:
+        yield "usage", (usage.prompt_token_count, usage.candidates_token_count)
+
+
+async def _stream_local(ctx: APIRuntimeContext, prompt: str):
+    logger.info(
+        "Streaming from LOCAL OpenAI-compatible API | model=%s base_url=%s",
+        ctx.agent_name,
+        ctx.base_url,
+    )
+
+    client = get_client(ctx, asynchronous=True)
+
+    async for item in _stream_openai_compatible(client, ctx, prompt):
+        yield item
@@ -0,0 +1,161 @@
+"""Check of the WebApp browser pool against a local chat stand-in.
+
+A tiny FastAPI app serves a static chat page that streams back an echo of each
+prompt. Independent chats are sent through DriverPools of headless Chrome
+browsers, first with a single browser and then with the whole pool, and every
+response is checked to belong to its own chat.
+
+    python3 browser_pool_check.py --browsers 4 --chats 8 --prompts 3
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))  # interface_manager/
+if THIS_DIR not in sys.path:
+    sys.path.insert(0, THIS_DIR)
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+
+from logger import get_logger
+from utils import DriverPool, send_message_webapp
+
+logger = get_logger("browser_pool_check")
+
+APP_NAME = "chat-standin"  # the xpaths of the page are in xpaths.json
+
+CHAT_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Chat stand-in</title></head>
+<body>
+  <div id="messages">__HISTORY__</div>
+  <textarea id="prompt" rows="3" cols="80"></textarea>
+  <script>
+    const box = document.getElementById("prompt");
+    const messages = document.getElementById("messages");
+    box.addEventListener("keydown", (event) => {
+      if (event.key !== "Enter" || event.shiftKey) return;
+      event.preventDefault();
+      const text = box.value.trim();
+      box.value = "";
+      if (!text) return;
+      const sent = document.createElement("div");
+      sent.className = "message user";
+      sent.textContent = text;
+      messages.appendChild(sent);
+      // the answer is streamed word by word, as the LLM chat applications do.
+      setTimeout(() => {
+        const answer = document.createElement("div");
+        answer.className = "message agent";
+        messages.appendChild(answer);
+        const words = ("echo: " + text).split(" ");
+        let i = 0;
+        const timer = setInterval(() => {
+          answer.textContent = words.slice(0, ++i).join(" ");
+          if (i >= words.length) clearInterval(timer);
+        }, __WORD_DELAY__);
+      }, __FIRST_DELAY__);
+    });
+  </script>
+</body>
+</html>
+"""
+
+
+def create_app(first_delay_ms: int, word_delay_ms: int) -> FastAPI:
+    app = FastAPI(title="Chat stand-in")
+    page = CHAT_PAGE.replace("__FIRST_DELAY__", str(first_delay_ms)).replace("__WORD_DELAY__", str(word_delay_ms))
+
+    @app.get("/", response_class=HTMLResponse)
+    def chat_page(history: int = 0):
+        # a long chat already on the page, ?history=N turns
+        turns = "".join(f'<div class="message user">question {i}</div><div class="message agent">answer {i} {"lorem ipsum " * 20}</div>'
+                        for i in range(history))
+        return page.replace("__HISTORY__", turns)
+
+    return app
+
+
+def start_server(app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def run_chat(pool: DriverPool, url: str, chat_id: int, prompts: int) -> tuple[int, int]:
+    """Sends the prompts of one chat, returns the number of responses and of responses of another chat."""
+    received, mixed = 0, 0
+    with pool.lease(APP_NAME, url, key=chat_id, timeout=600) as driver:
+        driver.get(url)  # a new chat
+        for n in range(prompts):
+            prompt = f"chat {chat_id} prompt {n} {'lorem ipsum ' * 5}".strip()
+            response = send_message_webapp(driver, APP_NAME, prompt, response_timeout=30.0,
+                                           stability_window=0.5, poll_interval=0.1, check_connection=False)
+            if response == "No response received":
+                continue
+            received += 1
+            if response != f"echo: {prompt}":
+                logger.error(f"Chat {chat_id} got a foreign response: {response[:60]}")
+                mixed += 1
+    return received, mixed
+
+
+def run_round(pool: DriverPool, url: str, chats: int, prompts: int) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=chats) as executor:
+        results = list(executor.map(lambda chat_id: run_chat(pool, url, chat_id, prompts), range(1, chats + 1)))
+    return time.perf_counter() - start, sum(r for r, _ in results), sum(m for _, m in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the WebApp browser pool against a local chat stand-in.")
+    parser.add_argument("--browsers", "-b", dest="browsers", type=int, default=4, help="Size of the pool.")
+    parser.add_argument("--chats", "-c", dest="chats", type=int, default=8, help="Number of independent chats.")
+    parser.add_argument("--prompts", "-p", dest="prompts", type=int, default=3, help="Number of prompts per chat.")
+    parser.add_argument("--port", dest="port", type=int, default=8765, help="Port of the chat stand-in.")
+    parser.add_argument("--first-delay", dest="first_delay", type=int, default=500, help="ms before the first word of an answer.")
+    parser.add_argument("--word-delay", dest="word_delay", type=int, default=40, help="ms between the words of an answer.")
+    parser.add_argument("--kill", dest="kill", action="store_true", help="Kill a browser of the pool before the last round, to check its restart.")
+    args = parser.parse_args()
+
+    server = start_server(create_app(args.first_delay, args.word_delay), args.port)
+    url = f"http://127.0.0.1:{args.port}/"
+    profiles_dir = tempfile.mkdtemp(prefix="browser_pool_")
+    expected = args.chats * args.prompts
+    rows = []
+    try:
+        for size in sorted({1, args.browsers}):
+            # an absolute profile name is kept as is by DriverManager
+            pool = DriverPool(profile_name=os.path.join(profiles_dir, f"pool_{size}"), size=size, headless=True)
+            try:
+                rows.append((f"{size} browser(s)", *run_round(pool, url, args.chats, args.prompts)))
+                if args.kill and size == args.browsers and pool.managers[-1].driver:
+                    victim = pool.managers[-1]
+                    logger.info(f"Killing the browser of {victim.profile_folder_path}")
+                    victim.driver.quit()  # left in place, the next lease must detect it
+                    rows.append((f"{size} browser(s), one killed", *run_round(pool, url, args.chats, args.prompts)))
+            finally:
+                pool.quit()
+    finally:
+        server.should_exit = True
+        shutil.rmtree(profiles_dir, ignore_errors=True)
+
+    print(f"\n{args.chats} chats of {args.prompts} prompts ({expected} responses expected)")
+    print(f"{'Pool':<28}{'Time (s)':>10}{'Responses':>11}{'Foreign':>9}")
+    for name, elapsed, received, mixed in rows:
+        print(f"{name:<28}{elapsed:>10.1f}{received:>11}{mixed:>9}")
+    failed = any(received != expected or mixed for _, _, received, mixed in rows)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
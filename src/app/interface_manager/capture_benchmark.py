@@ -0,0 +1,81 @@
+"""Benchmark of the response capture modes of send_message_webapp on the local chat stand-in.
+
+The "poll" mode re-reads the text of every response element of the chat at each
+poll, the "observer" mode waits on a MutationObserver installed in the page.
+Both are timed per turn, on chats with a growing history already on the page,
+with the wall time and the CPU time of this process.
+
+    python3 capture_benchmark.py --history 0 200 1000 --turns 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))  # interface_manager/
+if THIS_DIR not in sys.path:
+    sys.path.insert(0, THIS_DIR)
+
+from logger import get_logger
+from utils import DriverManager, send_message_webapp
+from browser_pool_check import APP_NAME, create_app, start_server
+
+logger = get_logger("capture_benchmark")
+
+
+def run_turns(driver, url: str, mode: str, turns: int, stability_window: float, poll_interval: float):
+    driver.get(url)
+    latencies, cpu, errors = [], [], 0
+    for n in range(turns):
+        prompt = f"turn {n} {'lorem ipsum ' * 5}".strip()
+        start, start_cpu = time.perf_counter(), time.process_time()
+        response = send_message_webapp(driver, APP_NAME, prompt, response_timeout=30.0, stability_window=stability_window,
+                                       poll_interval=poll_interval, check_connection=False, capture_mode=mode)
+        latencies.append(time.perf_counter() - start)
+        cpu.append(time.process_time() - start_cpu)
+        if response != f"echo: {prompt}":
+            logger.error(f"[{mode}] unexpected response: {response[:60]}")
+            errors += 1
+    return latencies, cpu, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the poll and observer response capture modes.")
+    parser.add_argument("--history", dest="history", type=int, nargs="+", default=[0, 200, 1000], help="Turns already on the page.")
+    parser.add_argument("--turns", "-t", dest="turns", type=int, default=10, help="Number of prompts per chat.")
+    parser.add_argument("--stability", dest="stability", type=float, default=1.5, help="Stability window in seconds.")
+    parser.add_argument("--poll-interval", dest="poll_interval", type=float, default=0.5, help="Poll interval of the poll mode in seconds.")
+    parser.add_argument("--port", dest="port", type=int, default=8765, help="Port of the chat stand-in.")
+    parser.add_argument("--first-delay", dest="first_delay", type=int, default=500, help="ms before the first word of an answer.")
+    parser.add_argument("--word-delay", dest="word_delay", type=int, default=40, help="ms between the words of an answer.")
+    args = parser.parse_args()
+
+    server = start_server(create_app(args.first_delay, args.word_delay), args.port)
+    profiles_dir = tempfile.mkdtemp(prefix="capture_benchmark_")
+    # an absolute profile name is kept as is by DriverManager
+    manager = DriverManager(profile_name=os.path.join(profiles_dir, "profile"), headless=True)
+    rows = []
+    try:
+        driver = manager.get_driver(APP_NAME, f"http://127.0.0.1:{args.port}/")
+        for history in args.history:
+            url = f"http://127.0.0.1:{args.port}/?history={history}"
+            for mode in ("poll", "observer"):
+                latencies, cpu, errors = run_turns(driver, url, mode, args.turns, args.stability, args.poll_interval)
+                rows.append((history, mode, statistics.mean(latencies), max(latencies), statistics.mean(cpu) * 1000, errors))
+    finally:
+        manager.quit()
+        server.should_exit = True
+        shutil.rmtree(profiles_dir, ignore_errors=True)
+
+    print(f"\n{args.turns} turns per chat, answers after {args.first_delay} ms at {args.word_delay} ms per word, "
+          f"stability window {args.stability} s")
+    print(f"{'History':>8}  {'Mode':<10}{'Mean (s)':>10}{'Max (s)':>10}{'CPU/turn (ms)':>15}{'Errors':>8}")
+    for history, mode, mean, worst, cpu_ms, errors in rows:
+        print(f"{history:>8}  {mode:<10}{mean:>10.2f}{worst:>10.2f}{cpu_ms:>15.1f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
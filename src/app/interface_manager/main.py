@@ -24,12 +24,20 @@ if SRC_DIR not in sys.path:
     sys.path.insert(0, SRC_DIR)
 
 from routers import common, chat_router, api
+from api_handler import close_clients
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 # from database import init_db, seed_users
 from contextlib import asynccontextmanager
 
-app = FastAPI(title="LLM Evaluation Suite - Interface Manager")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # close the connection pools of the cached API clients
+    await close_clients()
+
+
+app = FastAPI(title="LLM Evaluation Suite - Interface Manager", lifespan=lifespan)
 
 
 
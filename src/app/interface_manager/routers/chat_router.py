@@ -3,15 +3,11 @@
 from fastapi import APIRouter
 import webapp
 import whatsapp
-import json
 import webapp
+from utils import load_config
 
 router = APIRouter()
 
-def load_config():
-    with open('config.json', 'r') as file:
-        return json.load(file)
-
 @router.post("/info")
 def chat_interface():
     config = load_config()
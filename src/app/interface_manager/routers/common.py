@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional, Dict, Any, List
 from whatsapp import (
     login_whatsapp,
@@ -14,14 +15,14 @@ from webapp import (
     send_prompt,
     close_webapp,
     get_ui_response_webapp,
+    driver_pool as webapp_driver_pool,
 )
 
 from logger import get_logger
-from utils import load_config
+from utils import load_config, config_cache
 from context import APIRuntimeContext
-from api_handler import handle_api_chat
+from api_handler import handle_api_chat_async, stream_api_chat
 from pydantic import BaseModel
-import json
 
 router = APIRouter()
 logger = get_logger("main")
@@ -112,22 +113,25 @@ async def chat(prompt: PromptCreate):
     app_type, app_name = get_app_info()
 
     # ------------------------------------------------
-    # WhatsApp Web (unchanged)
+    # WhatsApp Web
     # ------------------------------------------------
     if app_type == "WHATSAPP_WEB":
         logger.info("Chat request: WhatsApp Web")
-        result = send_prompt_whatsapp(
+        # the browsers are driven synchronously, off the event loop so that the chats of a pool run in parallel.
+        result = await run_in_threadpool(
+            send_prompt_whatsapp,
             chat_id=prompt.chat_id,
             prompt_list=prompt.prompt_list,
         )
         return JSONResponse(content={"response": result})
 
     # ------------------------------------------------
-    # WebApp (unchanged)
+    # WebApp (one browser of the pool per chat)
     # ------------------------------------------------
     if str.upper(app_type) == "WEBAPP":
         logger.info(f"Chat request: WebApp {app_name}")
-        result = send_prompt(
+        result = await run_in_threadpool(
+            send_prompt,
             app_name=app_name,
             chat_id=prompt.chat_id,
             prompt_list=prompt.prompt_list,
@@ -150,7 +154,8 @@ async def chat(prompt: PromptCreate):
         ctx = APIRuntimeContext.from_dict(prompt.api_context)
 
         # Execute API call (this is where logs happen)
-        result = handle_api_chat(
+        # awaited on the event loop with the cached async clients, the concurrent chats share their connection pools.
+        result = await handle_api_chat_async(
             ctx=ctx,
             payload={
                 "chat_id": prompt.chat_id,
@@ -166,6 +171,43 @@ async def chat(prompt: PromptCreate):
     return JSONResponse(content={"error": "Unsupported application type"})
 
 
+# -------------------------------
+# Streaming chat
+# -------------------------------
+@router.post("/chat/stream")
+async def chat_stream(prompt: PromptCreate):
+    """
+    Streams the agent response as NDJSON events (token ..., then done or error), so that the client
+    can time the first token and the completion. Only the API targets stream their responses.
+    """
+    app_type, _ = get_app_info()
+
+    if str.upper(app_type) != "API":
+        raise HTTPException(
+            status_code=400,
+            detail="Streaming is only available for the API application type, use /chat",
+        )
+
+    if not prompt.api_context:
+        raise HTTPException(
+            status_code=400,
+            detail="api_context is required for API application type",
+        )
+
+    ctx = APIRuntimeContext.from_dict(prompt.api_context)
+
+    return StreamingResponse(
+        stream_api_chat(
+            ctx=ctx,
+            payload={
+                "chat_id": prompt.chat_id,
+                "prompt_list": prompt.prompt_list,
+            },
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
 # -------------------------------
 # Close
 # -------------------------------
@@ -201,13 +243,21 @@ def chat_interface():
     return {"error": "Unsupported application type"}
 
 
+# -------------------------------
+# Browser pool
+# -------------------------------
+@router.get("/browser_pool")
+def browser_pool():
+    # the size the WebApp pool was started with, browser_pool_size is read once at startup.
+    return {"size": webapp_driver_pool.size, "in_use": webapp_driver_pool.in_use}
+
+
 # -------------------------------
 # Config
 # -------------------------------
 @router.get("/config")
 def get_config():
-    with open("config.json", "r") as file:
-        return json.load(file)
+    return load_config()
 
 
 @router.post("/config")
@@ -218,8 +268,8 @@ async def update_config(request: Request):
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
     try:
-        with open("config.json", "w") as file:
-            json.dump(new_config, file, indent=4)
+        # written atomically, the snapshot of the next request is loaded from the new file
+        config_cache.write(new_config)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to write config: {e}")
 
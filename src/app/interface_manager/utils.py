@@ -2,6 +2,7 @@ import os
 import time
 import json
 import socket
+import threading
 import psutil
 import requests
 from selenium import webdriver
@@ -19,6 +20,7 @@ from selenium.common.exceptions import (
 )
 from selenium.webdriver.common.action_chains import ActionChains
 from webdriver_manager.chrome import ChromeDriverManager
+from contextlib import contextmanager
 import traceback
 
 from logger import get_logger
@@ -36,8 +38,9 @@ class DriverManager:
     Ensures reuse if alive, otherwise restarts with clean profile.
     """
 
-    def __init__(self, profile_name: str = "test_profile"):
+    def __init__(self, profile_name: str = "test_profile", headless: bool = False):
         self.profile_folder_path = os.path.join(os.path.expanduser("~"), profile_name)
+        self.headless = headless
         self.driver: webdriver.Chrome | None = None
 
     def get_driver(self, app_name: str, url: str) -> webdriver.Chrome:
@@ -54,6 +57,9 @@ class DriverManager:
         opts = Options()
         opts.add_argument("--no-sandbox")
         opts.add_argument("--start-maximized")
+        if self.headless:
+            opts.add_argument("--headless=new")
+            opts.add_argument("--window-size=1920,1080")
         opts.add_argument(f"user-data-dir={self.profile_folder_path}")
         opts.add_experimental_option("excludeSwitches", ["enable-logging"])
 
@@ -78,19 +84,48 @@ class DriverManager:
         except Exception:
             return False
 
+    @staticmethod
+    def _user_data_dir(cmdline: list[str] | None) -> str | None:
+        """Returns the resolved --user-data-dir of a Chrome command line, None if it has none."""
+        args = list(cmdline or [])
+        for i, arg in enumerate(args):
+            name, sep, value = arg.lstrip("-").partition("=")
+            if name == "user-data-dir":
+                if not sep and i + 1 < len(args):
+                    value = args[i + 1]
+                return os.path.realpath(os.path.expanduser(value))
+        return None
+
     def close_chrome_with_profile(self) -> bool:
-        """Kill any Chrome process using this profile."""
+        """
+        Kill the Chrome processes of this manager's profile, the browsers of the other profiles are left alone.
+        The browser started by this manager is found through the process tree of its chromedriver, a browser left
+        over by an earlier run through the exact --user-data-dir of its command line.
+        """
         closed_any = False
-        for proc in psutil.process_iter(["name", "cmdline"]):
+        service = getattr(self.driver, "service", None)
+        pid = getattr(getattr(service, "process", None), "pid", None)
+        if pid is not None:
             try:
-                if "chrome" in (proc.info["name"] or "").lower():
-                    cmdline = " ".join(proc.info["cmdline"] or [])
-                    if f"user-data-dir={self.profile_folder_path}" in cmdline:
+                root = psutil.Process(pid)
+                for proc in root.children(recursive=True) + [root]:
+                    try:
                         proc.kill()
                         closed_any = True
-                        logger.info(f"Killed Chrome with profile {self.profile_folder_path}")
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+            except psutil.NoSuchProcess:
+                pass
+        profile = os.path.realpath(self.profile_folder_path)
+        for proc in psutil.process_iter(["name", "cmdline"]):
+            try:
+                if "chrome" in (proc.info["name"] or "").lower() and self._user_data_dir(proc.info["cmdline"]) == profile:
+                    proc.kill()
+                    closed_any = True
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
+        if closed_any:
+            logger.info(f"Killed Chrome with profile {self.profile_folder_path}")
         return closed_any
 
     def quit(self):
@@ -105,22 +140,168 @@ class DriverManager:
                 self.driver = None
 
 
+class DriverPool:
+    """
+    Pool of DriverManagers, each with its own Chrome profile, so that independent chats run in parallel.
+    A driver is leased for a chat and returned afterwards; a dead driver is restarted on its next lease.
+    """
+
+    def __init__(self, profile_name: str = "test_profile", size: int = 1, headless: bool = False):
+        # the first browser keeps the profile as named, so that an existing login is reused. The others are
+        # suffixed, their processes are told apart by the exact --user-data-dir (see close_chrome_with_profile).
+        self.managers = [DriverManager(profile_name if i == 0 else f"{profile_name}_{i}", headless=headless)
+                         for i in range(max(size, 1))]
+        self._idle: list[DriverManager] = list(self.managers)
+        self._owners: dict = {}  # chat key -> manager that served it last
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return len(self.managers)
+
+    @property
+    def in_use(self) -> int:
+        with self._cond:
+            return len(self.managers) - len(self._idle)
+
+    def _acquire(self, app_name: str, key, timeout: float | None) -> DriverManager:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._idle, timeout=timeout):
+                raise TimeoutError(f"No browser of the pool was free for {app_name} after {timeout}s")
+            # a chat goes back to its browser when it is free, else to the one idle the longest.
+            manager = self._owners.get(key)
+            if manager not in self._idle:
+                manager = self._idle[0]
+            self._idle.remove(manager)
+            if key is not None:
+                self._owners[key] = manager
+            return manager
+
+    def _release(self, manager: DriverManager):
+        with self._cond:
+            self._idle.append(manager)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, app_name: str, url: str, key=None, timeout: float | None = None):
+        """
+        Leases a driver of the pool for the duration of the with block.
+
+        Args:
+            app_name (str): The application name, for the logs.
+            url (str): The URL opened when the driver is (re)started.
+            key: The chat the driver is leased for, its browser is preferred when free.
+            timeout (float): Seconds to wait for a free browser, None waits forever.
+        """
+        manager = self._acquire(app_name, key, timeout)
+        try:
+            # get_driver checks that the browser still answers and restarts it otherwise.
+            yield manager.get_driver(app_name, url)
+        except WebDriverException:
+            logger.warning(f"Browser {manager.profile_folder_path} failed for {app_name}, it is restarted on its next lease")
+            manager.quit()
+            raise
+        finally:
+            self._release(manager)
+
+    def quit(self):
+        """Cleanly quit all the drivers of the pool."""
+        for manager in self.managers:
+            manager.quit()
+
+
 # --------------------------------------------------------------------
 # Config Loaders
 # --------------------------------------------------------------------
-def load_config() -> dict:
-    with open(os.path.join(os.path.dirname(__file__), "config.json"), "r") as file:
-        return json.load(file)
+class FrozenDict(dict):
+    """A dict that can not be modified, the snapshots of the config files are shared by all the requests."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Config snapshots are read-only, copy them with dict() to modify")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class JSONFileCache:
+    """
+    A JSON file loaded once and parsed again only when its mtime or size changed (or after invalidate()).
+    get() hands out an immutable snapshot; a file caught half written keeps the previous snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._snapshot = None
+
+    def get(self) -> FrozenDict:
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            if self._snapshot is None:
+                raise
+            return self._snapshot
+        if stamp == self._stamp:
+            return self._snapshot
 
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    with open(self.path, "r") as file:
+                        data = json.load(file)
+                except json.JSONDecodeError as e:
+                    if self._snapshot is None:
+                        raise
+                    logger.warning(f"Keeping the previous {os.path.basename(self.path)}, it could not be parsed: {e}")
+                    return self._snapshot
+                self._snapshot = _freeze(data)
+                self._stamp = stamp
+                logger.debug(f"Loaded {self.path}")
+        return self._snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._stamp = None
+
+    def write(self, data: dict):
+        """Replace the file atomically (no reader sees it half written) and drop the snapshot."""
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as file:
+                json.dump(data, file, indent=4)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.invalidate()
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
+
+config_cache = JSONFileCache(CONFIG_PATH)
+xpaths_cache = JSONFileCache(os.path.join(os.path.dirname(__file__), "xpaths.json"))
+creds_cache = JSONFileCache(os.path.join(os.path.dirname(__file__), "credentials.json"))
 
-def load_xpaths() -> dict:
-    with open(os.path.join(os.path.dirname(__file__), "xpaths.json"), "r") as file:
-        return json.load(file)
 
+def load_config() -> FrozenDict:
+    return config_cache.get()
 
-def load_creds() -> dict:
-    with open(os.path.join(os.path.dirname(__file__), "credentials.json"), "r") as file:
-        return json.load(file)
+
+def load_xpaths() -> FrozenDict:
+    return xpaths_cache.get()
+
+
+def load_creds() -> FrozenDict:
+    return creds_cache.get()
 
 
 # --------------------------------------------------------------------
@@ -202,7 +383,7 @@ def retry_on_internet(max_attempts: int = 5, initial_delay: int = 3, max_delay:
 def is_logged_in(driver: webdriver.Chrome, send_element: str) -> bool:
     """Check if a user is logged in by verifying presence of a profile element."""
     try:
-        print("received xpath: ", send_element)
+        logger.debug(f"Waiting for the send element {send_element}")
         # print(driver.page_source)
         WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.XPATH, send_element))
@@ -282,6 +463,121 @@ def wait_for_server(
     logger.error(f"Server at {url} is not reachable after {retries} attempts.")
     return False
 
+# --------------------------------------------------------------------
+# Response Capture (MutationObserver)
+# --------------------------------------------------------------------
+# Installed in the page before a prompt is sent: the observer tracks the response elements
+# (matched by an XPath) that are added or changed afterwards, so that Python waits on the
+# browser instead of re-reading the text of the whole chat history at every poll.
+_INSTALL_OBSERVER_JS = """
+const [xpath, textXpath] = arguments;
+if (window.__aievalCapture) window.__aievalCapture.observer.disconnect();
+const query = () => {
+  const found = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const items = [];
+  for (let i = 0; i < found.snapshotLength; i++) items.push(found.snapshotItem(i));
+  return items;
+};
+const textOf = (el) => {
+  if (!textXpath) return (el.innerText || el.textContent || "").trim();
+  const found = document.evaluate(textXpath, el, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const parts = [];
+  for (let i = 0; i < found.snapshotLength; i++) parts.push((found.snapshotItem(i).innerText || "").trim());
+  return parts.filter(Boolean).join(" ");
+};
+const state = {baseline: new Set(query()), fresh: [], target: null, listeners: [], query: query, textOf: textOf};
+state.observer = new MutationObserver((records) => {
+  const items = query();
+  const fresh = items.filter((el) => !state.baseline.has(el));
+  let target = fresh.length ? fresh[fresh.length - 1] : null;
+  if (!target) {
+    // an answer updated in place: the response element holding a mutated node.
+    const matched = new Set(items);
+    for (const record of records) {
+      let node = record.target;
+      while (node && !matched.has(node)) node = node.parentNode;
+      if (node) target = node;
+    }
+  }
+  if (!target) return;
+  state.fresh = fresh;
+  state.target = target;
+  state.listeners.forEach((listener) => listener());
+});
+state.observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+window.__aievalCapture = state;
+"""
+
+_WAIT_OBSERVER_JS = """
+const [collect, stabilityMs, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const state = window.__aievalCapture;
+if (!state) { done({error: "response observer not installed"}); return; }
+const start = performance.now();
+const textNow = () => collect === "all"
+  ? state.fresh.map(state.textOf).filter(Boolean).join(" ")
+  : (state.target ? state.textOf(state.target) : "");
+let stable = null, finished = false;
+const finish = (timedOut) => {
+  if (finished) return;
+  finished = true;
+  clearTimeout(stable);
+  state.observer.disconnect();
+  state.listeners = [];
+  done({text: textNow(), timedOut: timedOut, waitedMs: performance.now() - start});
+};
+// the answer is final once no mutation touched it for the stability window.
+const arm = () => {
+  clearTimeout(stable);
+  stable = setTimeout(() => { if (textNow()) finish(false); }, stabilityMs);
+};
+state.listeners.push(arm);
+if (state.target) arm();
+setTimeout(() => finish(true), timeoutMs);
+"""
+
+
+def install_response_observer(driver: webdriver.Chrome, response_xpath: str, text_xpath: str | None = None):
+    """
+    Start recording the response elements added or changed in the page from now on.
+    Call it before sending the prompt, then wait_for_observed_response.
+
+    Args:
+        response_xpath: XPath of the response elements (the agent messages).
+        text_xpath: XPath of the text inside a response element, relative to it; its whole text when None.
+    """
+    driver.execute_script(_INSTALL_OBSERVER_JS, response_xpath, text_xpath)
+
+
+def wait_for_observed_response(
+    driver: webdriver.Chrome,
+    collect: str = "last",
+    response_timeout: float = 30.0,
+    stability_window: float = 1.5,
+) -> str | None:
+    """
+    Wait in the browser until the observed response stopped changing for the stability window.
+
+    Args:
+        collect: "last" returns the text of the last added or changed response element,
+                 "all" the texts of all the added response elements joined by spaces.
+
+    Returns:
+        The response text (the last text seen on timeout), or None when nothing changed.
+        Raises a WebDriverException when the observer is gone (e.g. the page was reloaded).
+    """
+    driver.set_script_timeout(response_timeout + 5)
+    result = driver.execute_async_script(
+        _WAIT_OBSERVER_JS, collect, int(stability_window * 1000), int(response_timeout * 1000)
+    )
+    if result.get("error"):
+        raise WebDriverException(result["error"])
+    if result["timedOut"]:
+        logger.warning(f"Response still changing or absent after {response_timeout}s")
+    logger.debug(f"Observed response after {result['waitedMs']:.0f} ms")
+    return (result["text"] or "").strip() or None
+
+
 # --------------------------------------------------------------------
 # Generic App Helpers (Login / Logout / Search / Send Message)
 # --------------------------------------------------------------------
@@ -323,7 +619,6 @@ def login_app(driver: webdriver.Chrome, app_name: str) -> bool:
 
     except Exception as e:
         logger.error(f"{app_name.upper()} login failed: {e}")
-        print(e)
         return False
 
 
@@ -387,7 +682,9 @@ def send_message_whatsapp(driver: webdriver.Chrome, prompt: str):
     """
     attempt = 0
     max_retries: int = 3
-    app_name = load_config().get("application_type")
+    config = load_config()
+    app_name = config.get("application_type")
+    capture_mode = config.get("capture_mode", "observer").lower()
     app_cfg = load_xpaths()["applications"][app_name.lower()]
     chat_cfg = app_cfg["ChatPage"]
 
@@ -406,6 +703,16 @@ def send_message_whatsapp(driver: webdriver.Chrome, prompt: str):
             )
             message_box.clear()
             message_box.click()
+
+            # record the incoming messages in the page from now on
+            observing = False
+            if capture_mode == "observer":
+                try:
+                    install_response_observer(driver, chat_cfg["message_in_element"], chat_cfg["agent_response_element"])
+                    observing = True
+                except WebDriverException as e:
+                    logger.debug(f"Response observer unavailable, polling instead: {e}")
+
             chunks = split_message(prompt)
             
             for chunk in chunks:
@@ -414,6 +721,15 @@ def send_message_whatsapp(driver: webdriver.Chrome, prompt: str):
                 time.sleep(0.5)
             message_box.send_keys(Keys.RETURN)
 
+            if observing:
+                # all the agent messages received after the prompt, once none arrived for 2 seconds (30 seconds at most)
+                combined_response = wait_for_observed_response(driver, collect="all", response_timeout=30.0, stability_window=2.0)
+                if combined_response:
+                    logger.info("Received response from WhatsApp: %s", combined_response)
+                    return combined_response
+                logger.warning("No response message received from whatsapp.")
+                return "No response received"
+
             #time.sleep(5)  # Wait for the message to be sent and responses to arrive
             old_response_texts = []
             response_texts = []
@@ -500,6 +816,8 @@ def send_message_webapp(
     stability_window: float = 1.5,
     poll_interval: float = 0.5,
     send_button_xpath: str | None = None,  # optional: prefer click if UI uses a send button
+    check_connection: bool = True,  # False for a local chat page, the browser check would navigate away from it
+    capture_mode: str | None = None,  # "observer" (MutationObserver) or "poll"; capture_mode of config.json by default
 ) -> str:
     """
     Robust send-and-wait that detects both appended responses and in-place updates.
@@ -508,6 +826,7 @@ def send_message_webapp(
 
     app_cfg = load_xpaths()["applications"][app_name.lower()]
     chat_cfg = app_cfg["ChatPage"]
+    capture_mode = (capture_mode or load_config().get("capture_mode", "observer")).lower()
 
     input_xpath    = chat_cfg.get("prompt_input_box_element")
     response_xpath = chat_cfg.get("agent_response_element")
@@ -685,15 +1004,23 @@ def send_message_webapp(
     last_exception = None
     for attempt in range(1, max_retries + 1):
         try:
-            if not check_and_recover_connection(driver):
+            if check_connection and not check_and_recover_connection(driver):
                 return "No response: Internet unavailable"
 
             logger.info(f"[{app_name}] Attempt {attempt}: preparing to send prompt.")
             logger.info(f"Sending prompt to the bot: {prompt}")
 
-            # Baseline snapshot BEFORE sending (index-aware)
-            pre_snapshot = _snapshot_texts()
-            logger.debug(f"[{app_name}] pre_snapshot count={len(pre_snapshot)}; preview={pre_snapshot[-1] if pre_snapshot else None}")
+            # Record the responses from now on in the page, or take a baseline snapshot BEFORE sending (index-aware)
+            observing = False
+            if capture_mode == "observer":
+                try:
+                    install_response_observer(driver, response_xpath)
+                    observing = True
+                except WebDriverException as e:
+                    logger.debug(f"[{app_name}] response observer unavailable, polling instead: {e}")
+            if not observing:
+                pre_snapshot = _snapshot_texts()
+                logger.debug(f"[{app_name}] pre_snapshot count={len(pre_snapshot)}; preview={pre_snapshot[-1] if pre_snapshot else None}")
 
             # Ensure input is interactable and cleared before every attempt
             box = _ensure_input_interactable(timeout=12)
@@ -714,7 +1041,10 @@ def send_message_webapp(
 
             # Wait for any change (append or update) and for it to stabilize
             start_wait = time.time()
-            final_text = _wait_for_change_and_stability(pre_snapshot)
+            if observing:
+                final_text = wait_for_observed_response(driver, response_timeout=response_timeout, stability_window=stability_window)
+            else:
+                final_text = _wait_for_change_and_stability(pre_snapshot)
             elapsed = time.time() - start_wait
 
             if final_text:
@@ -6,7 +6,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from logger import get_logger
 from utils import (
-    DriverManager,
+    DriverPool,
     load_config,
     load_xpaths,
     is_logged_in,
@@ -17,8 +17,14 @@ from utils import (
 
 logger = get_logger("webapp_driver")
 
-# Single DriverManager instance for WebApp
-driver_manager = DriverManager(profile_name="test_profile")
+# Pool of browsers for WebApp, one isolated Chrome profile per concurrent chat.
+# The pool is sized once at startup, a browser_pool_size changed through POST /config applies after a restart.
+_cfg = load_config()
+driver_pool = DriverPool(
+    profile_name="webapp_profile",
+    size=int(_cfg.get("browser_pool_size", 1)),
+    headless=str(_cfg.get("headless", "False")).lower() == "true",
+)
 
 
 def get_ui_response_webapp():
@@ -31,8 +37,8 @@ def login_webapp(app_name: str):
     """
     cfg = load_config()
     url = cfg.get("application_url", "UNKNOWN")
-    driver = driver_manager.get_driver(app_name, url)
-    return login_app(driver, app_name)
+    with driver_pool.lease(app_name, url, timeout=cfg.get("browser_lease_timeout")) as driver:
+        return login_app(driver, app_name)
 
 
 def logout_webapp(driver, app_name: str):
@@ -46,12 +52,13 @@ def search_llm(driver):
     """
     Specific: OpenWeb-UI model search.
     """
-    app_name = load_config().get("application_name", "UNKNOWN")
-    agent_name = load_config().get("agent_name", "UNKNOWN")
+    config = load_config()
+    app_name = config.get("application_name", "UNKNOWN")
+    agent_name = config.get("agent_name", "UNKNOWN")
     cfg = load_xpaths()["applications"]["openweb-ui"]["ChatPage"]
 
     try:
-        if login_webapp(app_name):
+        if login_app(driver, app_name):
             logger.info("Launched the OpenWeb-UI Interface")
 
             button = WebDriverWait(driver, 10).until(
@@ -83,23 +90,22 @@ def send_prompt(app_name: str, chat_id: int, prompt_list: List[str]) -> list[dic
     url = cfg.get("application_url", "UNKNOWN")
     app_name = app_name.lower()
 
-    driver = driver_manager.get_driver(app_name, url)
-
-    # Ensure login
-    logout_cfg = load_xpaths()["applications"][app_name]["LogoutPage"]
-    print("sending xpath: ", logout_cfg["send_element"])
-    login_ok = is_logged_in(driver, send_element=logout_cfg["send_element"]) or login_webapp(app_name)
-    print("after function running xpath: ", logout_cfg["send_element"])
-    print("login_ok:", login_ok)
-    for prompt in prompt_list:
-        result = {"chat_id": chat_id, "prompt": prompt, "response": "[Not available]"}
-        if login_ok:
-            # replace new line characters to avoid UI issues
-            # CPGRAMS treats prompts with new lines as new prompts.
-            prompt = prompt.replace("\n", " ")
-            prompt += "\n"  # Ensure prompt submission
-            result["response"] = send_message_webapp(driver, app_name, prompt)
-        results.append(result)
+    # the chat keeps its browser for all its prompts, the other chats are served by the other browsers.
+    with driver_pool.lease(app_name, url, key=chat_id, timeout=cfg.get("browser_lease_timeout")) as driver:
+        # Ensure login
+        send_element = (load_xpaths()["applications"][app_name].get("LogoutPage") or {}).get("send_element")
+        logger.debug(f"Send element xpath of {app_name}: {send_element}")
+        login_ok = (send_element and is_logged_in(driver, send_element=send_element)) or login_app(driver, app_name)
+        logger.debug(f"Logged in to {app_name}: {login_ok}")
+        for prompt in prompt_list:
+            result = {"chat_id": chat_id, "prompt": prompt, "response": "[Not available]"}
+            if login_ok:
+                # replace new line characters to avoid UI issues
+                # CPGRAMS treats prompts with new lines as new prompts.
+                prompt = prompt.replace("\n", " ")
+                prompt += "\n"  # Ensure prompt submission
+                result["response"] = send_message_webapp(driver, app_name, prompt)
+            results.append(result)
 
     return results
 
@@ -110,7 +116,7 @@ def close_webapp(app_name: str):
     """
     try:
         logger.info(f"Closing WebApp session for {app_name}...")
-        driver_manager.quit()
+        driver_pool.quit()
         logger.info(f"Session closed for {app_name}")
     except Exception as e:
         logger.warning(f"Driver quit issue for {app_name}: {e}")
@@ -1,7 +1,7 @@
 from selenium import webdriver
 from logger import get_logger
 from utils import (
-    DriverManager,
+    DriverPool,
     load_config,
     login_app,
     logout_app,
@@ -11,25 +11,26 @@ from utils import (
 
 logger = get_logger("whatsapp_driver")
 
-# Single DriverManager instance for WhatsApp
-driver_manager = DriverManager()
+# A pool of a single browser for WhatsApp: the linked devices of an account share the chat with the agent,
+# the chats could not tell their responses apart if they ran in parallel.
+# Its browser keeps the test_profile of the earlier single DriverManager, with the linked WhatsApp account.
+driver_pool = DriverPool(profile_name="test_profile", size=1)
 
 
 def get_ui_response_whatsapp():
     return {"ui": "Whatsapp Web Chat Interface", "features": ["smart-compose", "modular-layout"]}
 
 
-def login_whatsapp() -> webdriver.Chrome | None:
-    """Login to WhatsApp Web using DriverManager and generic login_app."""
+def login_whatsapp() -> bool:
+    """Login to WhatsApp Web using a driver of the pool and generic login_app."""
     cfg = load_config()
     url = cfg.get("whatsapp_url")
     try:
-        driver = driver_manager.get_driver("WhatsApp Web", url)
-        login_app(driver, "whatsapp_web")
-        return driver
+        with driver_pool.lease("WhatsApp Web", url) as driver:
+            return login_app(driver, "whatsapp_web")
     except Exception as e:
         logger.error(f"WhatsApp Web login failed: {e}")
-        return None
+        return False
 
 
 def logout_whatsapp(driver: webdriver.Chrome) -> bool:
@@ -50,22 +51,21 @@ def send_whatsapp_message(driver: webdriver.Chrome, prompt: str) -> str:
 def send_prompt_whatsapp(chat_id: int, prompt_list: list[str]) -> list[dict]:
     """Send multiple prompts to WhatsApp Web and collect responses."""
     results = []
-    driver = login_whatsapp()
-    if not driver:
-        logger.error("Could not initialize WhatsApp Web driver.")
-        return [{"chat_id": chat_id, "prompt": p, "response": "No response received"} for p in prompt_list]
-
+    url = load_config().get("whatsapp_url")
     try:
-        if not search_llm(driver):
-            logger.error("Could not open chat with LLM contact.")
-            return [{"chat_id": chat_id, "prompt": p, "response": "No response received"} for p in prompt_list]
-
-        for prompt in prompt_list:
-            response = send_whatsapp_message(driver, prompt)
-            results.append({"chat_id": chat_id, "prompt": prompt, "response": response})
-
-    finally:
-        pass  # keep driver alive for reuse
+        # the driver goes back to the pool afterwards, alive for reuse
+        with driver_pool.lease("WhatsApp Web", url, key=chat_id) as driver:
+            login_app(driver, "whatsapp_web")
+            if not search_llm(driver):
+                logger.error("Could not open chat with LLM contact.")
+                return [{"chat_id": chat_id, "prompt": p, "response": "No response received"} for p in prompt_list]
+
+            for prompt in prompt_list:
+                response = send_whatsapp_message(driver, prompt)
+                results.append({"chat_id": chat_id, "prompt": prompt, "response": response})
+    except Exception as e:
+        logger.error(f"Could not initialize WhatsApp Web driver: {e}")
+        return [{"chat_id": chat_id, "prompt": p, "response": "No response received"} for p in prompt_list]
 
     return results
 
@@ -76,7 +76,7 @@ def close_whatsapp(driver: webdriver.Chrome | None = None):
         if driver:
             driver.quit()
             logger.info("Driver quit successfully.")
-        driver_manager.quit()
+        driver_pool.quit()
         logger.info("WhatsApp Web session closed successfully.")
     except Exception as e:
         logger.error(f"Error closing WhatsApp Web session: {e}")
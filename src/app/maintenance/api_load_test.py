@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# @description: Load test of the read endpoints of the TDMS back-end, reporting the latency percentiles under concurrent users.
+# Run it against the server before and after a change (--label, --output) and compare the recorded percentiles (--compare).
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from rich.table import Table
+from rich.console import Console
+
+sys.path.append(os.path.dirname(__file__) + "/../../")  # Adjust the path to include the "lib" directory
+
+from lib.utils import get_logger, get_logger_verbosity
+
+# what the front-end pages load, the dashboard and the dropdowns first.
+DEFAULT_ENDPOINTS = [
+    "/api/dashboard",
+    "/api/v2/domains",
+    "/api/v2/languages",
+    "/api/v2/strategies",
+    "/api/v2/targets",
+    "/api/v2/metrics",
+    "/api/v2/llm-prompts",
+    "/api/v2/testcases/1",
+    "/api/v2/prompts/1",
+    "/api/v2/responses/1",
+]
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+def user(base_url, endpoints, headers, deadline, latencies, errors, lock):
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    while time.perf_counter() < deadline:
+        endpoint = random.choice(endpoints)
+        start = time.perf_counter()
+        try:
+            ok = session.get(f"{base_url}{endpoint}", headers=headers, timeout=60).status_code < 500
+        except requests.RequestException:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            if ok:
+                latencies.setdefault(endpoint, []).append(elapsed)
+            else:
+                errors[endpoint] = errors.get(endpoint, 0) + 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the read endpoints of the TDMS back-end.")
+    parser.add_argument("--verbosity", "-v", dest="verbosity", type=int, choices=[0,1,2,3,4,5], help="Enable verbose output", default=5)
+    parser.add_argument("--url", "-u", dest="url", type=str, default="http://localhost:8000", help="Base URL of the back-end.")
+    parser.add_argument("--users", "-c", dest="users", type=int, default=50, help="Number of concurrent users.")
+    parser.add_argument("--duration", "-d", dest="duration", type=float, default=30.0, help="Duration of the test in seconds.")
+    parser.add_argument("--endpoint", "-e", dest="endpoints", action="append", help="Endpoint to request (repeatable), the read endpoints of the front-end by default.")
+    parser.add_argument("--token", "-t", dest="token", type=str, help="Bearer token, when the authentication is enabled.")
+    parser.add_argument("--label", "-l", dest="label", type=str, default="run", help="Name of this run in the output file.")
+    parser.add_argument("--output", "-o", dest="output", type=str, help="JSON file the percentiles of the run are added to.")
+    parser.add_argument("--compare", dest="compare", type=str, help="Label of a run of the output file to compare with.")
+    args = parser.parse_args()
+
+    # Set up logging
+    logger = get_logger(__name__)
+    logger.setLevel(get_logger_verbosity(args.verbosity))
+
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    latencies, errors, lock = dict(), dict(), threading.Lock()
+
+    logger.info(f"Running {args.users} users against {args.url} for {args.duration:.0f} s ..")
+    deadline = time.perf_counter() + args.duration
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        for _ in range(args.users):
+            pool.submit(user, args.url.rstrip("/"), endpoints, headers, deadline, latencies, errors, lock)
+
+    results = dict()
+    for endpoint in endpoints + ["all"]:
+        values = sorted(v for e, vs in latencies.items() if endpoint in ("all", e) for v in vs)
+        failed = sum(n for e, n in errors.items() if endpoint in ("all", e))
+        results[endpoint] = {"requests": len(values), "errors": failed, "rps": len(values) / args.duration,
+                             "p50": percentile(values, 50), "p95": percentile(values, 95), "p99": percentile(values, 99)}
+
+    previous = dict()
+    recorded = dict()
+    if args.output and os.path.exists(args.output):
+        with open(args.output, "r") as f:
+            recorded = json.load(f)
+    if args.compare:
+        previous = recorded.get(args.compare, dict())
+        if not previous:
+            logger.warning(f"No run labelled '{args.compare}' in {args.output}.")
+
+    table = Table(title=f"{args.users} users for {args.duration:.0f} s ({args.label})")
+    table.add_column("Endpoint", style="cyan")
+    table.add_column("Requests", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Req/s", justify="right")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p95 (ms)", justify="right")
+    table.add_column("p99 (ms)", justify="right")
+    if previous:
+        table.add_column(f"p99 {args.compare} (ms)", justify="right")
+    for endpoint, r in results.items():
+        row = [endpoint, str(r["requests"]), str(r["errors"]), f"{r['rps']:.1f}", f"{r['p50']:.1f}", f"{r['p95']:.1f}", f"{r['p99']:.1f}"]
+        if previous:
+            row.append(f"{previous[endpoint]['p99']:.1f}" if endpoint in previous else "-")
+        table.add_row(*row)
+    Console().print(table)
+
+    if args.output:
+        recorded[args.label] = results
+        with open(args.output, "w") as f:
+            json.dump(recorded, f, indent=4)
+        logger.info(f"Recorded the run '{args.label}' in {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ from rich.console import Console
 sys.path.append(os.path.dirname(__file__) + "/../../")  # Adjust the path to include the "lib" directory
 
 from lib.orm import DB  # Import the DB class from the ORM module
+from lib.orm.engine import engine_options
 from lib.data import Target, Run, RunDetail, Conversation
 from lib.utils import get_logger, get_logger_verbosity, lang_detect, iso639_to_language_name, language_name_to_iso639
 
@@ -82,7 +83,7 @@ def main():
 
     try:
         logger.info(f"Database URL: {db_url}")
-        db = DB(db_url=db_url, debug=False, loglevel=loglevel)
+        db = DB(db_url=db_url, debug=False, loglevel=loglevel, **engine_options(config["db"]))
     except Exception as e:
         logger.error(f"Failed to connect to the database: {e}")
         return
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# @description: Helper script to build the reference distributions of the fluency score strategy and render their images offline.
+
+import argparse
+import math
+import sys
+import os
+import numpy as np
+from rich.table import Table
+from rich.console import Console
+
+sys.path.append(os.path.dirname(__file__) + "/../../")  # Adjust the path to include the "lib" directory
+
+from lib.utils import get_logger, get_logger_verbosity
+from lib.strategy.fluency_score import IndianLanguageFluencyScorer, dflt_vals
+
+def direct_score(scorer:IndianLanguageFluencyScorer, score:float) -> float:
+    # the score as computed before the CDF tables, from the KDE densities of the examples.
+    probs = [scorer.kde_mass(kde, score) for kde in scorer.reference_kdes()]
+    log_ratio = math.log(max(probs[0], 1e-40)) - math.log(max(probs[1], 1e-40))
+    return round(1 / (1 + math.exp(-log_ratio)), 3)
+
+def check_scores(scorer:IndianLanguageFluencyScorer, ex_results:dict) -> bool:
+    """
+    Compares the table based scores with the direct KDE integration, inside the range of the examples
+    and at increasing distances (in bandwidths) beyond both of its ends. Returns True if they all match.
+    """
+    samples = np.concatenate([np.asarray(v, dtype=np.float64) for v in ex_results.values()])
+    bandwidth = max(math.sqrt(kde.covariance[0, 0]) for kde in scorer.reference_kdes())
+    points = [("in range", x) for x in np.linspace(samples.min(), samples.max(), 200)]
+    for k in (2, 4, 6, 8, 12, 20, 30):
+        points += [(f"-{k} bw", samples.min() - k * bandwidth), (f"+{k} bw", samples.max() + k * bandwidth)]
+    tabled = scorer.fluency_scores([x for _, x in points])
+    table = Table(title="Table based vs direct fluency scores")
+    table.add_column("Point", style="cyan")
+    table.add_column("Value", justify="right")
+    table.add_column("Table", justify="right")
+    table.add_column("Direct", justify="right")
+    mismatches = 0
+    for (label, x), new in zip(points, tabled):
+        old = direct_score(scorer, x)
+        # one step of the rounding to 3 decimals
+        failed = abs(new - old) > 0.0011
+        mismatches += failed
+        if label != "in range" or failed:
+            table.add_row(label, f"{x:.3f}", f"{new:.3f}", f"{old:.3f}", style="red" if failed else None)
+    Console().print(table)
+    return mismatches == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the reference distributions of the fluency score and render their images.")
+    parser.add_argument("--verbosity", "-v", dest="verbosity", type=int, choices=[0,1,2,3,4,5], help="Enable verbose output", default=5)
+    parser.add_argument("--rebuild", "-r", dest="rebuild", action="store_true", help="Score the example paragraphs again through the model service and rebuild the CDF tables.")
+    parser.add_argument("--images", "-i", dest="images", action="store_true", help="Render the KDE plot of the distributions to the images directory.")
+    parser.add_argument("--check", "-c", dest="check", action="store_true", help="Check the table based scores against the direct KDE integration, in and beyond the range of the examples.")
+    args = parser.parse_args()
+
+    # Set up logging
+    logger = get_logger(__name__)
+    logger.setLevel(get_logger_verbosity(args.verbosity))
+
+    scorer = IndianLanguageFluencyScorer()
+    tables = scorer.reference_tables(force=args.rebuild)
+    if tables is None:
+        logger.error(f"No examples for both the fluent and non fluent distributions of the {dflt_vals.type} fluency score.")
+        return
+
+    ex_results = scorer.run_examples()
+    grid, cdfs = tables
+    table = Table(title=f"Fluency score reference distributions ({dflt_vals.type})")
+    table.add_column("Distribution", style="cyan")
+    table.add_column("Examples", justify="right")
+    table.add_column("Min", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("CDF at grid end", justify="right")
+    for (name, values), cdf in zip(ex_results.items(), cdfs):
+        table.add_row(name, str(len(values)), f"{min(values):.3f}", f"{max(values):.3f}", f"{cdf[-1]:.6f}")
+    Console().print(table)
+    logger.info(f"CDF tables of {len(grid)} points over [{grid[0]:.3f}, {grid[-1]:.3f}] in {scorer.ex_dir}")
+
+    if args.images:
+        images_dir = os.path.join(os.path.dirname(sys.modules[IndianLanguageFluencyScorer.__module__].__file__), os.getenv("IMAGES_DIR"))
+        file_name = f"{dflt_vals.type}_dist.png"
+        scorer.save_res_as_img(ex_results, images_dir, file_name)
+        logger.info(f"Saved the distribution plot to {os.path.join(images_dir, file_name)}")
+
+    if args.check:
+        if check_scores(scorer, ex_results):
+            logger.info("The table based scores match the direct KDE integration.")
+        else:
+            logger.error("The table based scores differ from the direct KDE integration.")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# @description: Benchmark of the cold start import time of the strategy implementor, based on python -X importtime.
+# Exits with a non zero status when the import time regresses beyond the baseline or a heavy dependency is imported eagerly.
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from rich.table import Table
+from rich.console import Console
+
+sys.path.append(os.path.dirname(__file__) + "/../../")  # Adjust the path to include the "lib" directory
+
+from lib.utils import get_logger, get_logger_verbosity
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "import_time_baseline.json")
+
+# packages that must only be loaded by the strategies that use them.
+HEAVY_PACKAGES = ["torch", "transformers", "sentence_transformers", "evaluate", "nltk", "matplotlib", "seaborn",
+                  "deepeval", "ollama", "googletrans", "langchain", "scipy", "sklearn", "sqlalchemy"]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+def measure(module: str):
+    """
+    Imports the module in a fresh interpreter and returns its cumulative import time (us) and the per module timings.
+    """
+    env = dict(os.environ, PYTHONPATH=SRC_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""), PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=SRC_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+    timings = []
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            timings.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    # the interpreter start up (encodings, site ..) is reported first, only what follows is caused by the import.
+    start = max((i + 1 for i, (name, _, _, depth) in enumerate(timings) if name == "site" and depth == 0), default=0)
+    timings = timings[start:]
+    total = sum(cumulative_us for _, _, cumulative_us, depth in timings if depth == 0)
+    return total, timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cold start import time of the strategy implementor.")
+    parser.add_argument("--verbosity", "-v", dest="verbosity", type=int, choices=[0,1,2,3,4,5], help="Enable verbose output", default=5)
+    parser.add_argument("--module", "-m", dest="module", type=str, default="lib.strategy.strategy_implementor", help="Module whose import is measured.")
+    parser.add_argument("--runs", "-n", dest="runs", type=int, default=5, help="Number of cold starts, the fastest one is kept.")
+    parser.add_argument("--baseline", "-b", dest="baseline", type=str, default=DEFAULT_BASELINE, help="JSON file with the baseline import time in milliseconds.")
+    parser.add_argument("--tolerance", "-t", dest="tolerance", type=float, default=0.25, help="Allowed slowdown over the baseline, as a fraction.")
+    parser.add_argument("--budget-ms", dest="budget_ms", type=float, help="Absolute limit of the import time in milliseconds.")
+    parser.add_argument("--update-baseline", "-u", dest="update_baseline", action="store_true", help="Record the measured time as the new baseline.")
+    parser.add_argument("--top", dest="top", type=int, default=15, help="Number of slowest imports to show.")
+    args = parser.parse_args()
+
+    # Set up logging
+    logger = get_logger(__name__)
+    logger.setLevel(get_logger_verbosity(args.verbosity))
+
+    # the fastest of the runs is the least disturbed by the machine load.
+    best_total, best_timings = None, None
+    for _ in range(max(args.runs, 1)):
+        total, timings = measure(args.module)
+        if best_total is None or total < best_total:
+            best_total, best_timings = total, timings
+    elapsed_ms = best_total / 1000.0
+
+    table = Table(title=f"Slowest imports of {args.module}")
+    table.add_column("Module", style="cyan")
+    table.add_column("Self (ms)", justify="right")
+    table.add_column("Cumulative (ms)", justify="right")
+    for name, self_us, cumulative_us, _ in sorted(best_timings, key=lambda t: t[2], reverse=True)[:args.top]:
+        table.add_row(name, f"{self_us / 1000:.1f}", f"{cumulative_us / 1000:.1f}")
+    Console().print(table)
+    logger.info(f"Cold start import of {args.module} : {elapsed_ms:.1f} ms ({len(best_timings)} modules)")
+
+    failures = []
+    heavy = sorted({name.split(".")[0] for name, _, _, _ in best_timings} & set(HEAVY_PACKAGES))
+    if heavy:
+        failures.append(f"Heavy packages are imported eagerly : {', '.join(heavy)}")
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f).get(args.module)
+    if baseline is not None and elapsed_ms > baseline * (1 + args.tolerance):
+        failures.append(f"Import time {elapsed_ms:.1f} ms exceeds the baseline {baseline:.1f} ms by more than {args.tolerance:.0%}")
+    if args.budget_ms is not None and elapsed_ms > args.budget_ms:
+        failures.append(f"Import time {elapsed_ms:.1f} ms exceeds the budget of {args.budget_ms:.1f} ms")
+
+    if args.update_baseline:
+        data = dict()
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r") as f:
+                data = json.load(f)
+        data[args.module] = round(elapsed_ms, 1)
+        with open(args.baseline, "w") as f:
+            json.dump(data, f, indent=4)
+        logger.info(f"Recorded the baseline of {args.module} in {args.baseline}")
+
+    for failure in failures:
+        logger.error(failure)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# @description: Benchmark of the hot queries of the datastore before and after the index migration, on a synthetic SQLite database.
+# The database is built with the current models, the indexes of the first migration are dropped to get the old schema back,
+# the queries are timed, the migrations are applied and the queries are timed again.
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from rich.table import Table
+from rich.console import Console
+
+sys.path.append(os.path.dirname(__file__) + "/../../")  # Adjust the path to include the "lib" directory
+
+from sqlalchemy import create_engine, delete, insert, text
+from lib.utils import get_logger, get_logger_verbosity
+from lib.orm.tables import Base, Languages, Domains, Strategies, Metrics, Prompts, Responses, TestCases, TestPlans, \
+    TestPlanMetricMapping, MetricTestCaseMapping, Targets, TestRuns, TestRunDetails, Conversations, SchemaVersions
+from lib.orm.migrations import V1_INDEXES, current_version, migrate
+
+CHUNK_SIZE = 50000
+
+# name, SQL, parameter sampler (sizes -> params), number of executions relative to --repeat
+QUERIES = [
+    ("run detail of a test case",
+     "SELECT detail_id, testcase_status FROM TestRunDetails WHERE run_id = :run_id AND testcase_id = :testcase_id",
+     lambda n: {"run_id": random.randint(1, n["runs"]), "testcase_id": random.randint(1, n["testcases"])}, 1.0),
+    ("conversation of a run detail",
+     "SELECT conversation_id, agent_response FROM Conversations WHERE detail_id = :detail_id",
+     lambda n: {"detail_id": random.randint(1, n["details"])}, 1.0),
+    ("status counts of a run",
+     "SELECT testcase_status, COUNT(*) FROM TestRunDetails WHERE run_id = :run_id GROUP BY testcase_status",
+     lambda n: {"run_id": random.randint(1, n["runs"])}, 0.2),
+    ("conversations of a run",
+     "SELECT c.conversation_id, c.evaluation_score FROM Conversations c JOIN TestRunDetails d ON c.detail_id = d.detail_id "
+     "WHERE d.run_id = :run_id",
+     lambda n: {"run_id": random.randint(1, n["runs"])}, 0.05),
+    ("metrics of a test case",
+     "SELECT m.metric_name FROM Metrics m JOIN MetricTestCaseMapping x ON x.metric_id = m.metric_id WHERE x.testcase_id = :testcase_id",
+     lambda n: {"testcase_id": random.randint(1, n["testcases"])}, 1.0),
+    ("test cases of a metric",
+     "SELECT testcase_id FROM MetricTestCaseMapping WHERE metric_id = :metric_id",
+     lambda n: {"metric_id": random.randint(1, n["metrics"])}, 0.2),
+    ("metrics of a plan",
+     "SELECT metric_id FROM TestPlanMetricMapping WHERE plan_id = :plan_id",
+     lambda n: {"plan_id": random.randint(1, n["plans"])}, 1.0),
+    ("prompts of a domain and language",
+     "SELECT prompt_id FROM Prompts WHERE domain_id = :domain_id AND lang_id = :lang_id",
+     lambda n: {"domain_id": random.randint(1, n["domains"]), "lang_id": random.randint(1, n["languages"])}, 0.2),
+    ("responses of a prompt",
+     "SELECT response_id FROM Responses WHERE prompt_id = :prompt_id",
+     lambda n: {"prompt_id": random.randint(1, n["testcases"])}, 1.0),
+]
+
+def insert_chunks(conn, table, rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            conn.execute(insert(table), chunk)
+            chunk = []
+    if chunk:
+        conn.execute(insert(table), chunk)
+
+def build_database(engine, sizes, logger):
+    """
+    Fills the database with synthetic data, one conversation per run detail and each run covering all the test cases.
+    """
+    now = datetime.now()
+    statuses = ["NEW", "RUNNING", "COMPLETED", "FAILED"]
+    with engine.begin() as conn:
+        insert_chunks(conn, Languages, ({"lang_id": i, "lang_name": f"lang_{i}"} for i in range(1, sizes["languages"] + 1)))
+        insert_chunks(conn, Domains, ({"domain_id": i, "domain_name": f"domain_{i}"} for i in range(1, sizes["domains"] + 1)))
+        insert_chunks(conn, Strategies, ({"strategy_id": i, "strategy_name": f"strategy_{i}"} for i in range(1, sizes["strategies"] + 1)))
+        insert_chunks(conn, Metrics, ({"metric_id": i, "metric_name": f"metric_{i}", "domain_id": random.randint(1, sizes["domains"])}
+                                      for i in range(1, sizes["metrics"] + 1)))
+        insert_chunks(conn, TestPlans, ({"plan_id": i, "plan_name": f"plan_{i}"} for i in range(1, sizes["plans"] + 1)))
+        insert_chunks(conn, TestPlanMetricMapping, ({"plan_id": p, "metric_id": m} for p in range(1, sizes["plans"] + 1)
+                                                    for m in random.sample(range(1, sizes["metrics"] + 1), min(4, sizes["metrics"]))))
+        insert_chunks(conn, Targets, ({"target_id": i, "target_name": f"target_{i}", "target_type": "API", "target_url": f"http://target_{i}",
+                                       "domain_id": random.randint(1, sizes["domains"])} for i in range(1, sizes["targets"] + 1)))
+        logger.info(f"Adding {sizes['testcases']} prompts, responses and test cases ..")
+        insert_chunks(conn, Prompts, ({"prompt_id": i, "user_prompt": f"user prompt {i}", "system_prompt": None, "hash_value": f"p{i}",
+                                       "lang_id": random.randint(1, sizes["languages"]), "domain_id": random.randint(1, sizes["domains"])}
+                                      for i in range(1, sizes["testcases"] + 1)))
+        insert_chunks(conn, Responses, ({"response_id": i, "response_text": f"response {i}", "response_type": "GT", "prompt_id": i,
+                                         "lang_id": random.randint(1, sizes["languages"]), "hash_value": f"r{i}"}
+                                        for i in range(1, sizes["testcases"] + 1)))
+        insert_chunks(conn, TestCases, ({"testcase_id": i, "testcase_name": f"testcase_{i}", "prompt_id": i, "response_id": i,
+                                         "strategy_id": random.randint(1, sizes["strategies"])} for i in range(1, sizes["testcases"] + 1)))
+        insert_chunks(conn, MetricTestCaseMapping, ({"testcase_id": t, "metric_id": m} for t in range(1, sizes["testcases"] + 1)
+                                                    for m in random.sample(range(1, sizes["metrics"] + 1), min(2, sizes["metrics"]))))
+        insert_chunks(conn, TestRuns, ({"run_id": i, "run_name": f"run_{i}", "target_id": random.randint(1, sizes["targets"]), "status": "COMPLETED"}
+                                       for i in range(1, sizes["runs"] + 1)))
+        logger.info(f"Adding {sizes['details']} run details and conversations ..")
+        # the details of a run are interleaved with the other runs, as when the runs go on at the same time.
+        insert_chunks(conn, TestRunDetails, ({"detail_id": d, "run_id": (d - 1) % sizes["runs"] + 1, "testcase_id": (d - 1) // sizes["runs"] + 1,
+                                              "plan_id": random.randint(1, sizes["plans"]), "metric_id": random.randint(1, sizes["metrics"]),
+                                              "testcase_status": random.choice(statuses)} for d in range(1, sizes["details"] + 1)))
+        insert_chunks(conn, Conversations, ({"conversation_id": d, "detail_id": d, "target_id": random.randint(1, sizes["targets"]),
+                                             "agent_response": f"agent response {d}", "prompt_ts": now, "response_ts": now,
+                                             "evaluation_score": random.random()} for d in range(1, sizes["details"] + 1)))
+
+def drop_migrated_indexes(engine):
+    """
+    Brings the schema back to the one before the migrations.
+    """
+    with engine.begin() as conn:
+        for name in V1_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        conn.execute(delete(SchemaVersions))
+
+def run_queries(engine, sizes, repeat, seed):
+    results = dict()
+    with engine.connect() as conn:
+        for name, sql, sampler, weight in QUERIES:
+            random.seed(seed)  # the same parameters before and after the migration.
+            statement = text(sql)
+            plan = "; ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", sampler(sizes)).all())
+            executions = max(int(repeat * weight), 1)
+            start = time.perf_counter()
+            for _ in range(executions):
+                conn.execute(statement, sampler(sizes)).all()
+            results[name] = ((time.perf_counter() - start) * 1000 / executions, plan)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot queries of the datastore before and after the index migration.")
+    parser.add_argument("--verbosity", "-v", dest="verbosity", type=int, choices=[0,1,2,3,4,5], help="Enable verbose output", default=5)
+    parser.add_argument("--db-file", "-d", dest="db_file", type=str, default="index_benchmark.db", help="SQLite file of the synthetic database.")
+    parser.add_argument("--conversations", "-c", dest="conversations", type=int, default=1_000_000, help="Number of conversations (and run details).")
+    parser.add_argument("--testcases", "-t", dest="testcases", type=int, default=20_000, help="Number of test cases, each run covers all of them.")
+    parser.add_argument("--repeat", "-n", dest="repeat", type=int, default=200, help="Number of executions of the point queries.")
+    parser.add_argument("--rebuild", "-r", dest="rebuild", action="store_true", help="Build the synthetic database again.")
+    parser.add_argument("--seed", dest="seed", type=int, default=42, help="Seed of the synthetic data and the query parameters.")
+    args = parser.parse_args()
+
+    # Set up logging
+    logger = get_logger(__name__)
+    logger.setLevel(get_logger_verbosity(args.verbosity))
+
+    runs = max(args.conversations // args.testcases, 1)
+    sizes = {"languages": 10, "domains": 5, "strategies": 20, "metrics": 40, "plans": 10, "targets": 5,
+             "testcases": args.testcases, "runs": runs, "details": runs * args.testcases}
+
+    if args.rebuild and os.path.exists(args.db_file):
+        os.remove(args.db_file)
+    engine = create_engine(f"sqlite:///{args.db_file}")
+    if not os.path.exists(args.db_file) or os.path.getsize(args.db_file) == 0:
+        random.seed(args.seed)
+        Base.metadata.create_all(engine)
+        start = time.perf_counter()
+        build_database(engine, sizes, logger)
+        logger.info(f"Built the synthetic database {args.db_file} in {time.perf_counter() - start:.1f} s")
+
+    drop_migrated_indexes(engine)
+    logger.info(f"Timing the queries on the schema version {current_version(engine)} ..")
+    before = run_queries(engine, sizes, args.repeat, args.seed)
+
+    start = time.perf_counter()
+    version = migrate(engine)
+    logger.info(f"Migrated the database to the schema version {version} in {time.perf_counter() - start:.1f} s")
+    after = run_queries(engine, sizes, args.repeat, args.seed)
+
+    table = Table(title=f"Hot queries on {sizes['details']} conversations, {sizes['testcases']} test cases and {runs} runs")
+    table.add_column("Query", style="cyan")
+    table.add_column("Before (ms)", justify="right")
+    table.add_column("After (ms)", justify="right")
+    table.add_column("Speedup", justify="right", style="green")
+    table.add_column("Plan after the migration")
+    for name, (before_ms, _) in before.items():
+        after_ms, plan = after[name]
+        table.add_row(name, f"{before_ms:.3f}", f"{after_ms:.3f}", f"{before_ms / after_ms:.1f}x" if after_ms else "-", plan)
+    Console().print(table)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# @description: Helper script to inspect and purge the evaluation result cache of the strategies.
+
+import argparse
+import sys
+import os
+from datetime import datetime
+from rich.table import Table
+from rich.console import Console
+
+sys.path.append(os.path.dirname(__file__) + "/../../")  # Adjust the path to include the "lib" directory
+
+from lib.utils import get_logger, get_logger_verbosity
+from lib.strategy._result_cache import get_result_cache
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and purge the evaluation result cache.")
+    parser.add_argument("--verbosity", "-v", dest="verbosity", type=int, choices=[0,1,2,3,4,5], help="Enable verbose output", default=5)
+    parser.add_argument("--stats", "-s", dest="stats", action="store_true", help="Show the cached results per strategy and metric.")
+    parser.add_argument("--purge", "-p", dest="purge", action="store_true", help="Remove the cached results (all of them, unless filtered by --strategy or --older-than).")
+    parser.add_argument("--strategy", dest="strategy", type=str, help="Only purge the results of this strategy.")
+    parser.add_argument("--older-than", dest="older_than", type=float, help="Only purge the results not used in the last N days.")
+    parser.add_argument("--evict", "-e", dest="evict", action="store_true", help="Evict the least recently used results beyond the configured size limits.")
+    args = parser.parse_args()
+
+    # Set up logging
+    logger = get_logger(__name__)
+    logger.setLevel(get_logger_verbosity(args.verbosity))
+
+    cache = get_result_cache()
+    if cache is None:
+        logger.error("The result cache is disabled in the strategy defaults.")
+        return
+    logger.info(f"Result cache: {cache.cache_path}")
+
+    if args.purge:
+        removed = cache.purge(strategy_name=args.strategy, older_than=args.older_than * 86400 if args.older_than is not None else None)
+        logger.info(f"Removed {removed} cached results.")
+
+    if args.evict:
+        removed = cache.evict()
+        logger.info(f"Evicted {removed} cached results.")
+
+    if args.stats or not (args.purge or args.evict):
+        table = Table(title="Evaluation result cache")
+        table.add_column("Strategy", style="cyan")
+        table.add_column("Metric", style="magenta")
+        table.add_column("Entries", justify="right")
+        table.add_column("Versions", justify="right")
+        table.add_column("Size (KB)", justify="right")
+        table.add_column("Last used", style="green")
+        total_entries, total_bytes = 0, 0
+        for row in cache.summary():
+            total_entries += row["entries"]
+            total_bytes += row["bytes"] or 0
+            table.add_row(row["strategy"], row["metric"], str(row["entries"]), str(row["versions"]),
+                          f"{(row['bytes'] or 0) / 1024:.1f}",
+                          datetime.fromtimestamp(row["last_used"]).isoformat(timespec="seconds") if row["last_used"] else "-")
+        Console().print(table)
+        logger.info(f"{total_entries} cached results, {total_bytes / (1024 * 1024):.2f} MB (limits: {cache.max_entries} entries, {cache.max_bytes / (1024 * 1024):.0f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# @description: Concurrent read/write benchmark of the SQLite pragma profiles of lib.orm.engine.
+# Writer and reader processes share one database file, as the TDMS back-end, the test case executor and the
+# response analyzer do, and the throughput, latency and "database is locked" errors of each profile are compared.
+
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+import sys
+from rich.table import Table
+from rich.console import Console
+
+sys.path.append(os.path.dirname(__file__) + "/../../")  # Adjust the path to include the "lib" directory
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import OperationalError
+from lib.utils import get_logger, get_logger_verbosity
+from lib.orm.engine import SQLITE_PROFILES, create_db_engine
+from lib.orm.tables import Base, Conversations
+
+def worker(role: str, db_url: str, profile: str, duration: float, seed: int, queue):
+    random.seed(seed)
+    engine = create_db_engine(db_url, sqlite_profile=profile)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if role == "writer":
+                # a conversation recorded by the executor, then its evaluation by the analyzer.
+                with engine.begin() as conn:
+                    conversation_id = conn.execute(insert(Conversations).values(
+                        target_id=1, detail_id=random.randint(1, 100000), agent_response="agent response " * 20,
+                        prompt_ts=datetime.now(), response_ts=datetime.now())).inserted_primary_key[0]
+                with engine.begin() as conn:
+                    conn.execute(update(Conversations).where(Conversations.conversation_id == conversation_id)
+                                 .values(evaluation_score=random.random(), evaluation_ts=datetime.now()))
+            else:
+                with engine.connect() as conn:
+                    last_id = conn.execute(select(func.max(Conversations.conversation_id))).scalar() or 1
+                    conn.execute(select(Conversations).where(Conversations.conversation_id == random.randint(1, last_id))).all()
+                    conn.execute(select(func.count(Conversations.conversation_id)).where(Conversations.evaluation_score > 0.5)).scalar()
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    engine.dispose()
+    queue.put((role, latencies, errors))
+
+def run_profile(profile: str, writers: int, readers: int, duration: float, seed_rows: int, logger):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="sqlite_benchmark_"), f"{profile}.db")
+    db_url = f"sqlite:///{db_path}"
+    engine = create_db_engine(db_url, sqlite_profile=profile)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Conversations), [{"target_id": 1, "detail_id": i, "agent_response": f"agent response {i}"}
+                                             for i in range(1, seed_rows + 1)])
+    engine.dispose()
+
+    logger.info(f"Running {writers} writers and {readers} readers for {duration:.0f} s with the profile '{profile}' ..")
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=worker, args=(role, db_url, profile, duration, i, queue))
+                 for i, role in enumerate(["writer"] * writers + ["reader"] * readers)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    summary = dict()
+    for role in ("writer", "reader"):
+        latencies = [latency for r, values, _ in results if r == role for latency in values]
+        errors = sum(e for r, _, e in results if r == role)
+        p95 = statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) >= 2 else float("nan")
+        summary[role] = (len(latencies) / duration, p95, errors)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite pragma profiles with concurrent readers and writers.")
+    parser.add_argument("--verbosity", "-v", dest="verbosity", type=int, choices=[0,1,2,3,4,5], help="Enable verbose output", default=5)
+    parser.add_argument("--profiles", "-p", dest="profiles", nargs="+", choices=list(SQLITE_PROFILES), default=["none", "tuned"], help="Profiles to compare.")
+    parser.add_argument("--writers", "-w", dest="writers", type=int, default=4, help="Number of writer processes.")
+    parser.add_argument("--readers", "-r", dest="readers", type=int, default=4, help="Number of reader processes.")
+    parser.add_argument("--duration", "-d", dest="duration", type=float, default=20.0, help="Duration of each run in seconds.")
+    parser.add_argument("--rows", dest="rows", type=int, default=100000, help="Number of conversations in the database at the start.")
+    args = parser.parse_args()
+
+    # Set up logging
+    logger = get_logger(__name__)
+    logger.setLevel(get_logger_verbosity(args.verbosity))
+
+    table = Table(title=f"SQLite profiles, {args.writers} writers and {args.readers} readers for {args.duration:.0f} s")
+    table.add_column("Profile", style="cyan")
+    table.add_column("Writes/s", justify="right")
+    table.add_column("Write p95 (ms)", justify="right")
+    table.add_column("Write locked", justify="right")
+    table.add_column("Reads/s", justify="right")
+    table.add_column("Read p95 (ms)", justify="right")
+    table.add_column("Read locked", justify="right")
+    for profile in args.profiles:
+        summary = run_profile(profile, args.writers, args.readers, args.duration, args.rows, logger)
+        (writes, write_p95, write_errors), (reads, read_p95, read_errors) = summary["writer"], summary["reader"]
+        table.add_row(profile, f"{writes:.1f}", f"{write_p95:.1f}", str(write_errors), f"{reads:.1f}", f"{read_p95:.1f}", str(read_errors))
+    Console().print(table)
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,11 @@ from typing import List
 sys.path.append(os.path.join(os.path.dirname(__file__) + '/../../'))  # Adjust the path to 
 
 from lib.orm.DB import DB
+from lib.orm.engine import engine_options
 from lib.utils import get_logger, get_logger_verbosity
-# from lib.strategy.strategy_implementor import StrategyImplementor
-from lib.strategy.strategy_implementor import StrategyImplementor
+from lib.strategy._strategy_pool import get_strategy_pool
+from lib.strategy._reason_queue import get_reason_queue, pending_key
+from scheduler import AnalysisScheduler, Checkpoint
 
 def main():
     # setup up logging
@@ -27,6 +29,11 @@ def main():
     parser.add_argument("--verbosity", "-v", dest="verbosity", type=int, choices=[0,1,2,3,4,5], help="Enable verbose output", default=5)
     parser.add_argument("--run-name", "-r", dest="run_name", type=str, help="Name of the run to evaluate")
     parser.add_argument("--force", "-f", dest="force", default=False, action="store_true", help="Force evaluation of already evaluated runs")
+    parser.add_argument("--batch-size", "-b", dest="batch_size", type=int, default=16, help="Number of conversations scored together by batch capable strategies")
+    parser.add_argument("--io-workers", dest="io_workers", type=int, default=8, help="Number of threads running the I/O bound strategies (LLM judge, remote services)")
+    parser.add_argument("--cpu-workers", dest="cpu_workers", type=int, default=1, help="Number of processes running the CPU bound model strategies, 0 to run them in process")
+    parser.add_argument("--defer-reasons", dest="defer_reasons", default=True, action=argparse.BooleanOptionalAction, help="Record the scores first and generate the score reasons concurrently afterwards")
+    parser.add_argument("--checkpoint-dir", dest="checkpoint_dir", type=str, default=os.path.join(os.path.dirname(__file__), "checkpoints"), help="Directory of the analysis checkpoints used to resume a broken analysis")
 
     args = parser.parse_args()
 
@@ -98,7 +105,7 @@ def main():
 
     try:
         logger.info(f"Database URL: {db_url}")
-        db = DB(db_url=db_url, debug=False, loglevel=loglevel)
+        db = DB(db_url=db_url, debug=False, loglevel=loglevel, **engine_options(config["database"]))
     except Exception as e:
         logger.error(f"Failed to connect to the database: {e}")
         return
@@ -115,17 +122,15 @@ def main():
         logger.error(f"Run '{args.run_name}' is not completed. Current status: {run.status}")
         return
 
-    run_details = db.get_all_run_details_by_run_name(run_name=run.run_name)
+    # load the run details along with their testcases and conversations in one go.
+    run_details = db.load_run_for_analysis(run_name=run.run_name)
     if not run_details:
         logger.error(f"No run details found for run '{args.run_name}'.")
         return
     
-    print(run_details)
     # let's group the all the run_details by strategy for computational convenience.
     grouped_run_details = {}
-    for detail in run_details:
-        # fetch the strategy name assigned for the testcase
-        strategy_name = db.get_testcase_strategy_name(testcase_name=detail.testcase_name)
+    for detail, testcase, conversation, strategy_name in run_details:
         if not strategy_name:
             logger.error(f"Strategy not found for testcase '{detail.testcase_name}' in run '{run.run_name}'.")
             continue
@@ -133,24 +138,57 @@ def main():
         group_key = strategy_name + ":" + detail.metric_name
         if group_key not in grouped_run_details:
             grouped_run_details[group_key] = []
-        grouped_run_details[group_key].append(detail)
+        grouped_run_details[group_key].append((detail, testcase, conversation))
 
-    # brought it out from the for loop below since strategyimplementor should not have to be initialized for every strategy
-    strategy = StrategyImplementor()
+    # the analysis checkpoint of the run, it survives a crash and is removed once the analysis completes.
+    checkpoint = Checkpoint(os.path.join(args.checkpoint_dir, f"{run.run_name}.ckpt") if args.checkpoint_dir else None)
 
+    # the score reasons are generated by the reason queue, the conversations wait on their reason key.
+    reasons = get_reason_queue()
+    reasons.set_deferred(args.defer_reasons)
+    waiting_reasons = {}
+    reason_futures = {}
+
+    def queue_reason(conversation):
+        key = pending_key(conversation.evaluation_reason)
+        if key is None:
+            return
+        waiting_reasons.setdefault(key, []).append(conversation)
+        reason_futures[key] = reasons.submit(key)
+
+    def fill_reasons(wait_all=False):
+        # record the reasons generated so far (or all of them), the scores are already recorded.
+        updated = []
+        for key in [key for key, future in reason_futures.items() if wait_all or future.done()]:
+            future = reason_futures.pop(key)
+            conversations = waiting_reasons.pop(key, [])
+            try:
+                reason = future.result()
+            except Exception as e:
+                logger.error(f"Reason generation failed for {len(conversations)} conversations: {e}")
+                reason = None
+            if reason is None:
+                # leave the pending token in place, the reason is generated again by the next analysis.
+                logger.warning(f"Could not generate the reason for {len(conversations)} conversations, it stays pending.")
+                continue
+            for conversation in conversations:
+                conversation.evaluation_reason = reason
+                updated.append(conversation)
+        if updated:
+            logger.debug(f"Recording the reasons of {len(updated)} conversations in run '{run.run_name}'")
+            db.bulk_upsert_conversations(updated, override=True)
+
+    # collect the consistent (testcase, conversation) pairs of every group first, so that they can be scored as batches.
+    pending_groups = {}
     for group in grouped_run_details.keys():
         strategy_name, metric_name = group.split(":")
-
-        # instead of initializing the strategyimplementor for every strategy, we just set its name and the metric name
-        strategy.set_metric_strategy(strategy_name=strategy_name, metric_name=metric_name)
-        # Analyze the run details
-        for detail in grouped_run_details[group]:
+        pending = []
+        for detail, testcase, conversation in grouped_run_details[group]:
             # let's ignore the incomplete test cases.
             if detail.status != "COMPLETED":
                 logger.warning(f"Skipping incomplete run detail with ID {detail.detail_id} for run '{run.run_name}'. Current status: {detail.status}")
                 continue
 
-            testcase = db.get_testcase_by_name(detail.testcase_name)
             if not testcase:
                 logger.error(f"Testcase '{detail.testcase_name}' not found for run '{run.run_name}'.")
                 continue
@@ -164,13 +202,18 @@ def main():
                 continue
 
             # check if the conversation object is consistent
-            conversation = db.get_conversation_by_id(detail.conversation_id)
             if not conversation:
                 logger.error(f"Conversation with ID '{detail.conversation_id}' not found for run '{run.run_name}'.")
                 continue
+            if detail.conversation_id in checkpoint:
+                queue_reason(conversation)
+                logger.debug(f"Conversation with ID '{detail.conversation_id}' in run '{run.run_name}' is recorded in the checkpoint. Skipping re-evaluation.")
+                continue
             if conversation.evaluation_ts:
                 # if conversation has already been evaluated and not forced, skip re-evaluation
                 if not args.force:
+                    # the score is recorded, but its reason may still be pending from an earlier analysis.
+                    queue_reason(conversation)
                     logger.warning(f"Conversation with ID '{detail.conversation_id}' in run '{run.run_name}' has already been evaluated on {conversation.evaluation_ts}. Skipping re-evaluation.")
                     continue
                 # we will be re-evaluating the conversation
@@ -178,30 +221,43 @@ def main():
             if not conversation.agent_response:
                 logger.error(f"Agent response not found for conversation ID '{detail.conversation_id}' in run '{run.run_name}'.")
                 continue
-            
-            """
-            just need to change here, pass conversation and testcase objects
-            """
-            
-            logger.debug(f"Evaluating strategy '{strategy_name}' for Testcase '{detail.testcase_name}'")
-            # changed this line
-            score, reason = strategy.execute(testcase = testcase, conversation = conversation)
-            # score = strategy.execute(prompts=[testcase.prompt.user_prompt], 
-            #                          expected_responses=[testcase.response.response_text] if testcase.response else [None],
-            #                          agent_responses=[conversation.agent_response], 
-            #                          system_prompts=[testcase.prompt.system_prompt] if testcase.prompt.system_prompt else [None],
-            #                          judge_prompts=[testcase.judge_prompt.prompt] if testcase.judge_prompt else [None])
-
-            logger.debug(f"Evaluated score for conversation ID {conversation.conversation_id} in run '{run.run_name}' and Testcase '{detail.testcase_name}': {score}")
+
+            pending.append((detail, testcase, conversation))
+
+        if pending:
+            pending_groups[(strategy_name, metric_name)] = pending
+
+    def commit(strategy_name, batch, scores):
+        # record the scores of a batch right away, so that the progress is not lost if the analysis breaks midway.
+        for (detail, testcase, conversation), (score, reason) in zip(batch, scores):
+            logger.debug(f"Evaluated score for conversation ID {conversation.conversation_id} in run '{run.run_name}' and Testcase '{detail.testcase_name}' with strategy '{strategy_name}': {score}")
             # now, let's update the scores for each conversation
             conversation.evaluation_score = score
             conversation.evaluation_reason = reason
             conversation.evaluation_ts = datetime.now().isoformat()
 
-            # record the evaluation details
-            logger.debug(f"Recording evaluation score '{conversation.evaluation_score}' for Testcase '{detail.testcase_name}', conversation ID {conversation.conversation_id} in run '{run.run_name}'")
-            db.add_or_update_conversation(conversation=conversation, override=args.force)
+        logger.debug(f"Recording evaluation scores of {len(batch)} conversations in run '{run.run_name}'")
+        conv_ids = db.bulk_upsert_conversations([conversation for _, _, conversation in batch], override=args.force)
+        checkpoint.add(conv_id for conv_id in conv_ids if conv_id != -1)
+
+        # the reasons are generated in the background while the other chunks are scored.
+        for _, _, conversation in batch:
+            queue_reason(conversation)
+        fill_reasons()
+
+    scheduler = AnalysisScheduler(io_workers=args.io_workers, cpu_workers=args.cpu_workers, batch_size=args.batch_size)
+    stats = scheduler.run(pending_groups, commit)
+    logger.info(f"Analysis scheduler statistics: {stats}")
+
+    fill_reasons(wait_all=True)
+    reasons.shutdown()
+    logger.info(f"Reason queue statistics: {reasons.stats()}")
+
+    # all the chunks are recorded, the checkpoint is not needed anymore.
+    if not stats["failed_chunks"]:
+        checkpoint.finish()
+
+    logger.info(f"Strategy pool statistics: {get_strategy_pool().stats()}")
 
 if __name__ == "__main__":
     main()
-
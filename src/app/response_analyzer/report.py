@@ -14,6 +14,7 @@ from rich.table import Table
 sys.path.append(os.path.join(os.path.dirname(__file__) + '/../../'))  # Adjust the path to 
 
 from lib.orm.DB import DB
+from lib.orm.engine import engine_options
 from lib.utils import get_logger, get_logger_verbosity
 
 def main():
@@ -98,7 +99,7 @@ def main():
 
     try:
         logger.info(f"Database URL: {db_url}")
-        db = DB(db_url=db_url, debug=False, loglevel=loglevel)
+        db = DB(db_url=db_url, debug=False, loglevel=loglevel, **engine_options(config["database"]))
     except Exception as e:
         logger.error(f"Failed to connect to the database: {e}")
         return
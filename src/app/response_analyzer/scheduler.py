@@ -0,0 +1,164 @@
+# @description Schedules the evaluation of the strategy groups of a run over worker pools.
+# I/O bound strategies (LLM judge, remote model services, web APIs) are run on a thread pool, the CPU bound
+# model strategies on a process pool whose workers keep their own strategy (model) pool.
+
+import os
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# setup the relative import path for the lib module (also needed by the spawned worker processes).
+sys.path.append(os.path.join(os.path.dirname(__file__) + '/../../'))
+
+from lib.data import TestCase, Conversation
+from lib.utils import get_logger
+from lib.strategy.strategy_implementor import StrategyImplementor
+
+logger = get_logger(__name__)
+
+# strategies that spend most of their time waiting on a remote service.
+IO_BOUND_STRATEGIES = {
+    "llm_judge",
+    "safety_strategy",
+    "detect_toxicity_using_perspective_api",
+    "language",
+    "transliterated_language_strategy",
+    "fluency_score",
+    "indian_lang_grammatical_check",
+    "grammatical_strategies",
+    "truthfulness_external",
+    "uptime_calculation",
+    "compute_error_rate",
+    "compute_mtbf",
+    "tat_tpm_mvh",
+}
+
+Item = Tuple[TestCase, Conversation]
+
+
+def _score(strategy_name: str, metric_name: str, items: List[Item], batch_size: int) -> List[Tuple[float, str]]:
+    """
+    Scores a chunk of (testcase, conversation) pairs with the strategy.
+    The strategy objects come from the process wide strategy pool, so each worker process loads a model only once.
+    """
+    implementor = StrategyImplementor()
+    implementor.set_metric_strategy(strategy_name=strategy_name, metric_name=metric_name)
+    return implementor.execute_batch(items, batch_size=batch_size)
+
+
+class Checkpoint:
+    """
+    Records the conversations whose scores are committed during an analysis, one ID per line.
+    A crashed analysis started again with the same checkpoint skips the recorded conversations,
+    which also holds for forced re-evaluations where the evaluation timestamp can not be used.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done: Set[int] = set()
+        self.__lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                self.done = {int(line) for line in f if line.strip()}
+            logger.info(f"Resuming from checkpoint '{path}' with {len(self.done)} evaluated conversations.")
+
+    def __contains__(self, conversation_id: int) -> bool:
+        return conversation_id in self.done
+
+    def add(self, conversation_ids: Iterable[int]):
+        conversation_ids = [cid for cid in conversation_ids if cid is not None]
+        with self.__lock:
+            self.done.update(conversation_ids)
+            if not self.path:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.writelines(f"{cid}\n" for cid in conversation_ids)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def finish(self):
+        """
+        Removes the checkpoint once the analysis has completed.
+        """
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class AnalysisScheduler:
+    """
+    Evaluates the pending conversations of a run, grouped by (strategy, metric).
+    Every group is split into chunks of batch_size that are scored on the thread pool (I/O bound strategies)
+    or on the process pool (CPU bound strategies). The scores of each chunk are handed to the commit callback
+    from the calling thread as soon as the chunk is done, so the database is written by a single thread.
+    """
+
+    def __init__(self, io_workers: int = 8, cpu_workers: int = 1, batch_size: int = 16,
+                 io_bound_strategies: Optional[Set[str]] = None):
+        self.io_workers = max(io_workers, 1)
+        self.cpu_workers = max(cpu_workers, 0)
+        self.batch_size = max(batch_size, 1)
+        self.io_bound_strategies = set(io_bound_strategies) if io_bound_strategies is not None else IO_BOUND_STRATEGIES
+
+    def is_io_bound(self, strategy_name: str) -> bool:
+        return any(strategy_name == name or strategy_name.startswith(name + "_") for name in self.io_bound_strategies)
+
+    def run(self, groups: Dict[Tuple[str, str], List[tuple]],
+            commit: Callable[[str, List[tuple], List[Tuple[float, str]]], None]) -> Dict[str, int]:
+        """
+        Scores all the groups and commits the results chunk by chunk.
+
+        Args:
+            groups (Dict[Tuple[str, str], List[tuple]]): The pending entries per (strategy name, metric name).
+                Each entry is a tuple whose last two members are the TestCase and the Conversation.
+            commit (Callable): Called as commit(strategy_name, entries, scores) for every scored chunk.
+
+        Returns:
+            Dict[str, int]: The number of chunks and entries scored on each pool.
+        """
+        stats = {"io_chunks": 0, "cpu_chunks": 0, "entries": 0, "failed_chunks": 0}
+        io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="analyze-io")
+        # spawn the model workers, forking a process that has initialized CUDA or tokenizer threads is unsafe.
+        cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers, mp_context=multiprocessing.get_context("spawn")) if self.cpu_workers > 0 else None
+
+        futures: Dict[Future, Tuple[str, List[tuple]]] = {}
+        try:
+            for (strategy_name, metric_name), entries in groups.items():
+                io_bound = self.is_io_bound(strategy_name)
+                logger.info(f"Scheduling {len(entries)} evaluations of strategy '{strategy_name}' ({'I/O' if io_bound else 'CPU'} bound)")
+                for start in range(0, len(entries), self.batch_size):
+                    chunk = entries[start:start + self.batch_size]
+                    items = [(entry[-2], entry[-1]) for entry in chunk]
+                    if io_bound:
+                        future = io_pool.submit(_score, strategy_name, metric_name, items, self.batch_size)
+                        stats["io_chunks"] += 1
+                    elif cpu_pool is not None:
+                        future = cpu_pool.submit(_score, strategy_name, metric_name, items, self.batch_size)
+                        stats["cpu_chunks"] += 1
+                    else:
+                        # no model workers, score in the calling thread.
+                        future = Future()
+                        try:
+                            future.set_result(_score(strategy_name, metric_name, items, self.batch_size))
+                        except Exception as e:
+                            future.set_exception(e)
+                        stats["cpu_chunks"] += 1
+                    futures[future] = (strategy_name, chunk)
+
+            for future in as_completed(futures):
+                strategy_name, chunk = futures[future]
+                try:
+                    scores = future.result()
+                except Exception as e:
+                    logger.error(f"Evaluation of a chunk of {len(chunk)} entries with strategy '{strategy_name}' failed: {e}")
+                    stats["failed_chunks"] += 1
+                    continue
+                commit(strategy_name, chunk, scores)
+                stats["entries"] += len(chunk)
+        finally:
+            io_pool.shutdown(wait=True, cancel_futures=True)
+            if cpu_pool is not None:
+                cpu_pool.shutdown(wait=True, cancel_futures=True)
+        return stats
@@ -0,0 +1,128 @@
+# @description This module coalesces the concurrent requests of an endpoint into batched model calls.
+
+import asyncio
+import bisect
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from fastapi.concurrency import run_in_threadpool
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+QUEUE_DEPTH_BUCKETS = [0, 1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+class Histogram:
+    """
+    Counts of the observed values per bucket, a value is counted in the first bucket it does not exceed.
+    """
+
+    def __init__(self, buckets: Sequence[int]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.sum = 0
+        self.__lock = threading.Lock()
+
+    def observe(self, value: int):
+        with self.__lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += 1
+            self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.__lock:
+            labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+            return {
+                "buckets": dict(zip(labels, self.counts)),
+                "count": self.total,
+                "mean": round(self.sum / self.total, 2) if self.total else 0.0,
+            }
+
+class MicroBatcher:
+    """
+    Queues the requests of an endpoint and runs them through batch_fn in batches.
+    A batch is flushed once max_batch_size requests are queued or max_wait_ms has passed since its first request.
+    batch_fn takes the list of queued items and returns the list of results in the same order, it is run on the
+    thread pool and one batch runs at a time, so the model sees a single padded forward pass instead of
+    concurrent single item calls.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 16, max_wait_ms: float = 10.0):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.configure(max_batch_size, max_wait_ms)
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_depths = Histogram(QUEUE_DEPTH_BUCKETS)
+        self.failed_batches = 0
+
+    def configure(self, max_batch_size: int, max_wait_ms: float):
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max(max_wait_ms, 0) / 1000.0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queues the item and waits for its result.
+        """
+        if self.worker is None or self.worker.done():
+            # the queue and the worker are bound to the event loop serving the requests.
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self.__run(), name=f"batcher-{self.name}")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def __run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.queue_depths.observe(len(batch) + self.queue.qsize())
+            self.batch_sizes.observe(len(batch))
+            await self.__flush(batch)
+
+    async def __flush(self, batch: list):
+        items = [item for item, _ in batch]
+        try:
+            results = await run_in_threadpool(self.batch_fn, items)
+        except Exception as e:
+            self.failed_batches += 1
+            if len(batch) == 1:
+                self.__resolve(batch[0][1], exception=e)
+                return
+            # a bad input fails the whole batch, run the items one by one so that only that request fails.
+            for item, future in batch:
+                try:
+                    self.__resolve(future, result=(await run_in_threadpool(self.batch_fn, [item]))[0])
+                except Exception as item_error:
+                    self.__resolve(future, exception=item_error)
+            return
+        for (_, future), result in zip(batch, results):
+            self.__resolve(future, result=result)
+
+    @staticmethod
+    def __resolve(future: asyncio.Future, result: Any = None, exception: Optional[Exception] = None):
+        # the caller may have gone away (client disconnect) and cancelled its future.
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "failed_batches": self.failed_batches,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_depth_at_flush": self.queue_depths.snapshot(),
+        }
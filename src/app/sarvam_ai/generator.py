@@ -9,6 +9,7 @@ import sys, os, logging
 import numpy as np
 from sarvamai import SarvamAI
 import math
+import threading
 from pydantic import BaseModel
 from typing import Optional, List
 
@@ -36,6 +37,7 @@ class SarvamAIGenerator:
         self.model_loaded = False
         self.api_key_check = bool(os.environ.get('SARVAM_API_KEY'))
         self.device = torch.device("cuda")
+        self.tokenizer_lock = threading.Lock()
 
     def load_model(self, model_id: str = "sarvamai/sarvam-2b-v0.5"):
         """ Load the Sarvam AI model for text generation.
@@ -141,6 +143,66 @@ class SarvamAIGenerator:
 
         return (log_prob - uni_log_prob) / seq_len
     
+    def tokenize_batch(self, texts: List[str], padding_side: str = "right", max_length: Optional[int] = 512):
+        """
+        Tokenize a batch of texts padded to the longest one. Generation needs left padding, scoring right padding.
+        """
+        # the padding side is tokenizer state, the batches of the endpoints are tokenized one at a time.
+        with self.tokenizer_lock:
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+            self.tokenizer.padding_side = padding_side
+            inputs = self.tokenizer(texts, return_tensors="pt", padding=True,
+                                    truncation=max_length is not None, max_length=max_length)
+        return {k: v.to(self.device) for k, v in inputs.items() if k in ['input_ids', 'attention_mask']}
+
+    def generate_batch(self, prompts: List[str], max_new_tokens: int = 1024) -> List[str]:
+        """
+        Generate the text continuations of a batch of prompts in one padded pass.
+        """
+        if not self.model_loaded:
+            self.load_model()
+        inputs = self.tokenize_batch(prompts, padding_side="left", max_length=None)
+        with torch.no_grad():
+            outputs = self.model.generate(**inputs, max_new_tokens=max_new_tokens, pad_token_id=self.tokenizer.pad_token_id)
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    def get_embedding_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Return the mean pooled embeddings of a batch of texts from the last hidden state, the padding is left out of the mean.
+        """
+        inputs = self.tokenize_batch(texts)
+        with torch.no_grad():
+            outputs = self.model(**inputs, output_hidden_states=True)
+            last_hidden = outputs.hidden_states[-1]
+            mask = inputs["attention_mask"].unsqueeze(-1).to(last_hidden.dtype)
+            embeddings = (last_hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return embeddings.float().cpu().numpy()
+
+    def sequence_losses(self, texts: List[str]):
+        """
+        Return the mean token negative log likelihood and the token count of each text of a batch.
+        This is the per sequence equivalent of the loss the model returns for a single text.
+        """
+        inputs = self.tokenize_batch(texts)
+        with torch.no_grad():
+            logits = self.model(**inputs).logits
+        labels = inputs["input_ids"][:, 1:]
+        mask = inputs["attention_mask"][:, 1:].float()
+        nll = torch.nn.functional.cross_entropy(logits[:, :-1, :].float().transpose(1, 2), labels, reduction="none")
+        losses = (nll * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return losses.cpu().tolist(), inputs["attention_mask"].sum(dim=1).cpu().tolist()
+
+    def get_perplexity_batch(self, texts: List[str]) -> List[float]:
+        losses, _ = self.sequence_losses(texts)
+        return [math.exp(loss) for loss in losses]
+
+    def get_SLOR_batch(self, texts: List[str]) -> List[float]:
+        losses, _ = self.sequence_losses(texts)
+        unigram_log_prob = math.log(1.0 / len(self.tokenizer.get_vocab()))
+        # (log P(text) - seq_len * log P_unigram) / seq_len as in get_SLOR, the seq_len cancels out.
+        return [-loss - unigram_log_prob for loss in losses]
+
     def early_embedding(self, text):
         try:
             model_name = "ai4bharat/IndicBERTv2-MLM-only"
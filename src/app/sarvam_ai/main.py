@@ -6,12 +6,14 @@ from fastapi import FastAPI
 from pydantic import BaseModel
 import uvicorn
 import argparse, logging
+import asyncio
 import sys, os
-from typing import Optional
+from typing import List, Optional
 
 from translator import SarvamAITranslator
 from generator import SarvamAIGenerator
 from safety import ShieldGemmaSafety
+from batcher import MicroBatcher
 
 # Adjust the path to include the "lib" directory
 sys.path.append(os.path.dirname(__file__) + "/../../")  
@@ -29,70 +31,154 @@ from lib.utils.logger import get_logger
 #     score: float
 #     label: str
 
+class TextItem(BaseModel):
+    text: str
+
+class TextBatchRequest(BaseModel):
+    items: List[TextItem]
+
+class TranslateItem(BaseModel):
+    input_text: str
+    target_language: str
+
+class TranslateBatchRequest(BaseModel):
+    items: List[TranslateItem]
+
+class SafetyEvalItem(BaseModel):
+    prompt: str
+    agent_response: str
+    metric_name: str
+
+class SafetyEvalBatchRequest(BaseModel):
+    items: List[SafetyEvalItem]
+
 app = FastAPI(title="Sarvam AI Application")
 translator = SarvamAITranslator()
 generator = SarvamAIGenerator()
 
 safety_engine: Optional[ShieldGemmaSafety] = None
 
+# Batch functions of the micro-batched endpoints, each takes the list of queued items and returns their results in order.
+def _translate_batch(items):
+    if translator.api_key_check:
+        return [translator.token_translate(input_text, target_language) for input_text, target_language in items]
+    return translator.translate_batch(items)
+
+def _generate_batch(items):
+    if generator.api_key_check:
+        return [generator.token_completion(prompt) for prompt, _ in items]
+    # the prompts are generated together when they ask for the same number of new tokens.
+    results = [None] * len(items)
+    groups = {}
+    for i, (prompt, max_new_tokens) in enumerate(items):
+        groups.setdefault(max_new_tokens, []).append(i)
+    for max_new_tokens, indices in groups.items():
+        for i, generated in zip(indices, generator.generate_batch([items[i][0] for i in indices], max_new_tokens)):
+            results[i] = generated
+    return results
+
+def _embedding_batch(texts):
+    return generator.get_embedding_batch(texts).tolist()  # Convert numpy array to list for JSON serialization
+
+def _safety_batch(items):
+    return safety_engine.score_batch(items)
+
+batchers = {
+    "translate": MicroBatcher("translate", _translate_batch),
+    "generate": MicroBatcher("generate", _generate_batch),
+    "embedding": MicroBatcher("embedding", _embedding_batch),
+    "perplexity": MicroBatcher("perplexity", lambda texts: generator.get_perplexity_batch(texts)),
+    "slor": MicroBatcher("slor", lambda texts: generator.get_SLOR_batch(texts)),
+    "safety_eval": MicroBatcher("safety_eval", _safety_batch),
+}
+
 @app.post("/translate")
-def translate_text(input_text: str, target_language: str):
+async def translate_text(input_text: str, target_language: str):
     """
     Translate the input text to the target language using Sarvam AI.
     """
-    if translator.api_key_check:
-        logger.info("The Sarvam Model will get loaded to your machine!")
-        translated_text = translator.token_translate(input_text, target_language)
-    else:
-        logger.info("The Sarvam API Key is used!")
-        translated_text = translator.translate(input_text, target_language)
+    translated_text = await batchers["translate"].submit((input_text, target_language))
     return {"input": input_text, "translated": translated_text, "language": target_language}
 
 @app.post("/generate")
-def generate_text(prompt: str, max_new_tokens: int = 1024):
+async def generate_text(prompt: str, max_new_tokens: int = 1024):
     """
     Generate text continuation from a given prompt using Sarvam AI.
     """
-    if generator.api_key_check:
-        generated_text = generator.token_completion(prompt)
-    else:
-        generated_text = generator.generate(prompt, max_new_tokens)
+    generated_text = await batchers["generate"].submit((prompt, max_new_tokens))
     return {"prompt": prompt, "generated": generated_text}
 
 @app.post("/embedding")
-def get_embedding(text: str):
+async def get_embedding(text: str):
     """
     Get the embedding for the input text using Sarvam AI.
     """
-    embedding = generator.get_embedding(text)
-    embedding = embedding.tolist()  # Convert numpy array to list for JSON serialization
+    embedding = await batchers["embedding"].submit(text)
     print("Final embedding length:", len(embedding))
     return {"text": text, "embedding": embedding}
 
 @app.post("/safety_eval")
-def evaluate_safety(prompt: str, agent_response: str, metric_name: str):
+async def evaluate_safety(prompt: str, agent_response: str, metric_name: str):
     """
     Get the Safety Violation score using Google Shieldgemma-2b model
     """
     try:
-        score = safety_engine.evaluate(prompt=prompt, response=agent_response, metric=metric_name)
+        score = await batchers["safety_eval"].submit((prompt, agent_response, metric_name))
         label = "Violation Likely" if score >= 0.5 else "No Violation"
         return {"score": score, "label": label}
     except Exception as e:
         raise Exception(f"Safety evaluation failed: {str(e)}")
 
 @app.post("/perplexity")
-def get_perplexity(text : str):
-    perplexity = generator.get_perplexity(text)
+async def get_perplexity(text : str):
+    perplexity = await batchers["perplexity"].submit(text)
     print(f"Perplexity : {perplexity}")
     return {"text" : text, "perplexity" : perplexity}
 
 @app.post("/slor")
-def get_perplexity(text : str):
-    slor = generator.get_SLOR(text)
+async def get_slor(text : str):
+    slor = await batchers["slor"].submit(text)
     print(f"SLOR : {slor}")
     return {"text" : text, "SLOR" : slor}
 
+# The batch endpoints queue their items on the same batchers as the single text endpoints,
+# so the items of a request are coalesced with the concurrent requests of the other callers.
+@app.post("/translate_batch")
+async def translate_batch(request: TranslateBatchRequest):
+    """
+    Translate a batch of texts to their target languages using Sarvam AI.
+    """
+    translated = await asyncio.gather(*[batchers["translate"].submit((item.input_text, item.target_language)) for item in request.items])
+    return {"translated": list(translated)}
+
+@app.post("/safety_eval_batch")
+async def evaluate_safety_batch(request: SafetyEvalBatchRequest):
+    """
+    Get the Safety Violation scores of a batch of (prompt, agent response, metric) using Google Shieldgemma-2b model
+    """
+    try:
+        scores = await asyncio.gather(*[batchers["safety_eval"].submit((item.prompt, item.agent_response, item.metric_name)) for item in request.items])
+    except Exception as e:
+        raise Exception(f"Safety evaluation failed: {str(e)}")
+    return {"score": list(scores), "label": ["Violation Likely" if score >= 0.5 else "No Violation" for score in scores]}
+
+@app.post("/perplexity_batch")
+async def get_perplexity_batch(request: TextBatchRequest):
+    perplexity = await asyncio.gather(*[batchers["perplexity"].submit(item.text) for item in request.items])
+    return {"perplexity": list(perplexity)}
+
+@app.post("/slor_batch")
+async def get_slor_batch(request: TextBatchRequest):
+    slor = await asyncio.gather(*[batchers["slor"].submit(item.text) for item in request.items])
+    return {"SLOR": list(slor)}
+
+@app.get("/batching/stats")
+def get_batching_stats():
+    """
+    Get the batch size and queue depth histograms of the micro-batched endpoints.
+    """
+    return {name: batcher.stats() for name, batcher in batchers.items()}
+
 @app.post("/hidden")
 def get_hidden(text : str):
     hidden_vecs = generator.early_embedding(text)
@@ -108,6 +194,8 @@ if __name__ == "__main__":
     parser.add_argument("--generator-model", "-g", type=str, default="sarvamai/sarvam-2b-v0.5", help="Sarvam AI generator model name", dest="generator_model")
     parser.add_argument("--safety-model", "-s", type=str, default="google/shieldgemma-2b", help="ShieldGemma safety model name", dest="safety_model")
     parser.add_argument("--force-cpu", action="store_true", help="Force CPU usage for the translator model", dest="force_cpu")
+    parser.add_argument("--max-batch-size", "-b", type=int, default=16, help="Maximum number of requests of an endpoint run as one batch", dest="max_batch_size")
+    parser.add_argument("--max-wait-ms", "-w", type=float, default=10.0, help="Maximum time a request waits for its batch to fill up, in milliseconds", dest="max_wait_ms")
 
     args = parser.parse_args()
 
@@ -143,5 +231,9 @@ if __name__ == "__main__":
     safety_engine = ShieldGemmaSafety(metric="misuse", loglevel=loglevel)
     safety_engine.load_model()
 
+    for batcher in batchers.values():
+        batcher.configure(args.max_batch_size, args.max_wait_ms)
+    logger.info(f"Micro-batching the endpoints with max batch size {args.max_batch_size} and max wait {args.max_wait_ms} ms")
+
     # Run the FastAPI application
     uvicorn.run(app, host=args.host, port=args.port)
\ No newline at end of file
@@ -64,6 +64,30 @@ class SarvamAITranslator:
         output_text = self.tokenizer.decode(output_ids, skip_special_tokens=True)
         return output_text.strip()
     
+    def translate_batch(self, items):
+        """
+        Translate a batch of (input_text, target_language) pairs in one padded generation pass.
+        """
+        if not self.model_loaded:
+            self.load_model()
+
+        texts = [self.tokenizer.apply_chat_template([{"role": "system", "content": f"Translate the text below to {target_language}."},
+                                                     {"role": "user", "content": input_text}],
+                                                    tokenize=False, add_generation_prompt=True)
+                 for input_text, target_language in items]
+
+        # left padding, so that the generated tokens of every row start right after its prompt.
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = "left"
+        model_inputs = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.model.device)
+
+        generated_ids = self.model.generate(**model_inputs, max_new_tokens=1024,
+                                            do_sample=False, temperature=0.01,
+                                            num_return_sequences=1, pad_token_id=self.tokenizer.pad_token_id)
+        output_ids = generated_ids[:, model_inputs.input_ids.shape[1]:]
+        return [text.strip() for text in self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)]
+
     def token_translate(self, input_text, target_language, model_name = "sarvam-translate:v1"):
         SARVAM_API_KEY = os.getenv("SARVAM_API_KEY")
         client = SarvamAI(api_subscription_key=SARVAM_API_KEY)
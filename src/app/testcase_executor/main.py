@@ -10,6 +10,8 @@ import sys
 import os
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from rich.console import Console
 from rich.table import Table
 from datetime import datetime
@@ -17,11 +19,209 @@ import randomname  # Importing the randomname library for generating random name
 
 sys.path.append(os.path.dirname(__file__) + "/../../")  # Adjust the path to include the "lib" directory
 
-from lib.interface_manager import InterfaceManagerClient  # Import the InterfaceManagerClient from the lib directory
+from lib.interface_manager import InterfaceManagerClient, RateLimiter, get_rate_limiter  # Import the InterfaceManagerClient from the lib directory
 from lib.orm import DB  # Import the DB class from the ORM module
+from lib.orm.engine import engine_options
 from lib.data import Target, Run, RunDetail, Conversation
 from lib.utils import get_logger, get_logger_verbosity
 
+# WhatsApp targets share a single browser session, so their test cases can not be run in parallel.
+SERIAL_APPLICATION_TYPES = {"WHATSAPP_WEB"}
+# WebApp targets are served by the browser pool of the interface manager, as many at a time as it has browsers.
+POOLED_APPLICATION_TYPES = {"WEBAPP"}
+
+class ResultWriter:
+    """ Buffers the outcome of the executed test cases and writes them to the database in batches.
+    The conversations are written before the run details so that a COMPLETED run detail always has its agent response.
+    Unflushed results are lost on a crash, those test cases stay RUNNING and are executed again when the run is continued.
+    """
+    def __init__(self, db: DB, run_name: str, logger: logging.Logger, flush_size: int = 16, db_lock = None):
+        self.db = db
+        self.run_name = run_name
+        self.logger = logger
+        self.flush_size = max(flush_size, 1)
+        self.db_lock = db_lock if db_lock is not None else threading.Lock()
+        self.__lock = threading.Lock()
+        self.__pending = []
+
+    def add(self, rundetail: RunDetail, conv: Conversation):
+        with self.__lock:
+            self.__pending.append((rundetail, conv))
+            if len(self.__pending) < self.flush_size:
+                return
+            pending, self.__pending = self.__pending, []
+        self.__write(pending)
+
+    def flush(self):
+        with self.__lock:
+            pending, self.__pending = self.__pending, []
+        self.__write(pending)
+
+    def __write(self, pending: list):
+        if not pending:
+            return
+        with self.db_lock:
+            self.db.bulk_upsert_conversations([conv for _, conv in pending])
+            self.db.bulk_upsert_run_details(self.run_name, [rundetail for rundetail, _ in pending])
+        self.logger.debug(f"Recorded the results of {len(pending)} test cases.")
+
+def execute_testcase(db: DB, client: InterfaceManagerClient, run_name: str, testcase, rundetail: RunDetail, conv: Conversation,
+                     logger: logging.Logger, writer: ResultWriter, rate_limiter: RateLimiter = None, stream: bool = False) -> str:
+    """ Executes a single test case of a run. The run detail and the conversation are expected to be created already,
+    the run detail is moved to RUNNING right away and the outcome (COMPLETED/FAILED) is handed over to the writer.
+    With stream, the response is streamed and the first token timestamp and the token counts are recorded too.
+
+    Returns:
+        str: The final status of the run detail.
+    """
+    logger.debug(f"Executing Test {testcase.name} (Case ID: {testcase.testcase_id})")
+
+    # construct the message to send to the agent
+    message_to_agent = testcase.prompt.user_prompt if testcase.prompt.user_prompt else ""
+    if testcase.prompt.system_prompt:
+        message_to_agent = testcase.prompt.system_prompt + " " + message_to_agent
+
+    rundetail.status = "RUNNING"
+    with writer.db_lock:
+        db.bulk_upsert_run_details(run_name, [rundetail])
+
+    try:
+        if rate_limiter is not None:
+            waited = rate_limiter.acquire(RateLimiter.estimate_tokens(message_to_agent))
+            if waited > 0:
+                logger.debug(f"Rate limiter held test case {testcase.testcase_id} for {waited:.2f}s")
+
+        conv.prompt_ts = datetime.now().isoformat()
+
+        # send the prompt to the agent via the interface manager client
+        streamed = None
+        if stream:
+            streamed = client.chat_stream(chat_id=testcase.testcase_id, prompt_list=[message_to_agent])
+            agent_response = [{"response": streamed["response"]}] if streamed["response"] else []
+        else:
+            response_from_agent = client.chat(chat_id = testcase.testcase_id, prompt_list=[message_to_agent])
+            agent_response = response_from_agent.json().get("response", "")
+
+        # Check if the response is empty or indicates a chat not found
+        # Here, we will leave the Conversation entry dangling in the DB to indicate the the conversation was not successful.
+        if len(agent_response) == 0 or agent_response[0]['response'] == "Chat not found" \
+            or agent_response[0]['response'].strip() == "[Error: Max retries exceeded]":
+            logger.error(f"No response received from the agent for test case {testcase.testcase_id}.")
+            rundetail.status = "FAILED"
+        else:
+            conv.response_ts = datetime.now().isoformat()
+            conv.agent_response = agent_response[0]['response']
+            if streamed is not None:
+                # timed by the client as the response arrived
+                conv.first_token_ts = streamed["first_token_ts"]
+                conv.response_ts = streamed["response_ts"]
+                conv.prompt_tokens = streamed["prompt_tokens"]
+                conv.completion_tokens = streamed["completion_tokens"]
+            rundetail.status = "COMPLETED"
+
+    except Exception as e:
+        logger.error(f"Error during execution of test case {testcase.testcase_id}: {e}")
+        rundetail.status = "FAILED"
+
+    writer.add(rundetail, conv)
+    return rundetail.status
+
+def get_browser_pool_size(client: InterfaceManagerClient, logger: logging.Logger) -> int:
+    """ Returns the number of browsers the interface manager serves the WebApp chats with, 1 if it can not be read.
+    This is the size the pool was started with, not the browser_pool_size of the current config. """
+    try:
+        return max(int(client.browser_pool().get("size", 1)), 1)
+    except (RuntimeError, ValueError, TypeError) as e:
+        logger.warning(f"Could not read the browser pool size of the interface manager: {e}")
+        return 1
+
+def execute_testcases(db: DB, client_factory, target_name: str, run_name: str, plan_name: str, testcases: list, logger: logging.Logger,
+                      concurrency: int = 1, rate_limiter: RateLimiter = None, flush_size: int = 16, stream: bool = False) -> dict:
+    """ Executes the test cases of a run, either one after the other or through a bounded pool of worker threads.
+    The run details and conversations of all the test cases are created up front in two bulk transactions, the already
+    completed ones are skipped. Each worker thread holds its own InterfaceManagerClient, created through client_factory.
+
+    Returns:
+        dict: The number of test cases that ended in each status.
+    """
+    summary = {"COMPLETED": 0, "FAILED": 0, "SKIPPED": 0}
+
+    # create (or fetch) the run details of all the test cases at once.
+    rundetails = [RunDetail(run_name=run_name, plan_name=plan_name, metric_name=testcase.metric, testcase_name=testcase.name) for testcase in testcases]
+    detail_ids = db.bulk_upsert_run_details(run_name, rundetails)
+
+    jobs = []
+    for testcase, rundetail, detail_id in zip(testcases, rundetails, detail_ids):
+        if detail_id == -1:
+            logger.error(f"Could not create the run detail for test case {testcase.name} (ID: {testcase.testcase_id}).")
+            summary["FAILED"] += 1
+        # if the run detail is already completed, skip the execution.
+        elif rundetail.status == "COMPLETED":
+            logger.debug(f"Run detail for testcase {testcase.name} (ID: {testcase.testcase_id}) is already completed. Skipping execution.")
+            summary["SKIPPED"] += 1
+        else:
+            conv = Conversation(target=target_name, run_detail_id=detail_id, testcase=testcase.name)
+            jobs.append((testcase, rundetail, conv))
+    if not jobs:
+        return summary
+
+    # even if a conversation already exists (a crash of an earlier attempt), it is reset, so that the
+    # response of this execution is recorded.
+    conv_ids = db.bulk_upsert_conversations([conv for _, _, conv in jobs], override=True)
+    logger.debug(f"Created the conversations {conv_ids} for the test cases to execute.")
+
+    writer = ResultWriter(db, run_name, logger, flush_size=flush_size)
+
+    if concurrency <= 1:
+        client = client_factory()
+        try:
+            for testcase, rundetail, conv in jobs:
+                status = execute_testcase(db, client, run_name, testcase, rundetail, conv, logger, writer, rate_limiter=rate_limiter, stream=stream)
+                summary[status] = summary.get(status, 0) + 1
+        finally:
+            writer.flush()
+            try:
+                # close the client session.
+                client.close()
+            except Exception as e:
+                logger.error(f"Error closing the client connection: {e}")
+        return summary
+
+    logger.info(f"Executing {len(jobs)} test cases with {concurrency} workers")
+    local = threading.local()
+    clients = []
+    clients_lock = threading.Lock()
+
+    def worker(testcase, rundetail, conv):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = client_factory()
+            local.client = client
+            with clients_lock:
+                clients.append(client)
+        return execute_testcase(db, client, run_name, testcase, rundetail, conv, logger, writer, rate_limiter=rate_limiter, stream=stream)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="testcase") as pool:
+            futures = {pool.submit(worker, *job): job[0] for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    status = future.result()
+                except Exception as e:
+                    logger.error(f"Worker failed for test case {futures[future].testcase_id}: {e}")
+                    status = "FAILED"
+                summary[status] = summary.get(status, 0) + 1
+    finally:
+        writer.flush()
+
+    # all the workers share the same server side session, so closing it once is enough.
+    try:
+        if clients:
+            clients[0].close()
+    except Exception as e:
+        logger.error(f"Error closing the client connection: {e}")
+    return summary
+
 def main():
     """ Main function to handle command-line arguments and execute test cases.
     This function initializes the argument parser, processes the command-line arguments,
@@ -62,6 +262,10 @@ def main():
     parser.add_argument("--verbosity", "-v", dest="verbosity", type=int, choices=[0,1,2,3,4,5], help="Enable verbose output", default=5)
     parser.add_argument("--language-strict", "-l", dest="language_strict", action="store_true", help="Enable strict language matching for test case selection based on target's language")
     parser.add_argument("--domain-strict", "-d", dest="domain_strict", action="store_true", help="Enable strict domain matching for test case selection based on target's domain")
+    parser.add_argument("--concurrency", "-j", dest="concurrency", type=int, default=1, help="Number of test cases executed concurrently (API targets, WebApp targets up to the browser pool size of the interface manager, default: 1)")
+    parser.add_argument("--rps", dest="rps", type=float, default=None, help="Maximum requests per second sent to the target (default: unlimited)")
+    parser.add_argument("--tpm", dest="tpm", type=int, default=None, help="Maximum prompt tokens per minute sent to the target (default: unlimited)")
+    parser.add_argument("--no-stream", dest="no_stream", action="store_true", help="Do not stream the responses of API targets (no time to first token and token counts)")
 
     args = parser.parse_args()
 
@@ -139,7 +343,7 @@ def main():
 
     try:
         logger.info(f"Database URL: {db_url}")
-        db = DB(db_url=db_url, debug=False, loglevel=loglevel)
+        db = DB(db_url=db_url, debug=False, loglevel=loglevel, **engine_options(config["db"]))
     except Exception as e:
         logger.error(f"Failed to connect to the database: {e}")
         return
@@ -323,6 +527,40 @@ def main():
             logger.error("Test plan ID is mandatory with optionally a test case or metric ID to be provided for execution.")
             return
         
+        # API targets serve any number of concurrent conversations, WebApp targets one per browser of the pool
+        # and WhatsApp targets stay serialized.
+        concurrency = max(args.concurrency, 1)
+        if concurrency > 1 and application_type in SERIAL_APPLICATION_TYPES:
+            logger.warning(f"Concurrent execution is not supported for '{application_type}' targets, executing the test cases one at a time.")
+            concurrency = 1
+        if concurrency > 1 and application_type in POOLED_APPLICATION_TYPES:
+            pool_size = get_browser_pool_size(InterfaceManagerClient(base_url="http://localhost:8000", application_type=application_type, agent_name=agent_name), logger)
+            if concurrency > pool_size:
+                logger.warning(f"The interface manager has {pool_size} browser(s) for '{application_type}' targets, executing {pool_size} test cases at a time.")
+                concurrency = pool_size
+        # the API targets are streamed, to record the time to first token and the token counts.
+        stream = application_type == "API" and not args.no_stream
+        rate_limiter = get_rate_limiter(target.target_name, rps=args.rps, tpm=args.tpm)
+
+        # Push the target configuration to the interface manager once, every worker then binds a client to it.
+        config_synced = False
+        config_lock = threading.Lock()
+        def client_factory() -> InterfaceManagerClient:
+            nonlocal config_synced
+            # Initialize the InterfaceManagerClient with the provided configuration
+            client = InterfaceManagerClient(base_url="http://localhost:8000" ,application_type=application_type, agent_name=agent_name)
+            with config_lock:
+                if not config_synced:
+                    client.sync_config({
+                        "application_name": application_name,
+                        "application_type": application_type,
+                        "agent_name": agent_name,
+                        "application_url": application_url
+                    })
+                    config_synced = True
+                client.apply_server_config()
+            return client
+
         # handle the "run" by creating a new run entry in the database or
         # using an existing "incomplete run" if the run name is provided
         if args.run_name is None:
@@ -392,81 +630,14 @@ def main():
                 run.status = "RUNNING"
                 db.add_or_update_testrun(run=run)
 
-                # create or update the run detail entry for the test case
-                rundetail = RunDetail(run_name=args.run_name, plan_name=plan_name, metric_name=testcase.metric, testcase_name=testcase.name)
-                rundetail_id = db.add_or_update_testrun_detail(rundetail)
-
-                # fetch the run detail status.
-                # if the run detail is already completed, skip the execution.
-                run_status = db.get_status_by_run_detail_id(run_detail_id=rundetail_id)
-                if run_status is not None and run_status == "COMPLETED":
-                    logger.debug(f"Run detail for testcase {testcase.name} (ID: {testcase.testcase_id}) is already completed. Skipping execution.")
-                else:
-                    logger.debug(f"Executing Test {testcase.name} (Case ID: {testcase.testcase_id})")
-
-                    conv = Conversation(target=target.target_name, 
-                                        run_detail_id=rundetail_id, 
-                                        testcase=testcase.name)
-                    # even if the conversation already exists, we will override it with the new information.
-                    conv_id = db.add_or_update_conversation(conversation=conv, override=True)
-
-                    # construct the message to send to the agent
-                    message_to_agent = testcase.prompt.user_prompt if testcase.prompt.user_prompt else ""
-                    if testcase.prompt.system_prompt:
-                        message_to_agent = testcase.prompt.system_prompt + " " + message_to_agent
-
-                    logger.debug(f"A new conversation is created with ID: {conv_id}")
-
-                    rundetail.status = "RUNNING"
-                    db.add_or_update_testrun_detail(rundetail)
-
-                    # Initialize the InterfaceManagerClient with the provided configuration
-                    client = InterfaceManagerClient(base_url="http://localhost:8000" ,application_type=application_type, agent_name=agent_name)
-                    client.sync_config({
-                        "application_name": application_name,
-                        "application_type": application_type,
-                        "agent_name": agent_name,
-                        "application_url": application_url
-                    })
-                    client.apply_server_config()
-
-                    try:
-                        conv.prompt_ts = datetime.now().isoformat()
-                        db.add_or_update_conversation(conversation=conv)
-
-                        response_from_agent = client.chat(chat_id = testcase.testcase_id, prompt_list=[message_to_agent])
-                        agent_response = response_from_agent.json().get("response", "")
-
-                        # Check if the response is empty or indicates a chat not found
-                        # Here, we will leave the Conversation entry dangling in the DB to indicate the the conversation was not successful.
-                        if len(agent_response) == 0 or agent_response[0]['response'] == "Chat not found":
-                            logger.error(f"No response received from the agent for test case {testcase.testcase_id}.")
-                            rundetail.status = "FAILED"
-                            db.add_or_update_testrun_detail(rundetail)
-                        else:
-                            conv.response_ts = datetime.now().isoformat()
-                            conv.agent_response = agent_response[0]['response']
-                            db.add_or_update_conversation(conversation=conv)
-
-                            rundetail.status = "COMPLETED"
-                            db.add_or_update_testrun_detail(rundetail)
-
-                            # Update the run status with the end timestamp
-                            run.end_ts = datetime.now().isoformat()
-                            run.status = "COMPLETED"
-                            db.add_or_update_testrun(run=run)
-                            logger.debug(f"Execution of test case '{testcase.name}' completed successfully.")
-
-                    except Exception as e:
-                        logger.error(f"Error during execution of test case {testcase.testcase_id}: {e}")
-                        rundetail.status = "FAILED"
-                        db.add_or_update_testrun_detail(rundetail)
-
-                    finally:
-                        try:
-                            client.close()
-                        except Exception as e:
-                            logger.error(f"Error closing the client connection: {e}")
+                # execute the test case, the run detail and conversation are recorded by the helper.
+                summary = execute_testcases(db, client_factory, target.target_name, run_name, plan_name, [testcase], logger,
+                                            rate_limiter=rate_limiter, stream=stream)
+                if summary["COMPLETED"]:
+                    # Update the run status with the end timestamp
+                    run.end_ts = datetime.now().isoformat()
+                    run.status = "COMPLETED"
+                    db.add_or_update_testrun(run=run)
 
             # if the metric id is supplied, we will execute the testcases for the metric                            
             elif args.metric_id:
@@ -505,78 +676,10 @@ def main():
                 run.status = "RUNNING"
                 db.add_or_update_testrun(run=run)
 
-                # Initialize the InterfaceManagerClient with the provided configuration
-                client = InterfaceManagerClient(base_url="http://localhost:8000" ,application_type=application_type, agent_name=agent_name)
-                client.sync_config({
-                    "application_name": application_name,
-                    "application_type": application_type,
-                    "agent_name": agent_name,
-                    "application_url": application_url
-                })
-                client.apply_server_config()
-
                 # iterate through the test cases and execute
-                for testcase in testcases:
-                    # create a new run detail entry for each test case
-                    rundetail = RunDetail(run_name=run_name, plan_name=plan_name, metric_name=testcase.metric, testcase_name=testcase.name)
-                    rundetail_id = db.add_or_update_testrun_detail(rundetail)
-                    
-                    # fetch the run detail status.
-                    # if the run detail is already completed, skip the execution.
-                    run_status = db.get_status_by_run_detail_id(run_detail_id=rundetail_id)
-                    if run_status is not None and run_status == "COMPLETED":
-                        logger.debug(f"Run detail for testcase {testcase.name} (ID: {testcase.testcase_id}) is already completed. Skipping execution.")
-                        continue
-
-                    logger.debug(f"Executing Test {testcase.name} (Case ID: {testcase.testcase_id})")
-
-                    # construct the message to send to the agent
-                    message_to_agent = testcase.prompt.user_prompt if testcase.prompt.user_prompt else ""
-                    if testcase.prompt.system_prompt:
-                        message_to_agent = testcase.prompt.system_prompt + " " + message_to_agent
-
-                    conv = Conversation(target=target.target_name, 
-                                        run_detail_id=rundetail_id, 
-                                        testcase=testcase.name)
-                    conv_id = db.add_or_update_conversation(conversation=conv)
-                    logger.debug(f"A new conversation is created with ID: {conv_id}")
-
-                    rundetail.status = "RUNNING"
-                    db.add_or_update_testrun_detail(rundetail)
-
-                    try:
-                        conv.prompt_ts = datetime.now().isoformat()
-                        db.add_or_update_conversation(conversation=conv)
-
-                        response_from_agent = client.chat(chat_id = testcase.testcase_id, prompt_list=[message_to_agent])
-                        agent_response = response_from_agent.json().get("response", "")
-
-                        # Check if the response is empty or indicates a chat not found
-                        # Here, we will leave the Conversation entry dangling in the DB to indicate the the conversation was not successful.
-                        if len(agent_response) == 0 or agent_response[0]['response'] == "Chat not found":
-                            logger.error(f"No response received from the agent for test case {testcase.testcase_id}.")
-                            rundetail.status = "FAILED"
-                            db.add_or_update_testrun_detail(rundetail)
-                            continue
-
-                        conv.response_ts = datetime.now().isoformat()
-                        conv.agent_response = agent_response[0]['response']
-                        db.add_or_update_conversation(conversation=conv)
-
-                        rundetail.status = "COMPLETED"
-                        db.add_or_update_testrun_detail(rundetail)
-
-                    except Exception as e:
-                        logger.error(f"Error during execution of test case {testcase.testcase_id}: {e}")
-                        rundetail.status = "FAILED"
-                        db.add_or_update_testrun_detail(rundetail)
-                        continue
-
-                try:
-                    # close the client session.
-                    client.close()
-                except Exception as e:
-                    logger.error(f"Error closing the client connection: {e}")
+                summary = execute_testcases(db, client_factory, target.target_name, run_name, plan_name, testcases, logger,
+                                            concurrency=concurrency, rate_limiter=rate_limiter, stream=stream)
+                logger.debug(f"Test case execution summary: {summary}")
 
                 # Update the run status to completed
                 run.end_ts = datetime.now().isoformat()
@@ -601,79 +704,10 @@ def main():
                 run.status = "RUNNING"
                 db.add_or_update_testrun(run=run)
 
-                # Initialize the InterfaceManagerClient with the provided configuration
-                client = InterfaceManagerClient(base_url="http://localhost:8000" ,application_type=application_type, agent_name=agent_name)
-                client.sync_config({
-                    "application_name": application_name,
-                    "application_type": application_type,
-                    "agent_name": agent_name,
-                    "application_url": application_url
-                })
-                client.apply_server_config()
-
                 # iterate through the test cases and execute
-                for testcase in testcases:
-                    # create a new run detail entry for each test case
-                    rundetail = RunDetail(run_name=run_name, plan_name=plan_name, metric_name=testcase.metric, testcase_name=testcase.name)
-                    rundetail_id = db.add_or_update_testrun_detail(rundetail)
-                    
-                    # fetch the run detail status.
-                    # if the run detail is already completed, skip the execution.
-                    run_status = db.get_status_by_run_detail_id(run_detail_id=rundetail_id)
-                    if run_status is not None and run_status == "COMPLETED":
-                        logger.debug(f"Run detail for testcase {testcase.name} (ID: {testcase.testcase_id}) is already completed. Skipping execution.")
-                        continue
-
-                    logger.debug(f"Executing Test {testcase.name} (Case ID: {testcase.testcase_id})")
-
-                    # construct the message to send to the agent
-                    message_to_agent = testcase.prompt.user_prompt if testcase.prompt.user_prompt else ""
-                    if testcase.prompt.system_prompt:
-                        message_to_agent = testcase.prompt.system_prompt + " " + message_to_agent
-
-                    conv = Conversation(target=target.target_name, 
-                                        run_detail_id=rundetail_id, 
-                                        testcase=testcase.name)
-                    conv_id = db.add_or_update_conversation(conversation=conv)
-                    logger.debug(f"A new conversation is created with ID: {conv_id}")
-
-                    rundetail.status = "RUNNING"
-                    db.add_or_update_testrun_detail(rundetail)
-
-                    try:
-                        conv.prompt_ts = datetime.now().isoformat()
-                        db.add_or_update_conversation(conversation=conv)
-
-                        # send the prompt to the agent via the interface manager client
-                        response_from_agent = client.chat(chat_id = testcase.testcase_id, prompt_list=[message_to_agent])
-                        agent_response = response_from_agent.json().get("response", "")
-
-                        # Check if the response is empty or indicates a chat not found
-                        # Here, we will leave the Conversation entry dangling in the DB to indicate the the conversation was not successful.
-                        if len(agent_response) == 0 or agent_response[0]['response'] == "Chat not found" \
-                            or agent_response[0]['response'].strip() == "[Error: Max retries exceeded]":
-                            logger.error(f"No response received from the agent for test case {testcase.testcase_id}.")
-                            rundetail.status = "FAILED"
-                            db.add_or_update_testrun_detail(rundetail)
-                            continue
-
-                        conv.response_ts = datetime.now().isoformat()
-                        conv.agent_response = agent_response[0]['response']
-                        db.add_or_update_conversation(conversation=conv)
-
-                        rundetail.status = "COMPLETED"
-                        db.add_or_update_testrun_detail(rundetail)
-
-                    except Exception as e:
-                        logger.error(f"Error during execution of test case {testcase.testcase_id}: {e}")
-                        rundetail.status = "FAILED"
-                        db.add_or_update_testrun_detail(rundetail)
-                        continue
-
-                try:
-                    client.close()
-                except Exception as e:
-                    logger.error(f"Error closing the client connection: {e}")
+                summary = execute_testcases(db, client_factory, target.target_name, run_name, plan_name, testcases, logger,
+                                            concurrency=concurrency, rate_limiter=rate_limiter, stream=stream)
+                logger.debug(f"Test case execution summary: {summary}")
 
                 # Update the run status to completed
                 run.end_ts = datetime.now().isoformat()
@@ -1,6 +1,22 @@
-from .data import Prompt, Language, Domain, Response, TestCase, TestPlan, \
-    Strategy, Metric, LLMJudgePrompt, Target, Conversation, Run, RunDetail
-from .orm import DB, Base, Languages, Domains, Metrics, Responses, TestCases, \
-      TestPlans, Prompts
-from .interface_manager import InterfaceManagerClient
-from .utils import get_logger
+import importlib
+
+# The names are resolved on first access, so that importing a sub package (lib.strategy, lib.data ..)
+# does not pull in the ORM and the interface manager along with their dependencies.
+_EXPORTS = {
+    **{name: ".data" for name in ("Prompt", "Language", "Domain", "Response", "TestCase", "TestPlan",
+                                  "Strategy", "Metric", "LLMJudgePrompt", "Target", "Conversation", "Run", "RunDetail")},
+    **{name: ".orm" for name in ("DB", "Base", "Languages", "Domains", "Metrics", "Responses", "TestCases",
+                                 "TestPlans", "Prompts")},
+    "InterfaceManagerClient": ".interface_manager",
+    "get_logger": ".utils",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
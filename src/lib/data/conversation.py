@@ -15,6 +15,9 @@ class Conversation(BaseModel):
         agent_response (str): The response generated by the AI agent.
         prompt_ts (str): ISO Timestamp when the test case prompt was sent.
         response_ts (str): ISO Timestamp when the agent response was received.
+        first_token_ts (str): ISO Timestamp when the first token of a streamed agent response was received.
+        prompt_tokens (int): Number of prompt tokens reported by the target.
+        completion_tokens (int): Number of agent response tokens reported by the target.
         evaluation_score (float): The evaluation score assigned to the agent response.
         evaluation_reason (str): The reason or explanation for the evaluation score.
         evaluation_ts (str): ISO Timestamp when the evaluation was performed.
@@ -26,13 +29,17 @@ class Conversation(BaseModel):
     agent_response: Optional[str] = Field(None, description="The response generated by the AI agent.")
     prompt_ts: Optional[str] = Field(None, description="ISO Timestamp when the test case prompt was sent.")
     response_ts: Optional[str] = Field(None, description="ISO Timestamp when the AI agent response was received.")
+    first_token_ts: Optional[str] = Field(None, description="ISO Timestamp when the first token of a streamed agent response was received.")
+    prompt_tokens: Optional[int] = Field(None, description="Number of prompt tokens reported by the target.")
+    completion_tokens: Optional[int] = Field(None, description="Number of agent response tokens reported by the target.")
     evaluation_score: Optional[float] = Field(None, description="The evaluation score assigned to the agent response.")
     evaluation_reason: Optional[str] = Field(None, description="The reason or explanation for the evaluation score.")
     evaluation_ts:Optional[str] = Field(None, description="ISO Timestamp when the evaluation was performed.")
     kwargs: dict = Field(default_factory=dict, description="Additional keyword arguments for future extensibility")
 
     def __init__(self, target: str, run_detail_id: int, testcase: str, agent_response: Optional[str] = None, prompt_ts: Optional[str] = None, response_ts: Optional[str] = None,
-                 evaluation_score: Optional[float] = None, evaluation_reason: Optional[str] = None, evaluation_ts: Optional[str] = None, **kwargs):
+                 evaluation_score: Optional[float] = None, evaluation_reason: Optional[str] = None, evaluation_ts: Optional[str] = None,
+                 first_token_ts: Optional[str] = None, prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None, **kwargs):
         """
         Initializes a Conversation instance.
         Args:
@@ -41,10 +48,14 @@ class Conversation(BaseModel):
             agent_response (str): The response generated by the AI agent.
             prompt_ts (str): ISO Timestamp when the test case prompt was sent.
             response_ts (str): ISO Timestamp when the agent response was received.
+            first_token_ts (str): ISO Timestamp when the first token of a streamed agent response was received.
+            prompt_tokens (int): Number of prompt tokens reported by the target.
+            completion_tokens (int): Number of agent response tokens reported by the target.
             kwargs: Additional keyword arguments for future extensibility.
         """
         super().__init__(target=target, run_detail_id=run_detail_id, testcase=testcase, agent_response=agent_response, prompt_ts=prompt_ts, response_ts=response_ts,
-                         evaluation_score=evaluation_score, evaluation_reason=evaluation_reason, evaluation_ts=evaluation_ts, kwargs=kwargs)
+                         evaluation_score=evaluation_score, evaluation_reason=evaluation_reason, evaluation_ts=evaluation_ts,
+                         first_token_ts=first_token_ts, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, kwargs=kwargs)
 
     def __getattr__(self, name: str) -> Any:
         """
@@ -1 +1,2 @@
-from .client import InterfaceManagerClient
\ No newline at end of file
+from .client import InterfaceManagerClient
+from .rate_limiter import RateLimiter, get_rate_limiter
\ No newline at end of file
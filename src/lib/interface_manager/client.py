@@ -4,6 +4,7 @@ from pydantic import BaseModel
 from collections import defaultdict
 import os, sys
 import json 
+from datetime import datetime
 from requests import Response
 
 # Third-party model packages
@@ -95,6 +96,10 @@ class InterfaceManagerClient:
     def close(self) -> requests.Response:
         return self._get("close")
 
+    def browser_pool(self) -> dict[str, Any]:
+        """Returns the size and the browsers in use of the WebApp browser pool of the server."""
+        return self._get("browser_pool").json()
+
     def chat(self, chat_id: int, prompt_list: List[str]):
         prompt = " ".join(prompt_list)
 
@@ -105,21 +110,67 @@ class InterfaceManagerClient:
 
         # Unified API flow
         if self.application_type == "API":
-            payload = {
-                "chat_id": chat_id,
-                "prompt_list": prompt_list,
-                "api_context": {
-                    "provider": self._auto_detect_provider(),
-                    "agent_name": self.agent_name,
-                    "base_url": self.local_llm_base_url,
-                    "run_mode": self.run_mode,
-                }
-            }
-            return self._post("chat", json=payload)
+            return self._post("chat", json=self._api_payload(chat_id, prompt_list))
 
 
         raise RuntimeError(f"Unsupported application type: {self.application_type}")
 
+    def chat_stream(self, chat_id: int, prompt_list: List[str]) -> dict:
+        """
+        Sends the prompts to an API target through the streaming /chat/stream endpoint and times the response as it arrives.
+
+        Returns:
+            dict: "response" (the whole text), "first_token_ts" and "response_ts" (ISO timestamps of the first token and of
+                  the end of the response, as received here), "prompt_tokens" and "completion_tokens" (None when the
+                  target does not report them).
+        """
+        if self.application_type != "API":
+            raise RuntimeError(f"Streaming chat is not supported for application type: {self.application_type}")
+
+        url = f"{self.base_url}/chat/stream"
+        result = {"response": "", "first_token_ts": None, "response_ts": None, "prompt_tokens": None, "completion_tokens": None}
+        try:
+            with self.session.post(url, json=self._api_payload(chat_id, prompt_list), timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                # chunk_size=None hands the events over as soon as they arrive, not once a buffer is full.
+                for line in response.iter_lines(chunk_size=None):
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event["event"] == "token":
+                        if result["first_token_ts"] is None:
+                            result["first_token_ts"] = datetime.now().isoformat()
+                    elif event["event"] == "done":
+                        result.update(response=event.get("response", ""),
+                                      response_ts=datetime.now().isoformat(),
+                                      prompt_tokens=event.get("prompt_tokens"),
+                                      completion_tokens=event.get("completion_tokens"))
+                    elif event["event"] == "error":
+                        raise RuntimeError(f"Streaming chat failed: {event.get('detail')}")
+        except requests.HTTPError as e:
+            raise RuntimeError(
+                f"POST request to {url} failed: {e.response.status_code} - {e.response.text}"
+            ) from e
+        except requests.RequestException as e:
+            raise RuntimeError(f"POST request to {url} failed: {e}") from e
+
+        if result["response_ts"] is None:
+            raise RuntimeError(f"The chat stream of {url} ended without a response")
+        self.logger.debug(f"Streamed response: first token at {result['first_token_ts']}, completed at {result['response_ts']}")
+        return result
+
+    def _api_payload(self, chat_id: int, prompt_list: List[str]) -> dict:
+        return {
+            "chat_id": chat_id,
+            "prompt_list": prompt_list,
+            "api_context": {
+                "provider": self._auto_detect_provider(),
+                "agent_name": self.agent_name,
+                "base_url": self.local_llm_base_url,
+                "run_mode": self.run_mode,
+            }
+        }
+
     def _wrap_dict_as_response(self, data: dict) -> Response:
         resp = Response()
         resp.status_code = 200
@@ -0,0 +1,87 @@
+# @description: Client side rate limiting of the prompts sent to a target application.
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter for a single target.
+    Limits both the requests per second (rps) and the tokens per minute (tpm) sent to the target.
+    A limit of None (or <= 0) disables that limit. The limiter is thread-safe, callers block in acquire()
+    until both buckets can serve the request.
+    """
+
+    def __init__(self, rps: Optional[float] = None, tpm: Optional[int] = None):
+        self.rps = rps if rps and rps > 0 else None
+        self.tpm = tpm if tpm and tpm > 0 else None
+        self._lock = threading.Lock()
+        now = time.monotonic()
+        # start with full buckets, a burst of at most one second worth of requests is allowed.
+        self._req_tokens = max(self.rps, 1.0) if self.rps else 0.0
+        self._tok_tokens = float(self.tpm) if self.tpm else 0.0
+        self._last = now
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """
+        Rough token count of a prompt (about 4 characters per token), good enough for budgeting.
+        """
+        return max(1, len(text or "") // 4)
+
+    def _refill(self, now: float):
+        elapsed = now - self._last
+        self._last = now
+        if self.rps:
+            self._req_tokens = min(max(self.rps, 1.0), self._req_tokens + elapsed * self.rps)
+        if self.tpm:
+            self._tok_tokens = min(float(self.tpm), self._tok_tokens + elapsed * self.tpm / 60.0)
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Blocks until a request of the given token count can be sent.
+
+        Args:
+            tokens (int): The estimated number of tokens of the request.
+
+        Returns:
+            float: The time (in seconds) spent waiting.
+        """
+        if not self.rps and not self.tpm:
+            return 0.0
+        # a single request larger than the minute budget would never be served, so clip it.
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                req_wait = 0.0 if not self.rps or self._req_tokens >= 1.0 else (1.0 - self._req_tokens) / self.rps
+                tok_wait = 0.0 if not self.tpm or self._tok_tokens >= tokens else (tokens - self._tok_tokens) * 60.0 / self.tpm
+                wait = max(req_wait, tok_wait)
+                if wait <= 0:
+                    if self.rps:
+                        self._req_tokens -= 1.0
+                    if self.tpm:
+                        self._tok_tokens -= tokens
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(target_name: str, rps: Optional[float] = None, tpm: Optional[int] = None) -> RateLimiter:
+    """
+    Returns the rate limiter of the target, creating it with the given limits on first use.
+    All the workers talking to the same target share one limiter.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(target_name)
+        if limiter is None or (limiter.rps, limiter.tpm) != (rps if rps and rps > 0 else None, tpm if tpm and tpm > 0 else None):
+            limiter = RateLimiter(rps=rps, tpm=tpm)
+            _limiters[target_name] = limiter
+        return limiter
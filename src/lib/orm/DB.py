@@ -1,7 +1,7 @@
-from sqlalchemy import create_engine, select, update
-from sqlalchemy.orm import sessionmaker, scoped_session, joinedload
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker, scoped_session, joinedload, selectinload
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 from  sqlalchemy.sql.expression import func
 import sys
 import os
@@ -16,6 +16,9 @@ sys.path.append(os.path.dirname(__file__) + '/..')
 
 from data import Prompt, Language, Domain, Response, TestCase, TestPlan, \
     Strategy, Metric, LLMJudgePrompt, Target, Conversation, Run, RunDetail
+from .lookup_cache import LookupCache, cached_lookup, invalidates
+from .migrations import migrate
+from .engine import DEFAULT_SQLITE_PROFILE, create_db_engine
 from .tables import Base, Languages, Domains, Metrics, Responses, TestCases, \
     TestPlans, Prompts, Strategies, LLMJudgePrompts, Targets, Conversations, \
         TestRuns, TestRunDetails, TestPlanMetricMapping, TargetLanguages
@@ -36,7 +39,9 @@ class DB:
     It uses SQLAlchemy for ORM and supports MariaDB as the database backend.
     """
 
-    def __init__(self, db_url: str, debug:bool, pool_size:int = 5, max_overflow:int = 10, loglevel=logging.DEBUG):
+    def __init__(self, db_url: str, debug:bool, pool_size:int = 5, max_overflow:int = 10, loglevel=logging.DEBUG,
+                 cache_size:int = 4096, cache_ttl:float = 300.0, sqlite_profile:str = DEFAULT_SQLITE_PROFILE,
+                 sqlite_pragmas:Optional[dict] = None):
         """
         Initializes the DB instance with the provided database URL and host.
         
@@ -45,12 +50,19 @@ class DB:
             debug (bool): If True, enables debug mode for SQLAlchemy.
             pool_size (int): The size of the connection pool.
             max_overflow (int): The maximum number of connections that can be created beyond the pool size.
+            cache_size (int): The maximum number of name -> ID lookups cached in process (0 disables the cache).
+            cache_ttl (float): The time (in seconds) a cached lookup stays valid.
+            sqlite_profile (str): The pragma profile of a SQLite database ("tuned", "safe" or "none").
+            sqlite_pragmas (dict): SQLite pragmas set on top of the profile.
         """
         self.db_url = db_url
-        self.engine = create_engine(self.db_url, echo=debug, pool_size=pool_size, max_overflow=max_overflow)
+        self.engine = create_db_engine(self.db_url, echo=debug, pool_size=pool_size, max_overflow=max_overflow,
+                                       sqlite_profile=sqlite_profile, pragmas=sqlite_pragmas)
         # Create all tables in the database
         # This will create the tables defined in the ORM models if they do not exist.
         Base.metadata.create_all(self.engine)
+        # create_all does not change the existing tables, the indexes and constraints added since then come from the migrations.
+        self.schema_version = migrate(self.engine)
         # Create a scoped session to manage database sessions
         # A scoped session is a thread-safe session that can be used across multiple threads.
         self.Session = scoped_session(sessionmaker(bind=self.engine))
@@ -58,6 +70,15 @@ class DB:
         # Set up logging
         self.logger = get_logger(__name__, loglevel=loglevel)
 
+        # Cache of the name -> ID lookups of the dimension tables, shared by all the session threads.
+        self.lookup_cache = LookupCache(max_size=cache_size, ttl=cache_ttl)
+
+    def cache_stats(self) -> dict:
+        """
+        Returns the hit/miss statistics of the name -> ID lookup cache.
+        """
+        return self.lookup_cache.stats()
+
     @property
     def languages(self) -> List[Language]:
         """
@@ -315,6 +336,7 @@ class DB:
             stats = {row.lang_id : row.judge_prompt_count for row in result}
             return stats
     
+    @cached_lookup("strategy")
     def add_or_get_strategy_id(self, strategy_name: str) -> int:
         """
         Fetches the ID of a strategy by its name.
@@ -500,6 +522,7 @@ class DB:
             return None
 
 
+    @cached_lookup("language")
     def get_language_name(self, lang_id: int) -> Optional[str]:
         """
         Fetches the name of a language by its ID.
@@ -578,6 +601,7 @@ class DB:
             self.logger.error(f"Domain '{domain_name}' already exists or domain_id conflict. Error: {e}")
             return None
 
+    @cached_lookup("domain")
     def get_domain_id(self, domain_name: str) -> Optional[int]:
         """
         Fetches the ID of a domain by its name.
@@ -744,6 +768,7 @@ class DB:
             self.logger.error(f"Test case '{testcase}' does not exist.")
             return None
 
+    @invalidates("testcase")
     def update_testcase_record(self, testcase_id: int, updates: dict) -> Optional[TestCases]:
         """
         Updates a test case similar to v1 method but using v2 style.
@@ -927,6 +952,7 @@ class DB:
                 return testcase
 
 
+    @invalidates("testcase")
     def delete_testcase_record(self, testcase_id: int) -> bool:
         """
         Deletes a test case by ID.
@@ -2068,6 +2094,7 @@ class DB:
         finally:
             session.close()
 
+    @cached_lookup("target")
     def get_target_id(self, target_name: str) -> Optional[int]:
         """
         Fetches the ID of a target by its name.
@@ -2342,6 +2369,7 @@ class DB:
             self.logger.error(f"Run already exists: {run}. Error: {e}")
             return -1
         
+    @cached_lookup("run")
     def get_run_id(self, run_name: str) -> Optional[int]:
         """
         Fetches the ID of a test run by its name.
@@ -2381,6 +2409,7 @@ class DB:
             return result
 
 
+    @invalidates("domain")
     def create_domain_v2(self, payload: dict) -> int:
         with self.Session() as session:
             if (
@@ -2397,6 +2426,7 @@ class DB:
             session.refresh(new_domain)
             return new_domain.domain_id
 
+    @invalidates("domain")
     def update_domain_v2(self, domain_id: int, updates: dict) -> Optional[dict]:
         """Updates a domain similar to the v1 logic but returns a v2-style dict."""
         with self.Session() as session:
@@ -2427,6 +2457,7 @@ class DB:
                 "domain_name": domain.domain_name
             }
 
+    @invalidates("domain")
     def delete_domain_record(self, domain_id: int) -> bool:
         with self.Session() as session:
             domain = (
@@ -2449,6 +2480,7 @@ class DB:
             return True
 
 
+    @invalidates("language")
     def create_language_v2(self, payload: str, next_id: int) -> Optional[Languages]:
         with self.Session() as session:
             if (
@@ -2465,6 +2497,7 @@ class DB:
             session.refresh(new_language)
             return new_language.lang_id
 
+    @invalidates("language")
     def update_language_v2(self, lang_id: int, updates: dict) -> Optional[dict]:
         """Updates a language similar to the v1 logic but returns a v2-style dict."""
         with self.Session() as session:
@@ -2499,6 +2532,7 @@ class DB:
             
             return language_updated
 
+    @invalidates("language")
     def delete_language_record(self, lang_id: int) -> bool:
         with self.Session() as session:
             language = (
@@ -3010,6 +3044,7 @@ class DB:
             session.commit()
             return True
 
+    @invalidates("strategy")
     def create_strategy_v2(self, payload: dict) -> int:
         with self.Session() as session:
             if (
@@ -3030,6 +3065,7 @@ class DB:
             session.refresh(new_strategy)
             return new_strategy.strategy_id
 
+    @invalidates("strategy")
     def update_strategy_v2(self, strategy_id: int, updates: dict) -> Optional[dict]:
         """Updates a strategy similar to the v1 logic but returns a v2-style dict.
 
@@ -3114,6 +3150,7 @@ class DB:
         }
 
 
+    @invalidates("strategy")
     def delete_strategy_record(self, strategy_id: int) -> bool:
         with self.Session() as session:
             strategy = (
@@ -3178,6 +3215,7 @@ class DB:
             session.refresh(new_target)
             return new_target.target_id
 
+    @invalidates("target")
     def update_target_by_id(self, target_id: int, updates: dict) -> Optional[dict]:
         """
         Updates a target similar to v1 method but using v2 style.
@@ -3274,6 +3312,7 @@ class DB:
             return target
 
 
+    @invalidates("target")
     def delete_target_record(self, target_id: int) -> bool:
         """
         Deletes a target by ID.
@@ -3323,6 +3362,7 @@ class DB:
                             strategy=result.strategy.strategy_name)
 
 
+    @invalidates("target")
     def delete_target_record(self, target_id: int) -> bool:
         """
         Deletes a target by ID.
@@ -3389,6 +3429,7 @@ class DB:
                 return None
             return getattr(result, 'testcase_name')
         
+    @cached_lookup("testcase")
     def get_testcase_id(self, testcase_name: str) -> Optional[int]:
         """
         Fetches the ID of a test case by its name.
@@ -3446,6 +3487,7 @@ class DB:
                 return None
             return getattr(result, 'metric_name')
         
+    @cached_lookup("metric")
     def get_metric_id(self, metric_name: str) -> Optional[int]:
         """
         Fetches the ID of a metric by its name.
@@ -3482,6 +3524,7 @@ class DB:
                 return None
             return getattr(result, 'plan_name')
         
+    @cached_lookup("testplan")
     def get_testplan_id(self, plan_name: str) -> Optional[int]:
         """
         Fetches the ID of a test plan by its name.
@@ -3525,6 +3568,77 @@ class DB:
                               status=getattr(result, "testcase_status"),
                               detail_id=result.detail_id) for result in results]
 
+    def load_run_for_analysis(self, run_name: str) -> List[Tuple[RunDetail, TestCase, Optional[Conversation], str]]:
+        """
+        Fetches all the run details of a run along with their test case, conversation and strategy name,
+        for the response analyzer. The related rows are eager loaded, so the whole run is read with a handful
+        of queries instead of several queries per run detail.
+
+        Args:
+            run_name (str): The name of the run to fetch.
+
+        Returns:
+            List[Tuple[RunDetail, TestCase, Optional[Conversation], str]]: The (run detail, test case, conversation, strategy name)
+            tuples of the run. The conversation is None if it was never recorded.
+        """
+        with self.Session() as session:
+            sql = select(TestRunDetails).join(TestRuns, TestRunDetails.run_id == TestRuns.run_id) \
+                                        .where(TestRuns.run_name == run_name) \
+                                        .options(joinedload(TestRunDetails.run),
+                                                 joinedload(TestRunDetails.metric),
+                                                 joinedload(TestRunDetails.plan),
+                                                 joinedload(TestRunDetails.testcase).joinedload(TestCases.prompt),
+                                                 joinedload(TestRunDetails.testcase).joinedload(TestCases.response),
+                                                 joinedload(TestRunDetails.testcase).joinedload(TestCases.judge_prompt),
+                                                 joinedload(TestRunDetails.testcase).joinedload(TestCases.strategy),
+                                                 joinedload(TestRunDetails.testcase).selectinload(TestCases.metrics),
+                                                 selectinload(TestRunDetails.conversation).joinedload(Conversations.target)) \
+                                        .order_by(TestRunDetails.detail_id)
+            results = session.execute(sql).unique().scalars().all()
+
+            loaded = []
+            for result in results:
+                tc = result.testcase
+                conv = result.conversation[0] if result.conversation else None
+                detail = RunDetail(run_name=result.run.run_name,
+                                   testcase_name=tc.testcase_name,
+                                   metric_name=result.metric.metric_name,
+                                   plan_name=result.plan.plan_name,
+                                   conversation_id=conv.conversation_id if conv else None,
+                                   status=getattr(result, "testcase_status"),
+                                   detail_id=result.detail_id)
+                testcase = TestCase(name=getattr(tc, 'testcase_name'),
+                                    metric=tc.metrics[0].metric_name,  # use the first metric associated with the test case
+                                    testcase_id=getattr(tc, 'testcase_id'),
+                                    prompt=Prompt(prompt_id=getattr(tc.prompt, 'prompt_id'),
+                                                  user_prompt=str(tc.prompt.user_prompt),
+                                                  system_prompt=str(tc.prompt.system_prompt),
+                                                  lang_id=getattr(tc.prompt, 'lang_id')),
+                                    response=Response(response_text=str(tc.response.response_text),
+                                                      response_type=tc.response.response_type,
+                                                      response_id=getattr(tc.response, 'response_id'),
+                                                      prompt_id=tc.response.prompt_id,
+                                                      lang_id=tc.response.lang_id,
+                                                      digest=tc.response.hash_value) if tc.response else None,
+                                    judge_prompt=LLMJudgePrompt(prompt=str(tc.judge_prompt.prompt),
+                                                                lang_id=getattr(tc.judge_prompt, 'lang_id')) if tc.judge_prompt else None,
+                                    strategy=tc.strategy.strategy_name)
+                conversation = Conversation(target=conv.target.target_name,
+                                            run_detail_id=getattr(conv, "detail_id"),
+                                            testcase=tc.testcase_name,
+                                            agent_response=getattr(conv, "agent_response"),
+                                            prompt_ts=conv.prompt_ts.isoformat() if getattr(conv, "prompt_ts") else None,
+                                            response_ts=conv.response_ts.isoformat() if getattr(conv, "response_ts") else None,
+                                            first_token_ts=conv.first_token_ts.isoformat() if getattr(conv, "first_token_ts") else None,
+                                            prompt_tokens=getattr(conv, "prompt_tokens"),
+                                            completion_tokens=getattr(conv, "completion_tokens"),
+                                            evaluation_score=getattr(conv, "evaluation_score"),
+                                            evaluation_reason=getattr(conv, "evaluation_reason"),
+                                            evaluation_ts=conv.evaluation_ts.isoformat() if getattr(conv, "evaluation_ts") else None,
+                                            conversation_id=getattr(conv, 'conversation_id')) if conv else None
+                loaded.append((detail, testcase, conversation, tc.strategy.strategy_name))
+            return loaded
+
     def get_run_detail_by_id(self, detail_id: int) -> Optional[RunDetail]:
         """
         Fetches a test run detail by its ID.
@@ -3628,7 +3742,13 @@ class DB:
                 # Return the ID of the newly added run detail
                 return getattr(new_run_detail, "detail_id")
         except IntegrityError as e:
-            # Handle the case where the run detail already exists
+            # Handle the case where the run detail already exists, another writer may have added the same
+            # (run, test case) pair in between and the unique index keeps a single one.
+            with self.Session() as session:
+                existing_detail_id = session.query(TestRunDetails.detail_id).filter_by(run_id=run_id, testcase_id=testcase_id).scalar()
+            if existing_detail_id is not None:
+                self.logger.debug(f"RunDetail for Run ID {run_id} and TestCase ID {testcase_id} was added concurrently. Returning its ID: {existing_detail_id}")
+                return existing_detail_id
             self.logger.error(f"RunDetail already exists: {run_detail}. Error: {e}")
             return -1
         
@@ -3714,6 +3834,58 @@ class DB:
                 return None
             return getattr(result, 'testcase_status')
         
+    def __merge_conversation(self, existing: Conversations, conversation: Conversation, override: bool) -> Optional[bool]:
+        """
+        Merges the supplied conversation details into an existing conversation row.
+        The evaluation details are written once the agent response is recorded, the agent response
+        details are written when they are newly available or when override is requested.
+
+        Args:
+            existing (Conversations): The conversation row loaded in the current session.
+            conversation (Conversation): The conversation details to merge.
+            override (bool): Overwrite the details that are already recorded.
+
+        Returns:
+            Optional[bool]: True if the row was updated, False if nothing changed, None if the update is invalid.
+        """
+        # update the evaluation details
+        if (existing.evaluation_ts is None or override) and conversation.evaluation_ts is not None:
+            if existing.agent_response is None:
+                self.logger.error(f"Cannot update evaluation details for Conversation (RunDetailId:{conversation.run_detail_id}) as the agent response is not yet recorded.")
+                return None
+            
+            if not override:
+                self.logger.debug(f"Updating existing conversation details (Evaluation score: {conversation.evaluation_score}, reason and timestamp: {conversation.evaluation_ts}) ..")
+            else:
+                self.logger.debug(f"Overwriting existing conversation details (Evaluation score: {conversation.evaluation_score}, reason and timestamp: {conversation.evaluation_ts}) ..")                            
+                
+            # Update the existing conversation with the new details
+            setattr(existing, "evaluation_score", conversation.evaluation_score)
+            setattr(existing, "evaluation_reason", conversation.evaluation_reason)
+            setattr(existing, "evaluation_ts", self._ensure_datetime(conversation.evaluation_ts))
+        # update the agent response details.
+        else:
+            if existing.prompt_ts is None and conversation.prompt_ts is not None:
+                self.logger.debug(f"Updating existing conversation details (Prompt timestamp: {conversation.prompt_ts}) ..")
+            elif existing.agent_response is None and conversation.agent_response is not None:
+                self.logger.debug(f"Updating existing conversation details (Agent response text and Response timestamp: {conversation.response_ts}) ..")
+            elif existing.response_ts is None and conversation.response_ts is not None:
+                self.logger.debug(f"Updating existing conversation details (Agent response text and Response timestamp: {conversation.response_ts}) ..")
+            elif override:
+                self.logger.debug(f"Updating existing conversation details with the supplied 'override' information. (RunDetailId:{conversation.run_detail_id}) ..")
+            else:
+                self.logger.debug(f"Existing conversation (RunDetailId:{conversation.run_detail_id}) will not be updated. Returning conversation ID: {existing.conversation_id}")
+                return False
+
+            # Update the existing conversation with the new details
+            setattr(existing, "agent_response", conversation.agent_response)
+            setattr(existing, "prompt_ts", self._ensure_datetime(conversation.prompt_ts))
+            setattr(existing, "response_ts", self._ensure_datetime(conversation.response_ts))
+            setattr(existing, "first_token_ts", self._ensure_datetime(conversation.first_token_ts))
+            setattr(existing, "prompt_tokens", conversation.prompt_tokens)
+            setattr(existing, "completion_tokens", conversation.completion_tokens)
+        return True
+
     def add_or_update_conversation(self, conversation: Conversation, override:bool = False) -> int:
         """
         Adds a new conversation to the database or fetches its ID if it already exists.
@@ -3735,41 +3907,13 @@ class DB:
                 # Check if the conversation already exists in the database
                 existing_conversation = session.query(Conversations).filter_by(detail_id=conversation.run_detail_id).first()
                 if existing_conversation:
-                    # update the evaluation details
-                    if (existing_conversation.evaluation_ts is None or override) and conversation.evaluation_ts is not None:
-                        if existing_conversation.agent_response is None:
-                            self.logger.error(f"Cannot update evaluation details for Conversation (RunDetailId:{conversation.run_detail_id}) as the agent response is not yet recorded.")
-                            return -1
-                        
-                        if not override:
-                            self.logger.debug(f"Updating existing conversation details (Evaluation score: {conversation.evaluation_score}, reason and timestamp: {conversation.evaluation_ts}) ..")
-                        else:
-                            self.logger.debug(f"Overwriting existing conversation details (Evaluation score: {conversation.evaluation_score}, reason and timestamp: {conversation.evaluation_ts}) ..")                            
-                            
-                        # Update the existing conversation with the new details
-                        setattr(existing_conversation, "evaluation_score", conversation.evaluation_score)
-                        setattr(existing_conversation, "evaluation_reason", conversation.evaluation_reason)
-                        setattr(existing_conversation, "evaluation_ts", self._ensure_datetime(conversation.evaluation_ts))
-                    # update the agent response details.
-                    else:
-                        if existing_conversation.prompt_ts is None and conversation.prompt_ts is not None:
-                            self.logger.debug(f"Updating existing conversation details (Prompt timestamp: {conversation.prompt_ts}) ..")
-                        elif existing_conversation.agent_response is None and conversation.agent_response is not None:
-                            self.logger.debug(f"Updating existing conversation details (Agent response text and Response timestamp: {conversation.response_ts}) ..")
-                        elif existing_conversation.response_ts is None and conversation.response_ts is not None:
-                            self.logger.debug(f"Updating existing conversation details (Agent response text and Response timestamp: {conversation.response_ts}) ..")
-                        elif override:
-                            self.logger.debug(f"Updating existing conversation details with the supplied 'override' information. (RunDetailId:{conversation.run_detail_id}) ..")
-                        else:
-                            self.logger.debug(f"Existing conversation (RunDetailId:{conversation.run_detail_id}) will not be updated. Returning conversation ID: {existing_conversation.conversation_id}")
-                            # Return the ID of the existing conversation if it already exists
-                            return getattr(existing_conversation, "conversation_id")
-
-                        # Update the existing conversation with the new details
-                        setattr(existing_conversation, "agent_response", conversation.agent_response)
-                        setattr(existing_conversation, "prompt_ts", self._ensure_datetime(conversation.prompt_ts))
-                        setattr(existing_conversation, "response_ts", self._ensure_datetime(conversation.response_ts))
-                    
+                    updated = self.__merge_conversation(existing_conversation, conversation, override)
+                    if updated is None:
+                        return -1
+                    if not updated:
+                        # Return the ID of the existing conversation if it already exists
+                        return getattr(existing_conversation, "conversation_id")
+
                     # Commit the session to save the updated conversation
                     session.commit()
                     # Ensure conversation_id is populated
@@ -3788,6 +3932,9 @@ class DB:
                                                 agent_response=conversation.agent_response,
                                                 prompt_ts=self._ensure_datetime(conversation.prompt_ts),
                                                 response_ts=self._ensure_datetime(conversation.response_ts),
+                                                first_token_ts=self._ensure_datetime(conversation.first_token_ts),
+                                                prompt_tokens=conversation.prompt_tokens,
+                                                completion_tokens=conversation.completion_tokens,
                                                 evaluation_score=conversation.evaluation_score,
                                                 evaluation_reason=conversation.evaluation_reason,
                                                 evaluation_ts=self._ensure_datetime(conversation.evaluation_ts)
@@ -3810,6 +3957,205 @@ class DB:
             self.logger.error(f"Conversation already exists: {conversation}. Error: {e}")
             return -1
 
+    # number of keys sent in a single IN (...) clause by the bulk APIs.
+    BULK_CHUNK_SIZE = 500
+
+    def __resolve_names(self, session, id_column, name_column, names: List[str]) -> dict:
+        """
+        Resolves a set of names to their IDs with chunked IN queries in the supplied session.
+
+        Args:
+            session: The active database session.
+            id_column: The ID column of the dimension table.
+            name_column: The name column of the dimension table.
+            names (List[str]): The names to resolve.
+
+        Returns:
+            dict: Mapping of the names found in the table to their IDs.
+        """
+        names = list({name for name in names if name is not None})
+        mapping = {}
+        for i in range(0, len(names), self.BULK_CHUNK_SIZE):
+            chunk = names[i:i + self.BULK_CHUNK_SIZE]
+            for name, id_ in session.execute(select(name_column, id_column).where(name_column.in_(chunk))).all():
+                mapping[name] = id_
+        return mapping
+
+    def bulk_upsert_run_details(self, run: Union[Run, str], run_details: List[RunDetail]) -> List[int]:
+        """
+        Adds or updates the run details of a run in a single transaction.
+        The run, test case, metric and test plan names are resolved once for the whole batch, and the new
+        run details are inserted together. The status rules of add_or_update_testrun_detail apply, a run detail
+        is only moved to a higher status. On return, every RunDetail carries the stored status and its 'detail_id'.
+        Run details that already carry a 'detail_id' are updated by ID without resolving their names.
+
+        Args:
+            run (Union[Run, str]): The run (or the name of the run) the details belong to.
+            run_details (List[RunDetail]): The run details to add or update.
+
+        Returns:
+            List[int]: The IDs of the run details in the order supplied, -1 for the entries that could not be stored.
+        """
+        run_name = run.run_name if isinstance(run, Run) else run
+        if not run_details:
+            return []
+
+        try:
+            with self.Session() as session:
+                run_id = session.execute(select(TestRuns.run_id).where(TestRuns.run_name == run_name)).scalar_one_or_none()
+                if run_id is None:
+                    self.logger.error(f"Run with name '{run_name}' does not exist. Cannot add run details.")
+                    return [-1] * len(run_details)
+
+                unresolved = [rd for rd in run_details if rd.kwargs.get("detail_id") is None]
+                testcase_ids = self.__resolve_names(session, TestCases.testcase_id, TestCases.testcase_name, [rd.testcase_name for rd in unresolved])
+                metric_ids = self.__resolve_names(session, Metrics.metric_id, Metrics.metric_name, [rd.metric_name for rd in unresolved])
+                plan_ids = self.__resolve_names(session, TestPlans.plan_id, TestPlans.plan_name, [rd.plan_name for rd in unresolved])
+
+                # load the existing run details of the batch, keyed by the test case and by the detail ID.
+                by_testcase, by_id = {}, {}
+                keys = list(set(testcase_ids.values()))
+                for i in range(0, len(keys), self.BULK_CHUNK_SIZE):
+                    sql = select(TestRunDetails).where(TestRunDetails.run_id == run_id, TestRunDetails.testcase_id.in_(keys[i:i + self.BULK_CHUNK_SIZE]))
+                    for row in session.execute(sql).scalars().all():
+                        by_testcase.setdefault(row.testcase_id, row)
+                        by_id[row.detail_id] = row
+                keys = list({rd.kwargs["detail_id"] for rd in run_details if rd.kwargs.get("detail_id") is not None} - set(by_id))
+                for i in range(0, len(keys), self.BULK_CHUNK_SIZE):
+                    sql = select(TestRunDetails).where(TestRunDetails.run_id == run_id, TestRunDetails.detail_id.in_(keys[i:i + self.BULK_CHUNK_SIZE]))
+                    for row in session.execute(sql).scalars().all():
+                        by_id[row.detail_id] = row
+
+                rows = []
+                new_rows = []
+                for rd in run_details:
+                    if rd.kwargs.get("detail_id") is not None:
+                        existing = by_id.get(rd.kwargs["detail_id"])
+                        if existing is None:
+                            self.logger.error(f"RunDetail with ID '{rd.kwargs['detail_id']}' does not exist in Run '{run_name}'.")
+                            rows.append(None)
+                            continue
+                    else:
+                        testcase_id = testcase_ids.get(rd.testcase_name)
+                        metric_id = metric_ids.get(rd.metric_name)
+                        plan_id = plan_ids.get(rd.plan_name)
+                        if testcase_id is None or metric_id is None or plan_id is None:
+                            self.logger.error(f"Cannot add run detail, TestCase '{rd.testcase_name}', Metric '{rd.metric_name}' or TestPlan '{rd.plan_name}' does not exist.")
+                            rows.append(None)
+                            continue
+                        existing = by_testcase.get(testcase_id)
+                        if existing is None:
+                            # forcing the status to be "NEW"
+                            existing = TestRunDetails(run_id=run_id,
+                                                      testcase_id=testcase_id,
+                                                      testcase_status="NEW",
+                                                      plan_id=plan_id,
+                                                      metric_id=metric_id)
+                            by_testcase[testcase_id] = existing
+                            new_rows.append(existing)
+                            rows.append(existing)
+                            continue
+
+                    # the status of an existing run detail only moves forward.
+                    if self.__status_compare(rd.status, getattr(existing, "testcase_status")) > 0:
+                        setattr(existing, "testcase_status", rd.status)
+                    rows.append(existing)
+
+                session.add_all(new_rows)
+                # a single flush writes all the inserts and updates of the batch.
+                session.flush()
+                ids = []
+                for rd, row in zip(run_details, rows):
+                    if row is None:
+                        ids.append(-1)
+                        continue
+                    rd.status = getattr(row, "testcase_status")
+                    rd.kwargs["detail_id"] = getattr(row, "detail_id")
+                    ids.append(rd.kwargs["detail_id"])
+                session.commit()
+
+                self.logger.debug(f"Stored {len(run_details)} run details of Run '{run_name}' ({len(new_rows)} new) in a single transaction.")
+                return ids
+        except IntegrityError as e:
+            self.logger.error(f"Failed to store the run details of Run '{run_name}'. Error: {e}")
+            return [-1] * len(run_details)
+
+    def bulk_upsert_conversations(self, conversations: List[Conversation], override:bool = False) -> List[int]:
+        """
+        Adds or updates a batch of conversations in a single transaction.
+        The target names are resolved once for the whole batch, and the new conversations are inserted together.
+        The update rules of add_or_update_conversation apply to the conversations that already exist.
+        On return, every Conversation carries its 'conversation_id'.
+
+        Args:
+            conversations (List[Conversation]): The conversations to add or update.
+            override (bool): Overwrite the details that are already recorded.
+
+        Returns:
+            List[int]: The IDs of the conversations in the order supplied, -1 for the entries that could not be stored.
+        """
+        if not conversations:
+            return []
+
+        try:
+            with self.Session() as session:
+                target_ids = self.__resolve_names(session, Targets.target_id, Targets.target_name, [conv.target for conv in conversations])
+
+                # load the existing conversations of the batch, keyed by the run detail.
+                existing_rows = {}
+                keys = list({conv.run_detail_id for conv in conversations})
+                for i in range(0, len(keys), self.BULK_CHUNK_SIZE):
+                    sql = select(Conversations).where(Conversations.detail_id.in_(keys[i:i + self.BULK_CHUNK_SIZE]))
+                    for row in session.execute(sql).scalars().all():
+                        existing_rows.setdefault(row.detail_id, row)
+
+                rows = []
+                new_rows = []
+                for conv in conversations:
+                    target_id = target_ids.get(conv.target)
+                    if target_id is None:
+                        self.logger.error(f"Target '{conv.target}' does not exist. Cannot add conversation.")
+                        rows.append(None)
+                        continue
+
+                    existing = existing_rows.get(conv.run_detail_id)
+                    if existing is not None:
+                        rows.append(existing if self.__merge_conversation(existing, conv, override) is not None else None)
+                        continue
+
+                    new_conversation = Conversations(target_id=target_id,
+                                                     detail_id=conv.run_detail_id,
+                                                     agent_response=conv.agent_response,
+                                                     prompt_ts=self._ensure_datetime(conv.prompt_ts),
+                                                     response_ts=self._ensure_datetime(conv.response_ts),
+                                                     first_token_ts=self._ensure_datetime(conv.first_token_ts),
+                                                     prompt_tokens=conv.prompt_tokens,
+                                                     completion_tokens=conv.completion_tokens,
+                                                     evaluation_score=conv.evaluation_score,
+                                                     evaluation_reason=conv.evaluation_reason,
+                                                     evaluation_ts=self._ensure_datetime(conv.evaluation_ts))
+                    existing_rows[conv.run_detail_id] = new_conversation
+                    new_rows.append(new_conversation)
+                    rows.append(new_conversation)
+
+                session.add_all(new_rows)
+                # a single flush writes all the inserts and updates of the batch.
+                session.flush()
+                ids = []
+                for conv, row in zip(conversations, rows):
+                    if row is None:
+                        ids.append(-1)
+                        continue
+                    conv.kwargs["conversation_id"] = getattr(row, "conversation_id")
+                    ids.append(conv.kwargs["conversation_id"])
+                session.commit()
+
+                self.logger.debug(f"Stored {len(conversations)} conversations ({len(new_rows)} new) in a single transaction.")
+                return ids
+        except IntegrityError as e:
+            self.logger.error(f"Failed to store the batch of {len(conversations)} conversations. Error: {e}")
+            return [-1] * len(conversations)
+
     def get_conversation_by_id(self, conversation_id: int) -> Optional[Conversation]:
         """
         Fetches a conversation by its ID.
@@ -3832,6 +4178,9 @@ class DB:
                                 agent_response=getattr(result, "agent_response"),
                                 prompt_ts=result.prompt_ts.isoformat() if getattr(result, "prompt_ts") else None,
                                 response_ts=result.response_ts.isoformat() if getattr(result, "response_ts") else None,
+                                first_token_ts=result.first_token_ts.isoformat() if getattr(result, "first_token_ts") else None,
+                                prompt_tokens=getattr(result, "prompt_tokens"),
+                                completion_tokens=getattr(result, "completion_tokens"),
                                 evaluation_score=getattr(result, "evaluation_score"),
                                 evaluation_reason=getattr(result, "evaluation_reason"),
                                 evaluation_ts=result.evaluation_ts.isoformat() if getattr(result, "evaluation_ts") else None,
@@ -3858,6 +4207,9 @@ class DB:
                                  agent_response=getattr(result, "agent_response"),
                                  prompt_ts=result.prompt_ts.isoformat() if getattr(result, "prompt_ts") else None,
                                  response_ts=result.response_ts.isoformat() if getattr(result, "response_ts") else None,
+                                 first_token_ts=result.first_token_ts.isoformat() if getattr(result, "first_token_ts") else None,
+                                 prompt_tokens=getattr(result, "prompt_tokens"),
+                                 completion_tokens=getattr(result, "completion_tokens"),
                                  evaluation_score=getattr(result, "evaluation_score"),
                                  evaluation_reason=getattr(result, "evaluation_reason"),
                                  evaluation_ts=getattr(result, "evaluation_ts"),
@@ -0,0 +1,262 @@
+# @description: asyncio variant of the read methods of the DB class, for the async handlers of the FastAPI back-ends.
+
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from lib.data import Prompt, Language, Domain, Response, TestCase, Strategy, LLMJudgePrompt, Target, Run
+from lib.utils import get_logger
+from .engine import DEFAULT_SQLITE_PROFILE, create_async_db_engine
+from .tables import Languages, Domains, Metrics, Responses, TestCases, TestPlans, Prompts, Strategies, \
+    LLMJudgePrompts, Targets, TestRuns, TestRunDetails
+
+
+class AsyncDB:
+    """
+    asyncio access to the database built on the asyncio extension of SQLAlchemy (aiosqlite, asyncmy ..).
+    It has the read methods of the DB class used by the API, returning the same data objects, so that an async
+    handler awaits its queries instead of blocking the event loop. The schema and the writes stay with the DB class.
+    The async sessions can not load a relationship lazily, every query loads the relationships it reads.
+    """
+
+    def __init__(self, db_url: str, debug: bool = False, pool_size: int = 5, max_overflow: int = 10, loglevel=logging.DEBUG,
+                 sqlite_profile: str = DEFAULT_SQLITE_PROFILE, sqlite_pragmas: Optional[dict] = None):
+        """
+        Initializes the AsyncDB instance with the provided database URL.
+
+        Args:
+            db_url (str): The database URL, the asyncio driver of its backend is used.
+            debug (bool): If True, enables debug mode for SQLAlchemy.
+            pool_size (int): The size of the connection pool.
+            max_overflow (int): The maximum number of connections that can be created beyond the pool size.
+            sqlite_profile (str): The pragma profile of a SQLite database ("tuned", "safe" or "none").
+            sqlite_pragmas (dict): SQLite pragmas set on top of the profile.
+        """
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        self.db_url = db_url
+        self.engine = create_async_db_engine(db_url, echo=debug, pool_size=pool_size, max_overflow=max_overflow,
+                                             sqlite_profile=sqlite_profile, pragmas=sqlite_pragmas)
+        # the objects are turned into data objects before the session closes, nothing is read after a commit.
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        # Set up logging
+        self.logger = get_logger(__name__, loglevel=loglevel)
+
+    async def dispose(self):
+        """
+        Closes the connections of the pool.
+        """
+        await self.engine.dispose()
+
+    async def __all(self, sql) -> list:
+        async with self.Session() as session:
+            return (await session.execute(sql)).scalars().all()
+
+    async def __one(self, sql):
+        async with self.Session() as session:
+            return (await session.execute(sql)).scalar_one_or_none()
+
+    async def languages(self) -> List[Language]:
+        """
+        Fetches all languages from the database.
+        """
+        return [Language(name=lang.lang_name, code=lang.lang_id) for lang in await self.__all(select(Languages))]
+
+    async def domains(self) -> List[Domain]:
+        """
+        Fetches all domains from the database.
+        """
+        return [Domain(name=domain.domain_name, code=domain.domain_id) for domain in await self.__all(select(Domains))]
+
+    async def strategies(self) -> List[Strategy]:
+        """
+        Fetches all strategies from the database.
+        """
+        return [Strategy(name=strategy.strategy_name,
+                         description=strategy.strategy_description,
+                         strategy_id=strategy.strategy_id) for strategy in await self.__all(select(Strategies))]
+
+    async def prompts(self) -> List[Prompt]:
+        """
+        Fetches all prompts from the database.
+        """
+        return [Prompt(system_prompt=prompt.system_prompt,
+                       user_prompt=prompt.user_prompt,
+                       prompt_id=prompt.prompt_id,
+                       domain_id=prompt.domain_id,
+                       lang_id=prompt.lang_id) for prompt in await self.__all(select(Prompts))]
+
+    async def llm_judge_prompts(self) -> List[LLMJudgePrompt]:
+        """
+        Fetches all LLM judge prompts from the database.
+        """
+        return [LLMJudgePrompt(prompt=judge_prompt.prompt,
+                               lang_id=judge_prompt.lang_id,
+                               prompt_id=judge_prompt.prompt_id) for judge_prompt in await self.__all(select(LLMJudgePrompts))]
+
+    async def targets(self) -> List[Target]:
+        """
+        Fetches all targets from the database.
+        """
+        sql = select(Targets).options(joinedload(Targets.domain), selectinload(Targets.langs))
+        return [self.__target(target) for target in await self.__all(sql)]
+
+    async def runs(self) -> List[Run]:
+        """
+        Fetches all test runs from the database, with the number of run details of each run.
+        """
+        # the counts come from a single grouped query rather than one query per run.
+        counts = select(TestRunDetails.run_id, func.count(TestRunDetails.detail_id).label("run_count")) \
+            .group_by(TestRunDetails.run_id).subquery()
+        sql = select(TestRuns, func.coalesce(counts.c.run_count, 0)) \
+            .outerjoin(counts, counts.c.run_id == TestRuns.run_id) \
+            .options(joinedload(TestRuns.target))
+        async with self.Session() as session:
+            results = (await session.execute(sql)).all()
+        runs: List[Run] = []
+        for run, run_count in results:
+            start_ts = run.start_ts.isoformat() if isinstance(run.start_ts, datetime) else run.start_ts
+            # end_ts can be None if the run is still ongoing
+            end_ts = run.end_ts.isoformat() if isinstance(run.end_ts, datetime) else run.end_ts
+            runs.append(Run(target=run.target.target_name, run_name=run.run_name, run_id=run.run_id, status=run.status,
+                            start_ts=start_ts, end_ts=end_ts, run_count=run_count))
+        return runs
+
+    async def counts(self) -> dict:
+        """
+        Returns the number of rows of the main tables, in a single query.
+        """
+        tables = {"test_cases": TestCases.testcase_id, "targets": Targets.target_id, "domains": Domains.domain_id,
+                  "strategies": Strategies.strategy_id, "languages": Languages.lang_id, "responses": Responses.response_id,
+                  "prompts": Prompts.prompt_id, "llm_prompts": LLMJudgePrompts.prompt_id, "test_plans": TestPlans.plan_id,
+                  "metrics": Metrics.metric_id}
+        sql = select(*[select(func.count(column)).scalar_subquery().label(name) for name, column in tables.items()])
+        async with self.Session() as session:
+            row = (await session.execute(sql)).one()
+        return dict(row._mapping)
+
+    async def strategy_ids_requiring_llm_prompt(self) -> set[int]:
+        """
+        Returns the IDs of the strategies that have at least one test case with a judge prompt.
+        """
+        sql = select(TestCases.strategy_id).where(TestCases.judge_prompt_id.isnot(None)).distinct()
+        return {strategy_id for strategy_id in await self.__all(sql) if strategy_id is not None}
+
+    async def get_language_name(self, lang_id: int) -> Optional[str]:
+        """
+        Fetches the name of a language by its ID.
+        """
+        return await self.__one(select(Languages.lang_name).where(Languages.lang_id == lang_id))
+
+    async def get_domain_name(self, domain_id: int) -> Optional[str]:
+        """
+        Fetches the name of a domain by its ID.
+        """
+        return await self.__one(select(Domains.domain_name).where(Domains.domain_id == domain_id))
+
+    async def get_strategy_id(self, strategy_id: int) -> Optional[Strategy]:
+        """
+        Fetches a strategy by its ID.
+        """
+        result = await self.__one(select(Strategies).where(Strategies.strategy_id == strategy_id))
+        if result is None:
+            self.logger.error(f"Strategy with ID {strategy_id} does not exist.")
+            return None
+        return Strategy(name=result.strategy_name, description=result.strategy_description, strategy_id=result.strategy_id)
+
+    async def get_prompt(self, prompt_id: int) -> Optional[Prompt]:
+        """
+        Fetches a prompt by its ID.
+        """
+        result = await self.__one(select(Prompts).where(Prompts.prompt_id == prompt_id))
+        if result is None:
+            self.logger.error(f"Prompt with ID '{prompt_id}' does not exist.")
+            return None
+        return Prompt(prompt_id=result.prompt_id,
+                      user_prompt=str(result.user_prompt),
+                      system_prompt=str(result.system_prompt),
+                      lang_id=result.lang_id,
+                      domain_id=result.domain_id,
+                      hash_value=result.hash_value)
+
+    async def get_response(self, response_id: int) -> Optional[Response]:
+        """
+        Fetches a response by its ID.
+        """
+        result = await self.__one(select(Responses).where(Responses.response_id == response_id))
+        if result is None:
+            self.logger.error(f"Response with ID '{response_id}' does not exist.")
+            return None
+        return Response(response_text=str(result.response_text),
+                        response_type=str(result.response_type),
+                        response_id=result.response_id,
+                        prompt_id=result.prompt_id,
+                        lang_id=result.lang_id,
+                        digest=result.hash_value)
+
+    async def get_llm_prompt_by_id(self, prompt_id: int) -> Optional[LLMJudgePrompt]:
+        """
+        Fetches an LLM prompt by its ID.
+        """
+        result = await self.__one(select(LLMJudgePrompts).where(LLMJudgePrompts.prompt_id == prompt_id))
+        if result is None:
+            self.logger.error(f"LLM prompt with ID '{prompt_id}' does not exit")
+            return None
+        return LLMJudgePrompt(prompt_id=result.prompt_id, prompt=str(result.prompt), lang_id=result.lang_id)
+
+    async def get_target_by_id(self, target_id: int) -> Optional[Target]:
+        """
+        Fetches a target by its ID.
+        """
+        sql = select(Targets).where(Targets.target_id == target_id) \
+            .options(joinedload(Targets.domain), selectinload(Targets.langs))
+        result = await self.__one(sql)
+        if result is None:
+            self.logger.error(f"Target with ID '{target_id}' does not exist.")
+            return None
+        return self.__target(result)
+
+    async def get_testcase_by_id(self, testcase_id: int) -> Optional[TestCase]:
+        """
+        Fetches a test case by its ID.
+        """
+        sql = select(TestCases).where(TestCases.testcase_id == testcase_id) \
+            .options(joinedload(TestCases.prompt),
+                     joinedload(TestCases.response),
+                     joinedload(TestCases.judge_prompt),
+                     joinedload(TestCases.strategy),
+                     selectinload(TestCases.metrics))
+        result = await self.__one(sql)
+        if result is None:
+            self.logger.error(f"TestCase with ID '{testcase_id}' does not exist.")
+            return None
+        return TestCase(name=result.testcase_name,
+                        metric=result.metrics[0].metric_name if result.metrics else "Unknown",  # use the first metric associated with the test case
+                        testcase_id=result.testcase_id,
+                        prompt=Prompt(prompt_id=result.prompt.prompt_id,
+                                      user_prompt=str(result.prompt.user_prompt),
+                                      system_prompt=str(result.prompt.system_prompt),
+                                      lang_id=result.prompt.lang_id),
+                        response=Response(response_text=str(result.response.response_text),
+                                          response_type=result.response.response_type,
+                                          response_id=result.response.response_id,
+                                          prompt_id=result.response.prompt_id,
+                                          lang_id=result.response.lang_id,
+                                          digest=result.response.hash_value) if result.response else None,
+                        judge_prompt=LLMJudgePrompt(prompt=str(result.judge_prompt.prompt),
+                                                    lang_id=result.judge_prompt.lang_id) if result.judge_prompt else None,
+                        strategy=result.strategy.strategy_name)
+
+    @staticmethod
+    def __target(target: Targets) -> Target:
+        return Target(target_id=target.target_id,
+                      target_name=str(target.target_name),
+                      target_type=str(target.target_type),
+                      target_description=target.target_description,
+                      target_url=str(target.target_url),
+                      target_domain=target.domain.domain_name,
+                      target_languages=[lang.lang_name for lang in target.langs])
@@ -0,0 +1,170 @@
+# @description: Backend aware factory of the SQLAlchemy engines of the DB class, with the pragma profiles of the SQLite databases.
+
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from lib.utils import get_logger
+
+logger = get_logger("engine")
+
+# The SQLite database is shared by the TDMS back-end, the test case executor and the response analyzer,
+# all of them read and write it at the same time.
+SQLITE_PROFILES = {
+    # WAL lets the readers go on while one process writes, NORMAL only syncs at the checkpoints (a power loss
+    # may lose the last commits, never corrupt the database) and the busy timeout waits for the writer instead
+    # of failing with "database is locked".
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 30000,          # ms
+        "cache_size": -65536,           # KiB (64 MiB) of page cache per connection
+        "mmap_size": 268435456,         # bytes (256 MiB) of the file mapped in memory
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 1000,     # pages
+    },
+    # WAL, but every commit is synced.
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 30000,
+    },
+    # the driver defaults (rollback journal, synced commits, 5 s lock timeout).
+    "none": {},
+}
+
+DEFAULT_SQLITE_PROFILE = "tuned"
+
+
+def sqlite_pragmas(profile: str = DEFAULT_SQLITE_PROFILE, overrides: Optional[dict] = None) -> dict:
+    """
+    Returns the pragmas of the SQLite profile, updated with the overrides.
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{profile}', expected one of {', '.join(SQLITE_PROFILES)}.")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update(overrides or {})
+    return pragmas
+
+
+def _set_pragmas_on_connect(engine: Engine, pragmas: dict, profile: str):
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    logger.debug(f"SQLite profile '{profile}' : {pragmas}")
+
+
+def create_db_engine(db_url: str, echo: bool = False, pool_size: int = 5, max_overflow: int = 10,
+                     sqlite_profile: str = DEFAULT_SQLITE_PROFILE, pragmas: Optional[dict] = None) -> Engine:
+    """
+    Creates the engine of the database URL with the settings of its backend.
+
+    Args:
+        db_url (str): The database URL.
+        echo (bool): If True, the SQL statements are logged.
+        pool_size (int): The size of the connection pool.
+        max_overflow (int): The maximum number of connections that can be created beyond the pool size.
+        sqlite_profile (str): The pragma profile of a SQLite database (see SQLITE_PROFILES).
+        pragmas (dict): Pragmas set on top of the profile.
+
+    Returns:
+        Engine: The SQLAlchemy engine.
+    """
+    url = make_url(db_url)
+    if url.get_backend_name() != "sqlite":
+        # the server closes the idle connections, they are checked and recycled before use.
+        return create_engine(db_url, echo=echo, pool_size=pool_size, max_overflow=max_overflow,
+                             pool_pre_ping=True, pool_recycle=3600)
+
+    pragmas = sqlite_pragmas(sqlite_profile, pragmas)
+    if url.database in (None, "", ":memory:"):
+        # an in memory database only lives as long as its connection, all the threads share a single one.
+        engine = create_engine(db_url, echo=echo, poolclass=StaticPool, connect_args={"check_same_thread": False})
+        pragmas.pop("journal_mode", None)
+    else:
+        # the session threads of the DB class hand the connections over to each other through the pool.
+        connect_args = {"check_same_thread": False}
+        if "busy_timeout" in pragmas:
+            connect_args["timeout"] = pragmas["busy_timeout"] / 1000.0
+        engine = create_engine(db_url, echo=echo, poolclass=QueuePool, pool_size=pool_size, max_overflow=max_overflow,
+                               connect_args=connect_args)
+
+    _set_pragmas_on_connect(engine, pragmas, sqlite_profile)
+    return engine
+
+
+# asyncio drivers of the backends, keyed by the backend name of the URL.
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "mysql": "asyncmy",
+    "mariadb": "asyncmy",
+    "postgresql": "asyncpg",
+}
+
+
+def to_async_url(db_url: str) -> URL:
+    """
+    Returns the URL of the database with the asyncio driver of its backend,
+    e.g. sqlite:///data/AIEvaluationData.db -> sqlite+aiosqlite:///data/AIEvaluationData.db.
+    """
+    url = make_url(db_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver is known for the '{backend}' backend.")
+    # asyncmy speaks the MySQL protocol of the MariaDB servers.
+    return url.set(drivername=f"{'mysql' if backend == 'mariadb' else backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_async_db_engine(db_url: str, echo: bool = False, pool_size: int = 5, max_overflow: int = 10,
+                           sqlite_profile: str = DEFAULT_SQLITE_PROFILE, pragmas: Optional[dict] = None):
+    """
+    Creates the asyncio engine of the database URL, with the same settings as create_db_engine.
+    The URL may name the synchronous driver, the asyncio driver of the backend is used instead.
+
+    Returns:
+        AsyncEngine: The SQLAlchemy asyncio engine.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = to_async_url(db_url)
+    if url.get_backend_name() != "sqlite":
+        return create_async_engine(url, echo=echo, pool_size=pool_size, max_overflow=max_overflow,
+                                   pool_pre_ping=True, pool_recycle=3600)
+
+    pragmas = sqlite_pragmas(sqlite_profile, pragmas)
+    if url.database in (None, "", ":memory:"):
+        engine = create_async_engine(url, echo=echo, poolclass=StaticPool)
+        pragmas.pop("journal_mode", None)
+    else:
+        connect_args = dict()
+        if "busy_timeout" in pragmas:
+            connect_args["timeout"] = pragmas["busy_timeout"] / 1000.0
+        engine = create_async_engine(url, echo=echo, pool_size=pool_size, max_overflow=max_overflow, connect_args=connect_args)
+    # the pool events are those of the synchronous engine wrapped by the asyncio one.
+    _set_pragmas_on_connect(engine.sync_engine, pragmas, sqlite_profile)
+    return engine
+
+
+def engine_options(db_config: dict) -> dict:
+    """
+    Returns the engine keyword arguments of the DB class found in the "db" (or "database") block of a config.json,
+    e.g. {"engine": "sqlite", "file": "AIEvaluationData.db", "sqlite_profile": "tuned", "pragmas": {"cache_size": -131072}}.
+    """
+    options = dict()
+    for key in ("pool_size", "max_overflow", "sqlite_profile"):
+        if key in db_config:
+            options[key] = db_config[key]
+    if "pragmas" in db_config:
+        options["sqlite_pragmas"] = db_config["pragmas"]
+    return options
@@ -0,0 +1,120 @@
+# @description: In-process cache of the name -> ID lookups of the dimension tables (test cases, metrics, plans, targets ..).
+
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Hashable, Optional, Tuple
+
+
+class LookupCache:
+    """
+    Bounded, thread-safe cache of the dimension lookups of the DB class.
+    Entries are grouped by namespace (e.g. "testcase", "metric") and expire after ttl seconds.
+    The least recently used entries are evicted once max_size entries are held.
+    Only the successful lookups are cached, so a newly created record is always found.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: Optional[float] = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.__entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, float]]" = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """
+        Returns the cached value of the key, None if it is not cached or has expired.
+        """
+        with self.__lock:
+            entry = self.__entries.get((namespace, key))
+            if entry is not None:
+                value, expiry = entry
+                if expiry is None or expiry > time.monotonic():
+                    self.__entries.move_to_end((namespace, key))
+                    self.hits += 1
+                    return value
+                del self.__entries[(namespace, key)]
+            self.misses += 1
+            return None
+
+    def put(self, namespace: str, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        expiry = time.monotonic() + self.ttl if self.ttl else None
+        with self.__lock:
+            self.__entries[(namespace, key)] = (value, expiry)
+            self.__entries.move_to_end((namespace, key))
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace: str, key: Optional[Hashable] = None):
+        """
+        Drops the cached key of the namespace, or the whole namespace if no key is given.
+        """
+        with self.__lock:
+            if key is not None:
+                self.__entries.pop((namespace, key), None)
+            else:
+                for k in [k for k in self.__entries if k[0] == namespace]:
+                    del self.__entries[k]
+            self.invalidations += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self) -> dict:
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.__entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def cached_lookup(namespace: str):
+    """
+    Decorator for the DB lookup methods taking the lookup key as their only argument.
+    The result is served from (and stored in) the lookup cache of the DB instance.
+    None and -1 results (not found / failure) are never cached.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            # the key is the only argument, passed either positionally or by name.
+            key = args[0] if args else next(iter(kwargs.values()))
+            value = self.lookup_cache.get(namespace, key)
+            if value is not None:
+                return value
+            value = func(self, *args, **kwargs)
+            if value is not None and value != -1:
+                self.lookup_cache.put(namespace, key, value)
+            return value
+        return wrapper
+    return decorator
+
+
+def invalidates(*namespaces: str):
+    """
+    Decorator for the DB methods that create, rename or delete dimension records.
+    The namespaces are dropped from the lookup cache once the method returns (or raises).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                for namespace in namespaces:
+                    self.lookup_cache.invalidate(namespace)
+        return wrapper
+    return decorator
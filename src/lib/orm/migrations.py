@@ -0,0 +1,156 @@
+# @description: Versioned schema migrations, applied on top of Base.metadata.create_all to the existing databases.
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy import delete, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+
+from .tables import Base, Conversations, SchemaVersions, TestRunDetails
+from lib.utils import get_logger
+
+logger = get_logger("migrations")
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    A schema change, applied once per database in the order of the versions.
+    The upgrade function runs in a transaction and must be safe on a database created by create_all
+    with the current models (e.g. create the indexes with checkfirst).
+    """
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_indexes(conn: Connection, names: List[str]):
+    indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+    for name in names:
+        # checkfirst, create_all already made them on a new database.
+        indexes[name].create(conn, checkfirst=True)
+
+
+def _dedupe_run_details(conn: Connection):
+    """
+    Keeps the first detail of each (run_id, testcase_id) pair and moves the conversations of the others to it,
+    the unique index can not be built otherwise.
+    """
+    duplicates = conn.execute(select(TestRunDetails.run_id, TestRunDetails.testcase_id, func.min(TestRunDetails.detail_id))
+                              .group_by(TestRunDetails.run_id, TestRunDetails.testcase_id)
+                              .having(func.count(TestRunDetails.detail_id) > 1)).all()
+    for run_id, testcase_id, keep_id in duplicates:
+        # the ids are fetched first, MariaDB does not allow a sub query on the table being deleted from.
+        others = conn.execute(select(TestRunDetails.detail_id)
+                              .where(TestRunDetails.run_id == run_id,
+                                     TestRunDetails.testcase_id == testcase_id,
+                                     TestRunDetails.detail_id != keep_id)).scalars().all()
+        conn.execute(update(Conversations).where(Conversations.detail_id.in_(others)).values(detail_id=keep_id))
+        conn.execute(delete(TestRunDetails).where(TestRunDetails.detail_id.in_(others)))
+    if duplicates:
+        logger.warning(f"Merged the duplicated run details of {len(duplicates)} (run, test case) pairs.")
+
+
+def _add_columns(conn: Connection, table, names: List[str]):
+    """
+    Adds the columns of the model missing from the table, create_all does not alter the existing tables.
+    """
+    existing = {column["name"] for column in inspect(conn).get_columns(table.__tablename__)}
+    for name in names:
+        if name in existing:
+            continue
+        column = table.__table__.columns[name]
+        conn.exec_driver_sql(f"ALTER TABLE {table.__tablename__} ADD COLUMN {name} {column.type.compile(dialect=conn.dialect)}")
+
+
+# The indexes added by the first migration, also used by the index benchmark to rebuild an old schema.
+V1_INDEXES = [
+    "ix_prompts_domain_lang", "ix_prompts_lang", "ix_llmjudgeprompts_lang",
+    "ix_responses_prompt", "ix_responses_lang",
+    "ix_testcases_prompt", "ix_testcases_response", "ix_testcases_strategy", "ix_testcases_judge_prompt",
+    "ix_testcaseevaluationdetails_testcase", "ix_metrics_domain",
+    "ix_testplanmetricmapping_plan_metric", "ix_testplanmetricmapping_metric_plan",
+    "ix_metrictestcasemapping_testcase_metric", "ix_metrictestcasemapping_metric_testcase",
+    "ix_targets_domain", "ix_conversations_detail", "ix_conversations_target",
+    "ix_targetlanguages_target_lang", "ix_testruns_target",
+    "uq_testrundetails_run_testcase", "ix_testrundetails_run_status", "ix_testrundetails_testcase",
+    "ix_testrundetails_metric", "ix_testrundetails_plan",
+]
+
+
+def _v1_foreign_key_indexes(conn: Connection):
+    _dedupe_run_details(conn)
+    _create_indexes(conn, V1_INDEXES)
+
+
+def _v2_streaming_metrics(conn: Connection):
+    _add_columns(conn, Conversations, ["first_token_ts", "prompt_tokens", "completion_tokens"])
+
+
+# Append only, the versions of the applied migrations are recorded in the SchemaVersions table.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Indexes of the foreign keys and unique (run_id, testcase_id) run details", _v1_foreign_key_indexes),
+    Migration(2, "First token timestamp and token counts of the conversations", _v2_streaming_metrics),
+]
+
+
+def current_version(engine: Engine) -> int:
+    """
+    Returns the version of the last migration applied to the database, 0 if none was.
+    """
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(SchemaVersions.version))).scalar() or 0
+
+
+# Attempts of a migration which collides with the same migration run by another process.
+CONCURRENT_ATTEMPTS = 5
+CONCURRENT_RETRY_DELAY = 1.0  # seconds
+
+
+def _apply(engine: Engine, migration: Migration):
+    """
+    Applies a migration and records its version. When another process runs the same migration, the creation of its
+    indexes and columns can fail with an "already exists" error (the DDL is not transactional on every backend).
+    The migration is then retried, the upgrade functions skip what exists, until it or the other process records it.
+    """
+    for attempt in range(1, CONCURRENT_ATTEMPTS + 1):
+        try:
+            with engine.begin() as conn:
+                migration.upgrade(conn)
+                conn.execute(insert(SchemaVersions).values(version=migration.version,
+                                                           description=migration.description,
+                                                           applied_ts=datetime.now()))
+            return
+        except IntegrityError:
+            # another process recorded it at the same time.
+            logger.debug(f"The schema migration {migration.version} was applied by another process.")
+            return
+        except (OperationalError, ProgrammingError) as e:
+            if current_version(engine) >= migration.version:
+                logger.debug(f"The schema migration {migration.version} was applied by another process.")
+                return
+            if attempt == CONCURRENT_ATTEMPTS:
+                raise
+            logger.warning(f"The schema migration {migration.version} failed ({e.orig}), retrying ..")
+            time.sleep(CONCURRENT_RETRY_DELAY)
+
+
+def migrate(engine: Engine, target: Optional[int] = None) -> int:
+    """
+    Applies the pending migrations up to the target version (the latest by default).
+    The SchemaVersions table must exist, Base.metadata.create_all creates it.
+
+    Returns:
+        int: The version of the database after the migrations.
+    """
+    version = current_version(engine)
+    for migration in MIGRATIONS:
+        if migration.version <= version or (target is not None and migration.version > target):
+            continue
+        logger.info(f"Applying the schema migration {migration.version} : {migration.description} ..")
+        _apply(engine, migration)
+        version = migration.version
+    return version
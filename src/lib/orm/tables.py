@@ -1,5 +1,5 @@
 from sqlalchemy.orm import DeclarativeBase, relationship
-from sqlalchemy import Column, Integer, Text, DateTime, String, Enum, ForeignKey, Float, Boolean
+from sqlalchemy import Column, Integer, Text, DateTime, String, Enum, ForeignKey, Float, Boolean, Index
 from sqlalchemy_utils import ChoiceType
 from datetime import datetime
 import uuid
@@ -18,6 +18,10 @@ class Prompts(Base):
     It inherits from DeclarativeBase, which is a base class for declarative models in SQLAlchemy.
     """
     __tablename__ = 'Prompts'
+    __table_args__ = (
+        Index("ix_prompts_domain_lang", "domain_id", "lang_id"),
+        Index("ix_prompts_lang", "lang_id"),
+    )
     
     prompt_id = Column(Integer, primary_key=True)
     user_prompt = Column(Text, nullable=False)
@@ -36,6 +40,7 @@ class LLMJudgePrompts(Base):
     It inherits from DeclarativeBase, which is a base class for declarative models in SQLAlchemy.
     """
     __tablename__ = 'LLMJudgePrompts'
+    __table_args__ = (Index("ix_llmjudgeprompts_lang", "lang_id"),)
     
     prompt_id = Column(Integer, primary_key=True)
     prompt = Column(Text, nullable=False)  # Text of the judge prompt
@@ -87,6 +92,10 @@ class Responses(Base):
     This class defines the structure of the Responses table in the database.
     """
     __tablename__ = 'Responses'
+    __table_args__ = (
+        Index("ix_responses_prompt", "prompt_id"),
+        Index("ix_responses_lang", "lang_id"),
+    )
     
     response_id = Column(Integer, primary_key=True)
     response_text = Column(Text, nullable=False)
@@ -103,6 +112,12 @@ class TestCases(Base):
     This class defines the structure of the TestCases table in the database.
     """
     __tablename__ = 'TestCases'
+    __table_args__ = (
+        Index("ix_testcases_prompt", "prompt_id"),
+        Index("ix_testcases_response", "response_id"),
+        Index("ix_testcases_strategy", "strategy_id"),
+        Index("ix_testcases_judge_prompt", "judge_prompt_id"),
+    )
     
     testcase_id = Column(Integer, primary_key=True)
     testcase_name = Column(String(255), nullable=False, unique=True)  # Unique name for the test case
@@ -124,6 +139,7 @@ class TestCaseEvaluationDetails(Base):
     It stores detailed evaluation information for each test case.
     """
     __tablename__ = 'TestCaseEvaluationDetails'
+    __table_args__ = (Index("ix_testcaseevaluationdetails_testcase", "testcase_id"),)
     
     testcase_eval_id = Column(Integer, primary_key=True)
     testcase_id = Column(Integer, ForeignKey('TestCases.testcase_id'), nullable=False)  # Foreign key to TestCases
@@ -149,6 +165,7 @@ class Metrics(Base):
     This class defines the structure of the Metrics table in the database.
     """
     __tablename__ = 'Metrics'
+    __table_args__ = (Index("ix_metrics_domain", "domain_id"),)
     
     metric_id = Column(Integer, primary_key=True)
     metric_name = Column(String(255), nullable=False, unique=True)
@@ -167,6 +184,11 @@ class TestPlanMetricMapping(Base):
     It maps test plans to metrics.
     """
     __tablename__ = 'TestPlanMetricMapping'
+    # both directions of the mapping are covered, the lookups never touch the table rows.
+    __table_args__ = (
+        Index("ix_testplanmetricmapping_plan_metric", "plan_id", "metric_id"),
+        Index("ix_testplanmetricmapping_metric_plan", "metric_id", "plan_id"),
+    )
     
     mapping_id = Column(Integer, primary_key=True)
     plan_id = Column(Integer, ForeignKey('TestPlans.plan_id'), nullable=False)  # Foreign key to TestPlans
@@ -178,6 +200,10 @@ class MetricTestCaseMapping(Base):
     It maps metrics to test cases.
     """
     __tablename__ = 'MetricTestCaseMapping'
+    __table_args__ = (
+        Index("ix_metrictestcasemapping_testcase_metric", "testcase_id", "metric_id"),
+        Index("ix_metrictestcasemapping_metric_testcase", "metric_id", "testcase_id"),
+    )
     
     mapping_id = Column(Integer, primary_key=True)
     testcase_id = Column(Integer, ForeignKey('TestCases.testcase_id'), nullable=False)  # Foreign key to TestCases
@@ -188,6 +214,7 @@ class Targets(Base):
     This class defines the structure of the Targets table in the database.
     """
     __tablename__ = 'Targets'
+    __table_args__ = (Index("ix_targets_domain", "domain_id"),)
     
     target_id = Column(Integer, primary_key=True)
     target_name = Column(String(255), nullable=False, unique=True)  # Name of the target (Also the AI Agent name in WA targets)
@@ -206,6 +233,10 @@ class Conversations(Base):
     This class defines the structure of the Conversations table in the database.
     """
     __tablename__ = 'Conversations'
+    __table_args__ = (
+        Index("ix_conversations_detail", "detail_id"),
+        Index("ix_conversations_target", "target_id"),
+    )
     
     conversation_id = Column(Integer, primary_key=True)
     target_id = Column(Integer, ForeignKey('Targets.target_id'), nullable=False)  # Foreign key to Targets
@@ -213,6 +244,9 @@ class Conversations(Base):
     agent_response = Column(Text, nullable=True)  # AI agent response of the conversation
     prompt_ts = Column(DateTime, nullable=True)  # Start timestamp of the conversation
     response_ts = Column(DateTime, nullable=True)  # End timestamp of the conversation
+    first_token_ts = Column(DateTime, nullable=True)  # Timestamp of the first token of a streamed agent response
+    prompt_tokens = Column(Integer, nullable=True)  # Number of prompt tokens reported by the target
+    completion_tokens = Column(Integer, nullable=True)  # Number of agent response tokens reported by the target
     evaluation_score = Column(Float, nullable=True)  # The evaluation score assigned to the agent response
     evaluation_reason = Column(Text, nullable=True)  # The reason or explanation for the evaluation score   
     evaluation_ts = Column(DateTime, nullable=True)  # Timestamp when the evaluation was performed
@@ -226,6 +260,7 @@ class TargetLanguages(Base):
     It maps targets to languages.
     """
     __tablename__ = 'TargetLanguages'
+    __table_args__ = (Index("ix_targetlanguages_target_lang", "target_id", "lang_id"),)
     
     target_lang_id = Column(Integer, primary_key=True)
     target_id = Column(Integer, ForeignKey('Targets.target_id'), nullable=False)  # Foreign key to Targets
@@ -237,6 +272,7 @@ class TestRuns(Base):
     It stores information about test runs, including their status and timestamps.
     """
     __tablename__ = 'TestRuns'
+    __table_args__ = (Index("ix_testruns_target", "target_id"),)
     
     run_id = Column(Integer, primary_key=True)
     run_name = Column(String(255), nullable=False, unique=True)  # Name of the test run
@@ -255,6 +291,14 @@ class TestRunDetails(Base):
     It stores detailed information about each test run, including metrics and results.
     """
     __tablename__ = 'TestRunDetails'
+    # a test case is run once per run, the unique index also serves the lookups of a run's details.
+    __table_args__ = (
+        Index("uq_testrundetails_run_testcase", "run_id", "testcase_id", unique=True),
+        Index("ix_testrundetails_run_status", "run_id", "testcase_status"),
+        Index("ix_testrundetails_testcase", "testcase_id"),
+        Index("ix_testrundetails_metric", "metric_id"),
+        Index("ix_testrundetails_plan", "plan_id"),
+    )
     
     detail_id = Column(Integer, primary_key=True)
     run_id = Column(Integer, ForeignKey('TestRuns.run_id'), nullable=False)  # Foreign key to TestRuns
@@ -268,3 +312,14 @@ class TestRunDetails(Base):
     plan = relationship("TestPlans", back_populates="run_details")
     testcase = relationship("TestCases", back_populates="run_details")
     conversation = relationship("Conversations", back_populates="detail")  # Relationship to Conversations
+
+class SchemaVersions(Base):
+    """ORM model for the SchemaVersions table.
+    This class defines the structure of the SchemaVersions table in the database.
+    It records the schema migrations applied to the database (see lib.orm.migrations).
+    """
+    __tablename__ = 'SchemaVersions'
+
+    version = Column(Integer, primary_key=True, autoincrement=False)  # Version number of the migration
+    description = Column(String(255), nullable=False)  # What the migration does
+    applied_ts = Column(DateTime, nullable=False, default=datetime.now)  # When the migration was applied
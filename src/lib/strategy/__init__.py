@@ -1,2 +1,8 @@
-from .utils_new import CustomOllamaModel
-from .strategy_base import Strategy
\ No newline at end of file
+from .strategy_base import Strategy
+
+def __getattr__(name:str):
+    # the LLM judge model pulls in deepeval and ollama, it is loaded on first use.
+    if name == "CustomOllamaModel":
+        from ._ollama_model import CustomOllamaModel
+        return CustomOllamaModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,232 @@
+import os
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+import numpy as np
+from .logger import get_logger
+from .utils_new import FileLoader
+
+logger = get_logger("embedding_service")
+FileLoader._load_env_vars(__file__)
+dflt_vals = FileLoader._to_dot_dict(__file__, os.getenv("DEFAULT_VALUES_PATH"), simple=True, strat_name="embedding_service")
+
+class _VectorCache:
+    """
+    Memory bounded LRU of the embedding vectors, keyed on (model, normalized, text hash).
+    Vectors evicted from memory are spilled to spill_dir as .npy files (if set) and memory mapped back on a hit.
+    """
+
+    def __init__(self, max_bytes:int, spill_dir:Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.__entries : "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __spill_path(self, key:str) -> str:
+        return os.path.join(self.spill_dir, key[:2], f"{key}.npy")
+
+    def get(self, key:str) -> Optional[np.ndarray]:
+        with self.__lock:
+            vec = self.__entries.get(key)
+            if vec is not None:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return vec
+        if self.spill_dir:
+            path = self.__spill_path(key)
+            if os.path.exists(path):
+                try:
+                    vec = np.load(path, mmap_mode="r")
+                    with self.__lock:
+                        self.spill_hits += 1
+                    return vec
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not read the spilled embedding {path} : {e}")
+        with self.__lock:
+            self.misses += 1
+        return None
+
+    def put(self, key:str, vec:np.ndarray):
+        spilled = []
+        with self.__lock:
+            if key in self.__entries:
+                return
+            self.__entries[key] = vec
+            self.__bytes += vec.nbytes
+            while self.__bytes > self.max_bytes and len(self.__entries) > 1:
+                old_key, old_vec = self.__entries.popitem(last=False)
+                self.__bytes -= old_vec.nbytes
+                spilled.append((old_key, old_vec))
+        if self.spill_dir:
+            for old_key, old_vec in spilled:
+                path = self.__spill_path(old_key)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    np.save(path, old_vec)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            lookups = self.hits + self.spill_hits + self.misses
+            return {
+                "size" : len(self.__entries),
+                "resident_mb" : round(self.__bytes / (1024 * 1024), 2),
+                "hits" : self.hits,
+                "spill_hits" : self.spill_hits,
+                "misses" : self.misses,
+                "hit_rate" : round((self.hits + self.spill_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+class _Batcher:
+    """
+    Coalesces the encode requests of concurrent callers for a model into batches.
+    A background thread collects the requests for at most max_wait_ms (or until max_batch_size texts are queued)
+    and encodes them with a single call to the model.
+    """
+
+    def __init__(self, model, max_batch_size:int, max_wait_ms:float):
+        self.model = model
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max(max_wait_ms, 0) / 1000.0
+        self.__queue : "queue.Queue" = queue.Queue()
+        self.batches = 0
+        self.texts = 0
+        threading.Thread(target=self.__run, name="embedding-batcher", daemon=True).start()
+
+    def submit(self, texts:List[str], normalize:bool) -> Future:
+        future = Future()
+        self.__queue.put((texts, normalize, future))
+        return future
+
+    def __run(self):
+        while True:
+            requests = [self.__queue.get()]
+            count = len(requests[0][0])
+            deadline = threading.Event()
+            timer = threading.Timer(self.max_wait, deadline.set)
+            timer.start()
+            while count < self.max_batch_size and not deadline.is_set():
+                try:
+                    request = self.__queue.get(timeout=self.max_wait)
+                except queue.Empty:
+                    break
+                requests.append(request)
+                count += len(request[0])
+            timer.cancel()
+            # normalized and raw vectors are encoded separately.
+            for normalize in (False, True):
+                group = [r for r in requests if r[1] == normalize]
+                if group:
+                    self.__encode(group, normalize)
+
+    def __encode(self, group:list, normalize:bool):
+        texts = [text for texts, _, _ in group for text in texts]
+        try:
+            vectors = self.model.encode(texts, batch_size=min(len(texts), self.max_batch_size), normalize_embeddings=normalize, convert_to_numpy=True)
+        except Exception as e:
+            for _, _, future in group:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.texts += len(texts)
+        start = 0
+        for texts_, _, future in group:
+            future.set_result(vectors[start:start + len(texts_)])
+            start += len(texts_)
+
+class EmbeddingService:
+    """
+    Process wide provider of the sentence embeddings used by the strategies.
+    Each SentenceTransformer model is loaded once, the encode requests of concurrent callers are micro-batched
+    and the vectors are cached, since the expected responses and the system prompts repeat across a test plan.
+    """
+
+    def __init__(self, max_cache_mb:float = 256, max_batch_size:int = 64, max_wait_ms:float = 5, spill_dir:Optional[str] = None):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.cache = _VectorCache(int(max_cache_mb * 1024 * 1024), spill_dir)
+        self.__models : Dict[str, object] = dict()
+        self.__batchers : Dict[str, _Batcher] = dict()
+        self.__lock = threading.Lock()
+
+    def model(self, model_name:str):
+        """
+        Returns the SentenceTransformer model, loading it on first use.
+        """
+        with self.__lock:
+            model = self.__models.get(model_name)
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+                logger.info(f"Loading the embedding model {model_name}")
+                model = SentenceTransformer(model_name)
+                self.__models[model_name] = model
+                self.__batchers[model_name] = _Batcher(model, self.max_batch_size, self.max_wait_ms)
+            return model
+
+    @staticmethod
+    def _key(model_name:str, text:str, normalize:bool) -> str:
+        return hashlib.sha256(f"{model_name}\x00{int(normalize)}\x00{text}".encode("utf-8")).hexdigest()
+
+    def encode(self, model_name:str, texts:List[str], normalize_embeddings:bool = False, convert_to_tensor:bool = False):
+        """
+        Encodes the texts with the model, like SentenceTransformer.encode.
+        Returns a (len(texts), dim) numpy array, or a torch tensor if convert_to_tensor is set.
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        self.model(model_name)
+        keys = [self._key(model_name, text, normalize_embeddings) for text in texts]
+        vectors : List[Optional[np.ndarray]] = [self.cache.get(key) for key in keys]
+
+        # encode the distinct texts that are not cached yet.
+        missing = OrderedDict()
+        for i, vec in enumerate(vectors):
+            if vec is None:
+                missing.setdefault(keys[i], texts[i])
+        if missing:
+            encoded = self.__batchers[model_name].submit(list(missing.values()), normalize_embeddings).result()
+            fresh = dict(zip(missing.keys(), encoded))
+            for key, vec in fresh.items():
+                self.cache.put(key, vec)
+            vectors = [vec if vec is not None else fresh[key] for key, vec in zip(keys, vectors)]
+
+        result = np.stack([np.asarray(vec) for vec in vectors]) if vectors else np.empty((0, 0), dtype=np.float32)
+        if single:
+            result = result[0]
+        if convert_to_tensor:
+            import torch
+            result = torch.from_numpy(np.ascontiguousarray(result))
+        return result
+
+    def stats(self) -> dict:
+        stats = self.cache.stats()
+        with self.__lock:
+            stats["models"] = list(self.__models.keys())
+            stats["batches"] = sum(b.batches for b in self.__batchers.values())
+            stats["encoded_texts"] = sum(b.texts for b in self.__batchers.values())
+        return stats
+
+_service : Optional[EmbeddingService] = None
+_service_lock = threading.Lock()
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    Returns the process wide embedding service, creating it on first use.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingService(max_cache_mb=getattr(dflt_vals, "max_cache_mb", 256),
+                                            max_batch_size=getattr(dflt_vals, "max_batch_size", 64),
+                                            max_wait_ms=getattr(dflt_vals, "max_wait_ms", 5),
+                                            spill_dir=getattr(dflt_vals, "spill_dir", None))
+    return _service
@@ -1,93 +1,241 @@
 import os
+import re
 import json
 import ast
 import importlib
+import threading
+from typing import Dict, List, Optional, Tuple
 from .logger import get_logger
+from .utils_new import FileLoader
 import traceback
 
 logger = get_logger("lazy_loader")
+FileLoader._load_env_vars(__file__)
+dflt_vals = FileLoader._to_dot_dict(__file__, os.getenv("DEFAULT_VALUES_PATH"), simple=True, strat_name="strategy_registry")
 
 class LazyLoader:
+    """
+    Registry of the strategy classes of the package, the modules are imported only when a class is asked for.
+    The registry keeps the classes found in each module along with the module's mtime and size, so only the modules
+    that changed since the last run are parsed again. Strategy names resolve in a fixed order : the registered names,
+    the explicit aliases of the defaults, then the longest registered name made of the words of the given name in
+    their order (the prefix first). Resolutions, including the unknown names, are memoized.
+    """
+
+    CACHE_VERSION = 2
 
     def __init__(self):
-        self.CACHE_PATH = os.path.join(os.path.dirname(__file__), ".strategy_registery_cache.json")
+        self.CACHE_PATH = os.path.join(os.path.dirname(__file__), ".strategy_registry_cache.json")
         self.REGISTERY = dict()
         self.CLASS_NAME_TO_MOD_NAME = dict()
         self.STRAT_NAME_TO_CLASS_NAME = dict()
         self.package = __package__ # full name e.g. mypackage.utils.helper (who am i ?) but __package__ would be mypackage.utils (where do i live?)
         self.package_path = os.path.dirname(__file__)
-        # if the cache file is there just load it
+        self.__files : Dict[str, dict] = dict()
+        self.__aliases : Dict[str, str] = dict()
+        self.__by_first_word : Dict[str, List[Tuple[str, ...]]] = dict()
+        self.__resolved : Dict[str, Optional[str]] = dict()
+        self.__refreshed_for_misses = False
+        self.__lock = threading.RLock()
+        self.load_aliases()
+        # if the cache file is there just load it, then bring it up to date with the modules.
         self.load_cache()
-        
-    def create_mapp(self):
+        self.refresh()
+
+    def __module_files(self) -> Dict[str, Tuple[float, int]]:
+        files = dict()
         for filename in os.listdir(self.package_path):
-            if filename.startswith("__") or not filename.endswith(".py"): #or not filename.startswith("changed"):
+            if filename.startswith("__") or not filename.endswith(".py"):
                 continue
-            full_path = os.path.join(self.package_path, filename)
+            stat = os.stat(os.path.join(self.package_path, filename))
+            files[filename] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def __scan_file(self, filename:str) -> Dict[str, Optional[str]]:
+        """
+        Returns the strategy classes of the module with the default value of their name argument.
+        """
+        classes = dict()
+        with open(os.path.join(self.package_path, filename), "r") as f:
+            tree = ast.parse(f.read(), filename=filename)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef):
+                for base_cls in node.bases:
+                    if isinstance(base_cls, ast.Name) and base_cls.id == "Strategy":
+                        classes[node.name] = None
+                        for body in node.body:
+                            if isinstance(body, ast.FunctionDef) and body.name == "__init__" and body.args.defaults:
+                                for (arg, val) in zip(body.args.args[-len(body.args.defaults):], body.args.defaults):
+                                    if arg.arg == "name" and isinstance(val, ast.Constant):
+                                        classes[node.name] = val.value
+                                        break
+                        break
+        return classes
+
+    def refresh(self) -> bool:
+        """
+        Parses the modules added or changed since the registry was built and drops the removed ones.
+        Returns True if the registry changed.
+        """
+        with self.__lock:
+            current = self.__module_files()
+            changed = False
+            for filename in list(self.__files):
+                if filename not in current:
+                    del self.__files[filename]
+                    changed = True
+            for filename, (mtime, size) in current.items():
+                entry = self.__files.get(filename)
+                if entry is not None and entry["mtime"] == mtime and entry["size"] == size:
+                    continue
+                try:
+                    classes = self.__scan_file(filename)
+                except Exception as e:
+                    logger.error(f"Failed to scan the file {filename}, Error : {e}")
+                    traceback.print_exc()
+                    classes = dict()
+                self.__files[filename] = {"mtime": mtime, "size": size, "classes": classes}
+                changed = True
+            if changed or not self.CLASS_NAME_TO_MOD_NAME:
+                self.__build_index()
+            if changed:
+                self.save_cache()
+            return changed
+
+    def __build_index(self):
+        self.CLASS_NAME_TO_MOD_NAME = dict()
+        self.STRAT_NAME_TO_CLASS_NAME = dict()
+        # sorted, so that the same set of modules always gives the same registry.
+        for filename in sorted(self.__files):
             mod_name = f"{self.package}.{filename.removesuffix('.py')}"
+            for cls_name, strat_name in self.__files[filename]["classes"].items():
+                self.CLASS_NAME_TO_MOD_NAME[cls_name] = mod_name
+                if strat_name is not None:
+                    if strat_name in self.STRAT_NAME_TO_CLASS_NAME:
+                        logger.warning(f"The strategy name {strat_name} is registered by both {self.STRAT_NAME_TO_CLASS_NAME[strat_name]} and {cls_name}.")
+                    else:
+                        self.STRAT_NAME_TO_CLASS_NAME[strat_name] = cls_name
+        self.__by_first_word = dict()
+        for strat_name in sorted(self.STRAT_NAME_TO_CLASS_NAME):
+            words = tuple(self.split(strat_name))
+            self.__by_first_word.setdefault(words[0], []).append(words)
+        self.__resolved = dict()
+        self.__refreshed_for_misses = False
+
+    @staticmethod
+    def split(name:str) -> List[str]:
+        return [word for word in re.split(r"[_]+", name) if word]
+
+    def load_aliases(self):
+        self.__aliases = dict(getattr(dflt_vals, "aliases", dict()))
+
+    def __match(self, given_name:str) -> Optional[str]:
+        if given_name in self.STRAT_NAME_TO_CLASS_NAME:
+            return given_name
+        alias = self.__aliases.get(given_name)
+        if alias is not None:
+            if alias in self.STRAT_NAME_TO_CLASS_NAME:
+                return alias
+            logger.warning(f"The alias {given_name} points to the unknown strategy {alias}.")
+        # the registered names made of the given words in the same order, the longest wins and
+        # among equally long ones the one whose words come first (the prefix).
+        words = self.split(given_name)
+        best, best_key = None, None
+        for first in dict.fromkeys(words):
+            for candidate in self.__by_first_word.get(first, []):
+                positions, start = [], 0
+                for word in candidate:
+                    try:
+                        start = words.index(word, start)
+                    except ValueError:
+                        positions = None
+                        break
+                    positions.append(start)
+                    start += 1
+                if positions is None:
+                    continue
+                key = (-len(candidate), positions)
+                if best_key is None or key < best_key:
+                    best, best_key = "_".join(candidate), key
+        return best
+
+    def resolve(self, given_name:str) -> Optional[str]:
+        """
+        Returns the name of the strategy class that handles the given strategy name, None if there is none.
+        """
+        with self.__lock:
+            if given_name in self.__resolved:
+                return self.__resolved[given_name]
+            strat_name = self.__match(given_name)
+            if strat_name is None and not self.__refreshed_for_misses:
+                # a module may have been added since the registry was loaded, look once per process.
+                self.__refreshed_for_misses = True
+                if self.refresh():
+                    strat_name = self.__match(given_name)
+            cls_name = self.STRAT_NAME_TO_CLASS_NAME.get(strat_name) if strat_name is not None else None
+            if cls_name is None:
+                logger.warning(f"No strategy class handles the strategy name {given_name}.")
+            self.__resolved[given_name] = cls_name
+            return cls_name
+
+    def create_mapp(self):
+        with self.__lock:
+            self.__files = dict()
+            self.refresh()
 
-            try:
-                with open(full_path, "r") as f:
-                    tree = ast.parse(f.read(), filename=filename)
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.ClassDef):
-                            for base_cls in node.bases:
-                                if isinstance(base_cls, ast.Name) and base_cls.id == "Strategy":
-                                    self.CLASS_NAME_TO_MOD_NAME[node.name] = mod_name
-
-                                    for body in node.body:
-                                        if isinstance(body, ast.FunctionDef) and body.name == "__init__":
-                                            for (arg, val) in zip(body.args.args[-len(body.args.defaults):], body.args.defaults):
-                                                if arg.arg == "name":
-                                                    if isinstance(val, ast.Constant):
-                                                        self.STRAT_NAME_TO_CLASS_NAME[val.value] = node.name
-                                                        break
-                                    break
-                assert(len(self.CLASS_NAME_TO_MOD_NAME) == len(self.STRAT_NAME_TO_CLASS_NAME))
-            except Exception as e:
-                logger.error(f"Failed to scan the file {filename}, Error : {e}")
-                traceback.print_exc()
-        self.save_cache()
-    
     def get_class(self, class_name:str):
         if class_name in self.REGISTERY:
             return self.REGISTERY.get(class_name)
-        # search for the value in the loaded cache
         mod_name = self.CLASS_NAME_TO_MOD_NAME.get(class_name)
-        # if the class name is not present in the previous cache, the files might have been updated or the cache might not have been loaded
         if not mod_name:
-            # So, create new cache and save it
-            self.create_mapp()
-            # if the class name is still not present, then there is an error in the name
+            self.refresh()
             mod_name = self.CLASS_NAME_TO_MOD_NAME.get(class_name)
             if not mod_name:
-                raise ValueError(f"Class {mod_name} not found in the package.")
-        
+                raise ValueError(f"Class {class_name} not found in the package.")
+
         mod = importlib.import_module(mod_name)
         cls = getattr(mod, class_name)
         self.REGISTERY[class_name] = cls
         return cls
-    
+
     def map_name_to_class(self, name:str):
-        # if there is no cache loaded prior, then create the cache and save it
-        if not self.STRAT_NAME_TO_CLASS_NAME or not self.STRAT_NAME_TO_CLASS_NAME.get(name):
-            self.create_mapp()
-        try:
-            return self.STRAT_NAME_TO_CLASS_NAME.get(name)
-        except Exception as e:
-            logger.error(f"Could not load the cache because it is empty. : {e}")
-            return None
+        return self.STRAT_NAME_TO_CLASS_NAME.get(name) or self.STRAT_NAME_TO_CLASS_NAME.get(self.__aliases.get(name))
+
+    def names(self) -> Dict[str, str]:
+        with self.__lock:
+            return dict(self.STRAT_NAME_TO_CLASS_NAME)
 
     def save_cache(self):
-        with open(self.CACHE_PATH , "w") as f:
-            data = [self.CLASS_NAME_TO_MOD_NAME, self.STRAT_NAME_TO_CLASS_NAME]
-            json.dump(data, f)
-            # print(f"Saved strategy class registery to {self.CACHE_PATH}.")
-    
+        tmp_path = f"{self.CACHE_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": self.CACHE_VERSION, "files": self.__files}, f)
+            # atomic, the worker processes of an analysis may build the registry at the same time.
+            os.replace(tmp_path, self.CACHE_PATH)
+        except OSError as e:
+            logger.warning(f"Could not save the strategy registry to {self.CACHE_PATH} : {e}")
+
     def load_cache(self):
         if os.path.exists(self.CACHE_PATH):
-            with open(self.CACHE_PATH, "r") as f:
-                data = json.load(f)
-                self.CLASS_NAME_TO_MOD_NAME = data[0]
-                self.STRAT_NAME_TO_CLASS_NAME = data[1]
+            try:
+                with open(self.CACHE_PATH, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read the strategy registry {self.CACHE_PATH} : {e}")
+                return
+            if isinstance(data, dict) and data.get("version") == self.CACHE_VERSION:
+                self.__files = data.get("files", dict())
+
+_loader : Optional[LazyLoader] = None
+_loader_lock = threading.Lock()
 
+def get_lazy_loader() -> LazyLoader:
+    """
+    Returns the process wide strategy registry, creating it on first use.
+    """
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = LazyLoader()
+    return _loader
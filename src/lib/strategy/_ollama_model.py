@@ -0,0 +1,49 @@
+import json
+from ollama import Client, AsyncClient
+from deepeval.metrics.g_eval.schema import Steps, ReasonScore
+from deepeval.models.base_model import DeepEvalBaseLLM
+
+class CustomOllamaModel(DeepEvalBaseLLM):
+    def __init__(self, model_name : str, url : str, *args, **kwargs):
+        self.model_name = model_name
+        self.ollama_url = f"{url.rstrip()}"
+        self.ollama_client = Client(host=self.ollama_url)
+        self.score_reason = None
+        self.steps = None
+    
+    def generate(self, input : str, *args, **kwargs) -> str:
+        messages = [{"role": "user", "content": f'{input} /nothink'}] # nothink allows us to only get the final answer
+        response = self.ollama_client.chat(
+            model = self.model_name,
+            messages=messages,
+            format="json"
+        )
+        raw = json.loads(response.message.content)
+        schema_ =  kwargs.get("schema")(**raw) # the deepeval library uses different schemas to serialize the JSON, so we return the schemas as required by the library
+        if(kwargs.get("schema") is ReasonScore):
+            self.score_reason = {"Score": schema_.score, "Reason": schema_.reason}
+        if(kwargs.get("schema") is Steps):
+            self.steps = schema_.steps
+        return schema_ 
+    
+    def load_model(self, *args, **kwargs):
+        return None
+    
+    async def a_generate(self, input:str, *args, **kwargs):
+        client = AsyncClient(host=self.ollama_url)
+        messages = [{"role": "user", "content": f'{input} /nothink'}]
+        response = await client.chat(
+            model=self.model_name,
+            messages=messages,
+            format="json"
+        )
+        raw = json.loads(response.message.content)
+        schema_ =  kwargs.get("schema")(**raw)
+        if(kwargs.get("schema") is ReasonScore):
+            self.score_reason = {"Score": schema_.score, "Reason": schema_.reason}
+        if(kwargs.get("schema") is Steps):
+            self.steps = {"Steps" : schema_.steps}
+        return schema_
+    
+    def get_model_name(self, *args, **kwargs):
+        return self.model_name
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Callable, Dict, Iterable, Optional
+from .logger import get_logger
+from .utils_new import FileLoader, OllamaConnect
+
+logger = get_logger("reason_queue")
+FileLoader._load_env_vars(__file__)
+dflt_vals = FileLoader._to_dot_dict(__file__, os.getenv("DEFAULT_VALUES_PATH"), simple=True, strat_name="reason_queue")
+
+# evaluation reasons that are still to be generated are stored as "[reason pending:<key>]".
+PENDING_PREFIX = "[reason pending:"
+# reasons are deferred when this environment variable is set, so that spawned worker processes follow the parent.
+DEFER_ENV_VAR = "DEFER_REASONS"
+
+def reason_key(agent_response:str, metric:str, score:float, add_info:str = "", digits:int = 2) -> str:
+    """
+    Content address of a reason : the hash of the response, the metric, the rounded score and the additional information.
+    """
+    payload = json.dumps([hashlib.sha256((agent_response or "").encode("utf-8")).hexdigest(), metric, round(float(score), digits), add_info or ""])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def pending_token(key:str) -> str:
+    return f"{PENDING_PREFIX}{key}]"
+
+def pending_key(reason:Optional[str]) -> Optional[str]:
+    """
+    Returns the key of a pending reason token, None if the reason is not a pending token.
+    """
+    if isinstance(reason, str) and reason.startswith(PENDING_PREFIX) and reason.endswith("]"):
+        return reason[len(PENDING_PREFIX):-1]
+    return None
+
+class ReasonQueue:
+    """
+    Content addressed cache and deferred queue of the score reasons generated by the LLM.
+    The cache is a SQLite file shared by all the processes of an analysis. In deferred mode, get_reason
+    records the inputs under their key and returns a pending token right away, the reasons are then
+    generated concurrently by the worker threads of the queue through submit / resolve.
+    """
+
+    def __init__(self, cache_path:str, generator:Callable[[str, str, float, str], Optional[str]], workers:int = 4, score_digits:int = 2):
+        self.cache_path = cache_path
+        self.generator = generator
+        self.score_digits = score_digits
+        self.workers = max(workers, 1)
+        self.__executor : Optional[ThreadPoolExecutor] = None
+        self.__inflight : Dict[str, Future] = dict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        with self.__connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS reasons (key TEXT PRIMARY KEY, agent_response TEXT, metric TEXT, score REAL, add_info TEXT, reason TEXT, updated REAL)")
+
+    @contextmanager
+    def __connect(self):
+        # short lived connections, the file is shared by the threads and the worker processes of an analysis.
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @property
+    def deferred(self) -> bool:
+        return os.getenv(DEFER_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+    @staticmethod
+    def set_deferred(deferred:bool):
+        os.environ[DEFER_ENV_VAR] = "1" if deferred else "0"
+
+    def lookup(self, key:str) -> Optional[str]:
+        with self.__connect() as conn:
+            row = conn.execute("SELECT reason FROM reasons WHERE key = ?", (key,)).fetchone()
+        reason = row[0] if row else None
+        with self.__lock:
+            if reason is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return reason
+
+    def __record(self, key:str, agent_response:str, metric:str, score:float, add_info:str, reason:Optional[str] = None):
+        with self.__connect() as conn:
+            if reason is None:
+                conn.execute("INSERT OR IGNORE INTO reasons VALUES (?, ?, ?, ?, ?, NULL, ?)", (key, agent_response, metric, score, add_info, time.time()))
+            else:
+                conn.execute("INSERT OR REPLACE INTO reasons VALUES (?, ?, ?, ?, ?, ?, ?)", (key, agent_response, metric, score, add_info, reason, time.time()))
+
+    def get_reason(self, agent_response:str, metric:str, score:float, add_info:str = "") -> Optional[str]:
+        """
+        Returns the reason of the score, from the cache if the same response was explained before.
+        In deferred mode a pending token is returned for the reasons that are not cached yet.
+        None is returned when the reason could not be generated.
+        """
+        add_info = "" if add_info is None else str(add_info)
+        key = reason_key(agent_response, metric, score, add_info, self.score_digits)
+        reason = self.lookup(key)
+        if reason is not None:
+            return reason
+        if self.deferred:
+            self.__record(key, agent_response, metric, score, add_info)
+            return pending_token(key)
+        return self.__generate(key, agent_response, metric, score, add_info)
+
+    def __generate(self, key:str, agent_response:str, metric:str, score:float, add_info:str) -> Optional[str]:
+        reason = self.generator(agent_response, metric, score, add_info)
+        if reason is not None:
+            self.__record(key, agent_response, metric, score, add_info, reason)
+            with self.__lock:
+                self.generated += 1
+        return reason
+
+    def __resolve_one(self, key:str) -> Optional[str]:
+        with self.__connect() as conn:
+            row = conn.execute("SELECT agent_response, metric, score, add_info, reason FROM reasons WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            logger.error(f"No inputs are recorded for the pending reason {key}.")
+            return None
+        if row[4] is not None:
+            return row[4]
+        return self.__generate(key, row[0], row[1], row[2], row[3])
+
+    def submit(self, key:str) -> Future:
+        """
+        Queues the generation of a pending reason, the same key is generated only once at a time.
+        """
+        with self.__lock:
+            future = self.__inflight.get(key)
+            if future is not None:
+                return future
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="reason")
+            future = self.__executor.submit(self.__resolve_one, key)
+            self.__inflight[key] = future
+        future.add_done_callback(lambda _: self.__forget(key))
+        return future
+
+    def __forget(self, key:str):
+        with self.__lock:
+            self.__inflight.pop(key, None)
+
+    def resolve(self, keys:Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Generates the pending reasons of the keys concurrently and waits for them.
+        """
+        futures = {key: self.submit(key) for key in set(keys)}
+        wait(futures.values())
+        return {key: (future.result() if future.exception() is None else None) for key, future in futures.items()}
+
+    def shutdown(self):
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits" : self.hits,
+                "misses" : self.misses,
+                "hit_rate" : round(self.hits / lookups, 4) if lookups else 0.0,
+                "generated" : self.generated,
+                "inflight" : len(self.__inflight),
+            }
+
+_queue : Optional[ReasonQueue] = None
+_queue_lock = threading.Lock()
+
+def get_reason_queue() -> ReasonQueue:
+    """
+    Returns the process wide reason queue, creating it on first use.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                cache_path = getattr(dflt_vals, "cache_file", ".reason_cache.sqlite")
+                if not os.path.isabs(cache_path):
+                    cache_path = os.path.join(os.path.dirname(__file__), cache_path)
+                _queue = ReasonQueue(cache_path, OllamaConnect.generate_reason,
+                                     workers=getattr(dflt_vals, "workers", 4),
+                                     score_digits=getattr(dflt_vals, "score_digits", 2))
+    return _queue
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import sqlite3
+import inspect
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+from .logger import get_logger
+from .utils_new import FileLoader
+from lib.data import TestCase, Conversation
+
+logger = get_logger("result_cache")
+FileLoader._load_env_vars(__file__)
+dflt_vals = FileLoader._to_dot_dict(__file__, os.getenv("DEFAULT_VALUES_PATH"), simple=True, strat_name="result_cache")
+
+def inputs_digest(testcase:Optional[TestCase], conversation:Optional[Conversation]) -> str:
+    """
+    Hash of everything a strategy gets to see : the prompts, the expected response, the judge prompt and the agent response.
+    The names and IDs are left out, so identical content in another run or test case maps to the same digest.
+    """
+    prompt = testcase.prompt if testcase else None
+    response = testcase.response if testcase else None
+    judge_prompt = testcase.judge_prompt if testcase else None
+    payload = json.dumps([
+        getattr(prompt, "system_prompt", None),
+        getattr(prompt, "user_prompt", None),
+        getattr(prompt, "lang_id", None),
+        getattr(response, "response_text", None),
+        getattr(response, "lang_id", None),
+        getattr(judge_prompt, "prompt", None),
+        getattr(conversation, "agent_response", None),
+    ], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """
+    Persistent, content addressed cache of the evaluation results (score, reason).
+    The results are keyed on the strategy name, the metric, the strategy version (its source and configuration)
+    and the digest of the inputs. The least recently used results are evicted once the cache grows beyond
+    max_entries rows or max_mb megabytes.
+    """
+
+    def __init__(self, cache_path:str, max_entries:int = 200000, max_mb:float = 512, uncached_strategies:Optional[List[str]] = None):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.uncached_strategies = set(uncached_strategies or [])
+        self.__versions = dict()
+        self.__lock = threading.Lock()
+        self.__puts = 0
+        self.hits = 0
+        self.misses = 0
+        with self.__connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS results (strategy TEXT, metric TEXT, version TEXT, digest TEXT, score REAL, reason TEXT, size INTEGER, created REAL, last_used REAL, PRIMARY KEY (strategy, metric, version, digest))")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used)")
+
+    @contextmanager
+    def __connect(self):
+        # short lived connections, the file is shared by the threads and the worker processes of an analysis.
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def cacheable(self, strategy_name:str) -> bool:
+        # strategies computed over the whole run (uptime, error rates ..) do not depend on a single conversation.
+        return not any(strategy_name == name or strategy_name.startswith(name + "_") for name in self.uncached_strategies)
+
+    def version(self, cls:type, strategy_name:str, kwargs:Optional[dict] = None) -> str:
+        """
+        Version of a strategy : the hash of its module source, its defaults and the construction arguments.
+        A change to any of them makes the earlier results unreachable.
+        """
+        vkey = (cls, strategy_name, json.dumps(kwargs or {}, sort_keys=True, default=str))
+        with self.__lock:
+            version = self.__versions.get(vkey)
+        if version is not None:
+            return version
+        digest = hashlib.sha256()
+        try:
+            with open(inspect.getsourcefile(cls), "rb") as f:
+                digest.update(f.read())
+        except (TypeError, OSError) as e:
+            logger.warning(f"Could not read the source of {cls.__name__} for its version : {e}")
+        try:
+            with open(os.path.join(os.path.dirname(__file__), os.getenv("DEFAULT_VALUES_PATH", "")), "r") as f:
+                defaults = json.load(f).get(strategy_name, {})
+        except (OSError, ValueError):
+            defaults = {}
+        digest.update(json.dumps(defaults, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(vkey[2].encode("utf-8"))
+        version = digest.hexdigest()[:16]
+        with self.__lock:
+            self.__versions[vkey] = version
+        return version
+
+    def get(self, strategy_name:str, metric_name:str, version:str, digest:str) -> Optional[Tuple[float, str]]:
+        with self.__connect() as conn:
+            row = conn.execute("SELECT score, reason FROM results WHERE strategy = ? AND metric = ? AND version = ? AND digest = ?",
+                               (strategy_name, metric_name or "", version, digest)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE results SET last_used = ? WHERE strategy = ? AND metric = ? AND version = ? AND digest = ?",
+                             (time.time(), strategy_name, metric_name or "", version, digest))
+        with self.__lock:
+            if row is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return (row[0], row[1]) if row is not None else None
+
+    def put(self, strategy_name:str, metric_name:str, version:str, digest:str, score:float, reason:str):
+        now = time.time()
+        size = len(reason or "") + len(digest) + len(strategy_name) + len(metric_name or "") + 64
+        with self.__connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (strategy_name, metric_name or "", version, digest, score, reason, size, now, now))
+        with self.__lock:
+            self.__puts += 1
+            check = self.__puts % 100 == 0
+        if check:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used results until the cache is within its limits, returns the number removed.
+        """
+        removed = 0
+        with self.__connect() as conn:
+            count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            while count > self.max_entries or size > self.max_bytes:
+                # drop a tenth of the entries at a time, there is no point in evicting row by row.
+                n = max(count // 10, count - self.max_entries, 1)
+                conn.execute("DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY last_used LIMIT ?)", (n,))
+                removed += n
+                count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if removed:
+            logger.info(f"Evicted {removed} results from the result cache.")
+        return removed
+
+    def purge(self, strategy_name:Optional[str] = None, older_than:Optional[float] = None) -> int:
+        """
+        Removes the results of a strategy and/or the ones not used in the last older_than seconds, all of them if neither is given.
+        """
+        sql, params = "DELETE FROM results WHERE 1 = 1", []
+        if strategy_name:
+            sql += " AND strategy = ?"
+            params.append(strategy_name)
+        if older_than is not None:
+            sql += " AND last_used < ?"
+            params.append(time.time() - older_than)
+        with self.__connect() as conn:
+            removed = conn.execute(sql, params).rowcount
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        return removed
+
+    def summary(self) -> List[dict]:
+        """
+        Returns the number of results, their size and the last use per (strategy, metric).
+        """
+        with self.__connect() as conn:
+            rows = conn.execute("SELECT strategy, metric, COUNT(*), COUNT(DISTINCT version), SUM(size), MAX(last_used) FROM results GROUP BY strategy, metric ORDER BY strategy, metric").fetchall()
+        return [{"strategy": r[0], "metric": r[1], "entries": r[2], "versions": r[3], "bytes": r[4], "last_used": r[5]} for r in rows]
+
+    def stats(self) -> dict:
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits" : self.hits,
+                "misses" : self.misses,
+                "hit_rate" : round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+_cache : Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Returns the process wide result cache, None if it is disabled in the defaults.
+    """
+    global _cache
+    if not getattr(dflt_vals, "enabled", True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache_path = getattr(dflt_vals, "cache_file", ".result_cache.sqlite")
+                if not os.path.isabs(cache_path):
+                    cache_path = os.path.join(os.path.dirname(__file__), cache_path)
+                _cache = ResultCache(cache_path,
+                                     max_entries=getattr(dflt_vals, "max_entries", 200000),
+                                     max_mb=getattr(dflt_vals, "max_mb", 512),
+                                     uncached_strategies=getattr(dflt_vals, "uncached_strategies", []))
+    return _cache
@@ -0,0 +1,99 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .logger import get_logger
+from .utils_new import FileLoader
+
+logger = get_logger("sarvam_client")
+FileLoader._load_env_vars(__file__)
+dflt_vals = FileLoader._to_dot_dict(__file__, os.getenv("DEFAULT_VALUES_PATH"), simple=True, strat_name="sarvam_client")
+
+class SarvamClient:
+    """
+    Client of the Sarvam AI / ShieldGemma model service (GPU_URL) shared by the strategies.
+    The requests go over a keep-alive session with a connection pool, a timeout and retries on connection errors
+    and 5xx responses. The batch methods send the texts to the JSON batch endpoints of the service in chunks of
+    chunk_size, and fall back to the single text endpoints when the service does not have them (older deployments).
+    """
+
+    def __init__(self, base_url:str, timeout:float = 120, retries:int = 3, backoff:float = 0.5, pool_size:int = 16, chunk_size:int = 32):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.chunk_size = max(chunk_size, 1)
+        self.session = requests.Session()
+        # the model endpoints have no side effects, so the POST requests are safe to retry.
+        retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=backoff,
+                      status_forcelist=[502, 503, 504], allowed_methods=None, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.__batch_supported = True
+
+    def __post(self, path:str, **kwargs) -> requests.Response:
+        response = self.session.post(f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def __batched(self, path:str, key:str, payloads:List[dict], single_path:str, single_key:str) -> list:
+        results = []
+        for start in range(0, len(payloads), self.chunk_size):
+            chunk = payloads[start:start + self.chunk_size]
+            if self.__batch_supported:
+                try:
+                    results.extend(self.__post(path, json={"items": chunk}).json()[key])
+                    continue
+                except requests.HTTPError as e:
+                    if e.response is None or e.response.status_code not in (404, 405):
+                        raise
+                    logger.warning(f"The service at {self.base_url} has no {path} endpoint, falling back to {single_path}.")
+                    self.__batch_supported = False
+            results.extend(self.__post(single_path, params=payload).json()[single_key] for payload in chunk)
+        return results
+
+    def perplexity(self, texts:List[str]) -> List[float]:
+        return self.__batched("/perplexity_batch", "perplexity", [{"text": text} for text in texts], "/perplexity", "perplexity")
+
+    def slor(self, texts:List[str]) -> List[float]:
+        return self.__batched("/slor_batch", "SLOR", [{"text": text} for text in texts], "/slor", "SLOR")
+
+    def translate(self, items:List[Tuple[str, str]]) -> List[str]:
+        """
+        Translates the (input_text, target_language) pairs.
+        """
+        return self.__batched("/translate_batch", "translated",
+                              [{"input_text": text, "target_language": language} for text, language in items], "/translate", "translated")
+
+    def safety_eval(self, items:List[Tuple[str, str, str]]) -> List[float]:
+        """
+        Returns the violation scores of the (prompt, agent_response, metric_name) triples.
+        """
+        return self.__batched("/safety_eval_batch", "score",
+                              [{"prompt": prompt, "agent_response": response, "metric_name": metric} for prompt, response, metric in items], "/safety_eval", "score")
+
+    def hidden(self, text:str) -> List[float]:
+        return self.__post("/hidden", params={"text": text}).json()["hidden"]
+
+_clients : Dict[str, SarvamClient] = dict()
+_clients_lock = threading.Lock()
+
+def get_sarvam_client(base_url:Optional[str] = None) -> SarvamClient:
+    """
+    Returns the process wide client of the model service at base_url (GPU_URL by default), creating it on first use.
+    """
+    base_url = base_url or os.getenv("GPU_URL")
+    if not base_url:
+        raise ValueError("GPU_URL is not set in environment.")
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = SarvamClient(base_url,
+                                  timeout=getattr(dflt_vals, "timeout", 120),
+                                  retries=getattr(dflt_vals, "retries", 3),
+                                  backoff=getattr(dflt_vals, "backoff", 0.5),
+                                  pool_size=getattr(dflt_vals, "pool_size", 16),
+                                  chunk_size=getattr(dflt_vals, "chunk_size", 32))
+            _clients[base_url] = client
+    return client
@@ -0,0 +1,144 @@
+import os
+import gc
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from .logger import get_logger
+from .utils_new import FileLoader
+
+logger = get_logger("strategy_pool")
+FileLoader._load_env_vars(__file__)
+dflt_vals = FileLoader._to_dot_dict(__file__, os.getenv("DEFAULT_VALUES_PATH"), simple=True, strat_name="strategy_pool")
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def _resident_bytes() -> int:
+    if psutil is None:
+        return 0
+    return psutil.Process(os.getpid()).memory_info().rss
+
+class _PoolEntry:
+    def __init__(self, obj, resident_bytes:int, load_time:float):
+        self.obj = obj
+        self.resident_bytes = resident_bytes
+        self.load_time = load_time
+
+class StrategyPool:
+    """
+    Process wide pool of constructed strategy objects.
+    Strategies are keyed on (strategy name, metric name, config) so the heavy models behind them
+    are loaded once per process instead of once per conversation. The least recently used objects
+    are evicted when the resident memory attributed to the pool crosses the configured budget.
+    """
+
+    def __init__(self, max_resident_mb:Optional[float] = None, max_instances:Optional[int] = None):
+        self.max_resident_bytes = int((max_resident_mb if max_resident_mb is not None else getattr(dflt_vals, "max_resident_mb", 8192)) * 1024 * 1024)
+        self.max_instances = max_instances if max_instances is not None else getattr(dflt_vals, "max_instances", 32)
+        self.__entries : "OrderedDict[Tuple[str, str, str], _PoolEntry]" = OrderedDict()
+        self.__lock = threading.RLock()
+        self.__key_locks = dict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_time = 0.0
+
+    @staticmethod
+    def make_key(strategy_name:str, metric_name:Optional[str], config:Optional[dict] = None) -> Tuple[str, str, str]:
+        """
+        Builds the pool key. The config dict is hashed so that two strategies with the same name
+        but a different model configuration do not share an instance.
+        """
+        cfg = json.dumps(config or {}, sort_keys=True, default=str)
+        return (strategy_name, metric_name or "", hashlib.sha256(cfg.encode("utf-8")).hexdigest()[:16])
+
+    def get(self, key:Tuple[str, str, str], factory:Callable[[], object]):
+        """
+        Returns the pooled object for the key, constructing it through the factory on a miss.
+        Concurrent misses on the same key wait for a single construction.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry.obj
+            key_lock = self.__key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self.__lock:
+                entry = self.__entries.get(key)
+                if entry is not None:
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.obj
+                self.misses += 1
+
+            rss_before = _resident_bytes()
+            start = time.perf_counter()
+            obj = factory()
+            elapsed = time.perf_counter() - start
+            resident = max(_resident_bytes() - rss_before, 0)
+            logger.info(f"Loaded strategy {key[0]} (metric : {key[1]}) in {elapsed:.2f}s, resident : {resident / (1024 * 1024):.1f} MB")
+
+            with self.__lock:
+                self.load_time += elapsed
+                self.__entries[key] = _PoolEntry(obj, resident, elapsed)
+                self.__evict(keep=key)
+                self.__key_locks.pop(key, None)
+            return obj
+
+    def __evict(self, keep:Tuple[str, str, str]):
+        evicted = False
+        while len(self.__entries) > 1 and (self.resident_bytes > self.max_resident_bytes or len(self.__entries) > self.max_instances):
+            old_key = next(iter(self.__entries))
+            if old_key == keep:
+                break
+            entry = self.__entries.pop(old_key)
+            logger.info(f"Evicting strategy {old_key[0]} (metric : {old_key[1]}), releasing ~{entry.resident_bytes / (1024 * 1024):.1f} MB")
+            del entry
+            self.evictions += 1
+            evicted = True
+        if evicted:
+            gc.collect()
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(e.resident_bytes for e in self.__entries.values())
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+        gc.collect()
+
+    def stats(self) -> dict:
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                "size" : len(self.__entries),
+                "hits" : self.hits,
+                "misses" : self.misses,
+                "hit_rate" : round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions" : self.evictions,
+                "load_time_s" : round(self.load_time, 3),
+                "resident_mb" : round(self.resident_bytes / (1024 * 1024), 1),
+            }
+
+_pool : Optional[StrategyPool] = None
+_pool_lock = threading.Lock()
+
+def get_strategy_pool() -> StrategyPool:
+    """
+    Returns the process wide strategy pool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = StrategyPool()
+    return _pool
@@ -1,4 +1,5 @@
 import torch
+from typing import List, Tuple
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
 from lib.data import TestCase, Conversation
 from .utils_new import FileLoader, OllamaConnect
@@ -50,4 +51,12 @@ class ContentFiltering(Strategy):
         else: 
             return 1, self.reason_for_score(conversation.agent_response, 1, result=result)
 
-
+    def evaluate_batch(self, items:List[Tuple[TestCase, Conversation]]):
+        logger.info(f"Evaluating Efficacy of Content Filtering for a batch of {len(items)} responses...")
+        responses = [conversation.agent_response for _, conversation in items]
+        results = self.classifier(responses, batch_size=len(responses))
+        scores = []
+        for response, result in zip(responses, results):
+            score = 0 if result['label'] == "LABEL_0" else 1
+            scores.append((score, self.reason_for_score(response, score, result=result)))
+        return scores
@@ -5,11 +5,12 @@ import warnings
 import os
 import nltk
 from typing import List, Tuple
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
 from lib.data import TestCase, Conversation
 from .strategy_base import Strategy
 from .logger import get_logger
 from .utils_new import FileLoader, OllamaConnect
+from ._embedding_service import get_embedding_service
 
 try:
     from nltk.corpus import wordnet
@@ -27,7 +28,7 @@ class EntityRecognition(Strategy):
     def __init__(self, name: str = "entity_recognition", **kwargs) -> None:
         super().__init__(name, kwargs=kwargs)
         self.lemm = WordNetLemmatizer()
-        self.model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        self.model = 'sentence-transformers/all-MiniLM-L6-v2'
 
     def extract_entity_pairs(self, text: str) -> List[Tuple[str, str]]:
         """
@@ -97,7 +98,7 @@ class EntityRecognition(Strategy):
         if w1 == w2:
             return 1
         words = [w1, w2]
-        embeddings = self.model.encode(words, convert_to_tensor=True, normalize_embeddings=True)
+        embeddings = get_embedding_service().encode(self.model, words, convert_to_tensor=True, normalize_embeddings=True)
         similarity = util.cos_sim(embeddings, embeddings).detach()[0][1].item()
         return similarity
         
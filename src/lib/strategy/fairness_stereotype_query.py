@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List, Tuple
 from tqdm import tqdm
 import os
 from transformers.pipelines import pipeline
@@ -90,6 +90,26 @@ class Fairness_Stereotype_Query(Strategy):
         eval_res = self.model_evaluate([{"res":agent_response}])
         return RtA(eval_res)
 
+    def stereotype_query_detection_batch(self, agent_responses: List[str]) -> List[float]:
+        """
+        Detects stereotypes in several agent responses, classifying them as padded batches.
+        """
+        data = [{"res": response, "idx": i} for i, response in enumerate(agent_responses)]
+        eval_res = self.model_evaluate(data)
+        scores = [0.0] * len(agent_responses)
+        for item in eval_res:
+            scores[item["idx"]] = RtA([item])
+        return scores
+
+    def evaluate_batch(self, items:List[Tuple[TestCase, Conversation]]):
+        """
+        Evaluate a batch of agent responses for Fairness Stereotype Query.
+        """
+        responses = [conversation.agent_response for _, conversation in items]
+        scores = self.stereotype_query_detection_batch(responses)
+        logger.info(f"Fairness Stereotype Query Scores: {scores}")
+        return [(score, OllamaConnect.get_reason(response, " ".join(self.name.split("_")), score)) for response, score in zip(responses, scores)]
+
     def evaluate(self, testcase:TestCase, conversation:Conversation):
         """
         Evaluate the agents response for Fairness Stereotype Query.
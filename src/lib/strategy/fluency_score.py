@@ -1,22 +1,25 @@
 import numpy as np
-import requests
 import os
 import json
-import matplotlib.pyplot as plt
-import seaborn as sns
+import hashlib
 from scipy.stats import gaussian_kde
+from scipy.special import ndtr
 from .utils_new import FileLoader, OllamaConnect
+from ._sarvam_client import get_sarvam_client
 import warnings
 from lib.data import TestCase, Conversation
 from .strategy_base import Strategy
 from .logger import get_logger
 import math
+from typing import List, Optional, Tuple
 
 warnings.filterwarnings("ignore")
 
 FileLoader._load_env_vars(__file__)
 logger = get_logger("fluency_score")
 dflt_vals = FileLoader._to_dot_dict(__file__, os.getenv("DEFAULT_VALUES_PATH"), simple=True, strat_name="fluency_score")
+# bumped when the layout or the precision of the stored CDF tables changes, the older tables are rebuilt.
+TABLE_FORMAT = 2
 
 class IndianLanguageFluencyScorer(Strategy):
     def __init__(self, name:str="fluency_score", **kwargs):
@@ -26,19 +29,20 @@ class IndianLanguageFluencyScorer(Strategy):
         self.ex_dir = os.getenv("EXAMPLES_DIR")
         self.dist_file = dflt_vals.dist_file
         self.epsilon = dflt_vals.epsilon
+        self.grid_points = getattr(dflt_vals, "grid_points", 4096)
+        self.min_table_mass = getattr(dflt_vals, "min_table_mass", 1e-7)
+        self.__tables = None
+        self.__kdes = None
 
-    def run_examples(self):
-        if(not FileLoader._check_if_present(__file__, self.ex_dir, f"{self.dist_file}_{dflt_vals.type}.json")):
+    def run_examples(self, force:bool = False):
+        if(force or not FileLoader._check_if_present(__file__, self.ex_dir, f"{self.dist_file}_{dflt_vals.type}.json")):
             examples = FileLoader._load_file_content(__file__, self.ex_dir, strategy_name=self.name__)
             score_dist = {}
             if len(examples) > 0:
                 for k, v in examples.items():
-                    if(isinstance(v, list)):                        
-                        for para in v:
-                            if k in score_dist:
-                                score_dist[k].append(self.get_score(para["agent_response"], type=dflt_vals.type))
-                            else:
-                                score_dist[k] = [self.get_score(para["agent_response"], dflt_vals.type)]
+                    if(isinstance(v, list)):
+                        # the example paragraphs of a distribution are scored in one batch request.
+                        score_dist.setdefault(k, []).extend(self.get_scores([para["agent_response"] for para in v], dflt_vals.type))
                 FileLoader._save_values(__file__, score_dist, self.ex_dir, f"{self.dist_file}_{dflt_vals.type}.json")
             else:
                 logger.error("No examples to generate the distributions.")
@@ -47,15 +51,102 @@ class IndianLanguageFluencyScorer(Strategy):
         return score_dist
 
     def get_score(self, text:str, type:str):
+        return self.get_scores([text], type)[0]
+
+    def get_scores(self, texts:List[str], type:str) -> List[float]:
+        if len(texts) == 0:
+            return []
+        client = get_sarvam_client(self.gpu_url)
         if type == "perplexity":
-            response = requests.post(f"{self.gpu_url}/perplexity", params={"text" : text})
-            score = json.loads(response.content.decode('utf-8'))["perplexity"]
-        else:
-            response = requests.post(f"{self.gpu_url}/slor", params={"text" : text})
-            score = json.loads(response.content.decode('utf-8'))["SLOR"]
-        return score
+            return client.perplexity(texts)
+        return client.slor(texts)
     
+    def build_tables(self, ex_results:dict) -> dict:
+        """
+        Fits the KDE of each example distribution once and tabulates its CDF on a common grid.
+        The CDF of a gaussian KDE is the mean of the normal CDFs centred on the samples, so the table is exact at the grid points.
+        """
+        kdes = {k: gaussian_kde(v) for k, v in ex_results.items()}
+        samples = np.concatenate([np.asarray(v, dtype=np.float64) for v in ex_results.values()])
+        bandwidths = {k: math.sqrt(kde.covariance[0, 0]) for k, kde in kdes.items()}
+        # the grid covers the bulk of the probability mass, the tails beyond it are scored from the KDEs (see fluency_scores).
+        pad = 8 * max(bandwidths.values()) + self.epsilon
+        grid = np.linspace(samples.min() - pad, samples.max() + pad, self.grid_points)
+        cdf = {}
+        for k, kde in kdes.items():
+            values = ndtr((grid[:, None] - kde.dataset[0][None, :]) / bandwidths[k]) @ kde.weights
+            cdf[k] = values.tolist()
+        return {"source": self.__digest(ex_results), "type": dflt_vals.type, "format": TABLE_FORMAT, "grid": grid.tolist(), "cdf": cdf}
+
+    @staticmethod
+    def __digest(ex_results:dict) -> str:
+        return hashlib.sha256(json.dumps(ex_results, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def reference_tables(self, force:bool = False) -> Optional[Tuple[np.ndarray, List[np.ndarray]]]:
+        """
+        Returns the grid and the CDF tables of the (fluent, non fluent) distributions, None without examples for both.
+        The tables are stored next to the distributions and rebuilt when the distributions change.
+        """
+        if self.__tables is not None and not force:
+            return self.__tables
+        ex_results = self.run_examples(force=force)
+        if len(ex_results) != 2: # needs examples for both fluent and non fluent
+            return None
+        table_file = f"{self.dist_file}_{dflt_vals.type}_table.json"
+        table = None
+        if not force and FileLoader._check_if_present(__file__, self.ex_dir, table_file):
+            table = FileLoader._load_file_content(__file__, self.ex_dir, table_file)
+            if (table.get("source") != self.__digest(ex_results) or len(table.get("grid", [])) != self.grid_points
+                    or table.get("format") != TABLE_FORMAT):
+                logger.info(f"The reference tables are out of date, rebuilding {table_file}.")
+                table = None
+        if table is None:
+            table = self.build_tables(ex_results)
+            FileLoader._save_values(__file__, table, self.ex_dir, table_file)
+        # the order of the distributions is the order of the examples, fluent first.
+        self.__kdes = [gaussian_kde(v) for v in ex_results.values()]
+        self.__tables = (np.asarray(table["grid"]), [np.asarray(table["cdf"][k]) for k in ex_results.keys()])
+        return self.__tables
+
+    def reference_kdes(self) -> Optional[List[gaussian_kde]]:
+        """
+        Returns the KDEs of the (fluent, non fluent) distributions, None without examples for both.
+        """
+        if self.reference_tables() is None:
+            return None
+        return self.__kdes
+
+    def kde_mass(self, kde:gaussian_kde, score:float) -> float:
+        """
+        The probability mass of the KDE in [score - epsilon, score + epsilon], integrated from its density.
+        """
+        interval = np.linspace(score - self.epsilon, score + self.epsilon, 500)
+        return float(np.trapezoid(kde(interval), interval))
+
+    def fluency_scores(self, scores:List[float]) -> Optional[np.ndarray]:
+        """
+        Maps the perplexity / SLOR values to the likelihood of them being from the fluent distribution of the examples.
+        The probability mass of each distribution in [score - epsilon, score + epsilon] is interpolated from its CDF table.
+        Where either mass is below the resolution of the tables (min_table_mass), both are integrated from the KDEs instead,
+        the density ratio of the far tails is kept that way.
+        """
+        tables = self.reference_tables()
+        if tables is None:
+            return None
+        grid, cdfs = tables
+        scores = np.asarray(scores, dtype=np.float64)
+        probs = [np.interp(scores + self.epsilon, grid, cdf) - np.interp(scores - self.epsilon, grid, cdf) for cdf in cdfs]
+        for i in np.flatnonzero((probs[0] < self.min_table_mass) | (probs[1] < self.min_table_mass)):
+            for prob, kde in zip(probs, self.__kdes):
+                prob[i] = self.kde_mass(kde, scores[i])
+        # if the differnce is positive the value is closer to fluent dist than non fluent
+        log_ratio = np.log(np.maximum(probs[0], 1e-40)) - np.log(np.maximum(probs[1], 1e-40))
+        final_scores = 1 / (1 + np.exp(-log_ratio)) # sigmoid function for the difference in log values
+        return np.round(final_scores, 3)
+
     def save_res_as_img(self, results:dict, path_:str, file_name:str):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         if not os.path.exists(path_):
             os.mkdir(path_)
         for k , v in results.items():
@@ -85,31 +176,14 @@ class IndianLanguageFluencyScorer(Strategy):
                 case s if s < 0 or s > 1.0:
                     return ""
     
-    def evaluate(self, testcase:TestCase, conversation:Conversation, save_dist_img=True):
-        score = self.get_score(conversation.agent_response, dflt_vals.type)
-        ex_results = self.run_examples()
-        final_score = 0.0
-        rsn = ""
-        if(len(ex_results) == 2): # needs examples for both fluent and non fluent
-            probs = {}
-            for k, v in ex_results.items():
-                dist = gaussian_kde(v)
-                interval = np.linspace(score-self.epsilon, score+self.epsilon, 500)
-                dist_int = dist(interval) # kde applied to the interval
-                probs[k] = np.trapezoid(dist_int, interval)
-
-            if(save_dist_img):
-                file_name = f"{dflt_vals.type}_dist.png"
-                self.save_res_as_img(ex_results, os.path.join(os.path.dirname(__file__), os.getenv('IMAGES_DIR')), file_name)
-            
-            probs_as_lst = list(probs.values())
-            # if the differnce is positive the value is closer to fluent dist than non fluent
-            log_ratio = math.log(max(probs_as_lst[0], 1e-40)) - math.log(max(probs_as_lst[1], 1e-40))
-            final_score = 1 / (1 + math.exp(-log_ratio)) # sigmoid function for the difference in log values
-            logger.info(f"Fluency Score: {final_score}")
-            final_score = round(final_score, 3)
-            rsn = self.reason_for_score(conversation.agent_response, final_score)
-        else:
+    def evaluate_batch(self, items:List[Tuple[TestCase, Conversation]]) -> List[Tuple[float, str]]:
+        responses = [conversation.agent_response for _, conversation in items]
+        final_scores = self.fluency_scores(self.get_scores(responses, dflt_vals.type))
+        if final_scores is None:
             logger.error(f"Distributions not generated in the absence of examples. Add examples for {self.name} in data/examples. Returning a 0 score.")
-        return final_score, rsn
-        
\ No newline at end of file
+            return [(0.0, "") for _ in items]
+        logger.info(f"Fluency Scores: {final_scores.tolist()}")
+        return [(float(score), self.reason_for_score(response, float(score))) for response, score in zip(responses, final_scores)]
+
+    def evaluate(self, testcase:TestCase, conversation:Conversation):
+        return self.evaluate_batch([(testcase, conversation)])[0]
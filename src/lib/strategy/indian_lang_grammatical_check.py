@@ -1,7 +1,7 @@
-import requests
 import os 
 import warnings
-from typing import Optional
+import threading
+from typing import Optional, Tuple
 import numpy as np
 import Levenshtein
 import stanza
@@ -11,6 +11,7 @@ from lib.data import TestCase, Conversation
 from .strategy_base import Strategy
 from .logger import get_logger
 from .utils_new import FileLoader, OllamaConnect
+from ._sarvam_client import get_sarvam_client
 
 warnings.filterwarnings("ignore")
 
@@ -22,27 +23,40 @@ class IndianLangGrammaticalCheck(Strategy):
     def __init__(self, model=None, tokenizer=None, name="indian_lang_grammatical_check", **kwargs):
         super().__init__(name, **kwargs)
         self.gpu_url=os.getenv("GPU_URL")
-        self.nlp = None
+        # the instance is pooled and shared by the evaluation threads, the pipelines are kept per language
+        # and a pipeline parses one text at a time.
+        self.__pipelines = dict()
+        self.__pipelines_lock = threading.Lock()
 
         if not self.gpu_url:
             logger.warning("GPU_URL is not set in environment.")
         else:
             logger.info("GPU_URL is loaded from environment.")
     
-    def detect_lang(self, original:str, corrected:str):
+    def detect_lang(self, original:str, corrected:str) -> Optional[Tuple[stanza.Pipeline, threading.Lock]]:
+        """
+        Returns the stanza pipeline of the language of the original text with its lock, None if there is no parser for it.
+        """
         lang1, lang2 = detect(original), detect(corrected)
         try:
             assert(lang1 == lang2)
         except:
             logger.debug("The corrected language is not the same as the original. Scores might get affected.")
-        try:
-            self.nlp = stanza.Pipeline(lang1, processors="tokenize, pos, lemma, depparse")
-        except:
+        with self.__pipelines_lock:
+            if lang1 in self.__pipelines:
+                return self.__pipelines[lang1]
             try:
-                stanza.download(lang1)
-                self.nlp = stanza.Pipeline(lang1, processors="tokenize, pos, lemma, depparse")
+                nlp = stanza.Pipeline(lang1, processors="tokenize, pos, lemma, depparse")
             except:
-                logger.debug(f"Language parser not available for {lang1}. Defaulting to Levenshtein distance for score calculation.")
+                try:
+                    stanza.download(lang1)
+                    nlp = stanza.Pipeline(lang1, processors="tokenize, pos, lemma, depparse")
+                except:
+                    # not cached, the download is tried again on the next evaluation.
+                    logger.debug(f"Language parser not available for {lang1}. Defaulting to Levenshtein distance for score calculation.")
+                    return None
+            self.__pipelines[lang1] = (nlp, threading.Lock())
+            return self.__pipelines[lang1]
 
     def build_tree(self, sent):
         nodes = {word.id : Node(f"{word.text}/{word.upos}") for word in sent.words}
@@ -55,9 +69,11 @@ class IndianLangGrammaticalCheck(Strategy):
                 parent.addkid(nodes[word.id])
         return root
 
-    def get_parse_tree(self, text:str):
-        if(isinstance(self.nlp, stanza.Pipeline)):
-            doc = self.nlp(text)
+    def get_parse_tree(self, text:str, parser:Optional[Tuple[stanza.Pipeline, threading.Lock]]):
+        if parser is not None:
+            nlp, lock = parser
+            with lock:
+                doc = nlp(text)
             sentence = doc.sentences[0]
             return self.build_tree(sentence)
         else:
@@ -75,8 +91,8 @@ class IndianLangGrammaticalCheck(Strategy):
             return total
 
         # if(use_ted):
-        self.detect_lang(original, corrected)
-        ori_tree, corr_tree = self.get_parse_tree(original), self.get_parse_tree(corrected)
+        parser = self.detect_lang(original, corrected)
+        ori_tree, corr_tree = self.get_parse_tree(original, parser), self.get_parse_tree(corrected, parser)
         score_ted = None
         if(ori_tree is not None and corr_tree is not None):
             ted = simple_distance(ori_tree, corr_tree)
@@ -93,7 +109,7 @@ class IndianLangGrammaticalCheck(Strategy):
         return sim
     
     def embed(self, text:str):
-        response = np.array(requests.post(f"{self.gpu_url}/hidden", params={"text" : text}).json()["hidden"], dtype=np.float32)
+        response = np.array(get_sarvam_client(self.gpu_url).hidden(text), dtype=np.float32)
         return response
     
     def cosine(self, a, b):
@@ -1,7 +1,5 @@
 from typing import Optional
 from sentence_transformers.util import cos_sim
-from sentence_transformers import SentenceTransformer
-import requests
 import warnings
 import os
 from .utils import detect_text, google_lang_translate, language_detection
@@ -9,6 +7,8 @@ from lib.data import TestCase, Conversation
 from .strategy_base import Strategy
 from .logger import get_logger
 from .utils_new import FileLoader, OllamaConnect
+from ._embedding_service import get_embedding_service
+from ._sarvam_client import get_sarvam_client
 import asyncio
 
 warnings.filterwarnings("ignore")
@@ -22,7 +22,7 @@ class LanguageStrategies(Strategy):
         super().__init__(name, **kwargs)
         self.__strategy_name = name
         self.gpu_url=os.getenv("GPU_URL")
-        self.embedding_model = SentenceTransformer(dflt_vals.embed_model)
+        self.embedding_model = dflt_vals.embed_model
     
     def language_detect_langdetect(self, prompt: str, agent_response: str) -> float:
         """
@@ -50,16 +50,16 @@ class LanguageStrategies(Strategy):
         response_language = language_detection(agent_response)
         text_list = []
         if response_language !="en":
-            response_translated = requests.post(f"{self.gpu_url}/translate",params={"input_text": agent_response,"target_language": response_language})
+            response_translated = get_sarvam_client(self.gpu_url).translate([(agent_response, response_language)])[0]
         else:
             response_translated = agent_response
         expected_language = language_detection(expected_response)
         if expected_language != "en":
-            expected_response_translated = requests.post(f"{self.gpu_url}/translate",params={"input_text": expected_response,"target_language": expected_language})
+            expected_response_translated = get_sarvam_client(self.gpu_url).translate([(expected_response, expected_language)])[0]
         else:
             expected_response_translated = expected_response
         text_list = [response_translated, expected_response_translated]        
-        embeddings = self.embedding_model.encode(text_list)
+        embeddings = get_embedding_service().encode(self.embedding_model, text_list)
         similarity = cos_sim(embeddings[0], embeddings[1])
         if similarity>=0.75:
             logger.info("High language similarity detected.")
@@ -104,7 +104,7 @@ class LanguageStrategies(Strategy):
         else:
             expected_response_translated = expected_response
         text_list = [response_translated, expected_response_translated]        
-        embeddings = self.embedding_model.encode(text_list)
+        embeddings = get_embedding_service().encode(self.embedding_model, text_list)
         similarity = cos_sim(embeddings[0], embeddings[1])
         if similarity>=0.75:
             logger.info("High language similarity detected.")
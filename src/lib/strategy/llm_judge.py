@@ -14,6 +14,9 @@ logger = get_logger("llm_judge")
 dflt_vals = FileLoader._to_dot_dict(__file__, os.getenv("DEFAULT_VALUES_PATH"), simple=True, strat_name="llm_judge")
 
 class LLMJudgeStrategy(Strategy):
+    # evaluate keeps the GEval metrics and the reasons of the judge models on the instance.
+    poolable = False
+
     def __init__(self, name: str = "llm_judge", **kwargs) -> None:
         super().__init__(name=name)
         
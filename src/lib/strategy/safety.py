@@ -1,11 +1,11 @@
 import warnings
 import os
-import requests
-import json
 from lib.data import TestCase, Conversation
 from .strategy_base import Strategy
 from .logger import get_logger
 from .utils_new import FileLoader, OllamaConnect
+from ._sarvam_client import get_sarvam_client
+from typing import List, Tuple
 
 warnings.filterwarnings("ignore")
 
@@ -36,6 +36,19 @@ class SafetyStrategy(Strategy):
         else:
             logger.info("GPU_URL is loaded from environment.")
 
+    def safety_scores(self, items:List[Tuple[TestCase, Conversation]]) -> List[float]:
+        """
+        Gets the ShieldGemma violation scores of the (testcase, conversation) pairs from the model service in batch requests.
+        """
+        return get_sarvam_client(self.gpu_url).safety_eval([(testcase.prompt.user_prompt, conversation.agent_response, self.__metric_name) for testcase, conversation in items])
+
+    def evaluate_batch(self, items:List[Tuple[TestCase, Conversation]]) -> List[Tuple[float, str]]:
+        if str.lower(self.__metric_name) not in ("misuse", "jailbreak", "exaggerated_safety"):
+            raise ValueError(f"Unknown safety metric: {self.__metric_name}")
+        logger.info(f"Starting {self.__metric_name} evaluation of {len(items)} responses with ShieldGemma")
+        scores = self.safety_scores(items)
+        return [(score, OllamaConnect.get_reason(conversation.agent_response, " ".join(self.name.split("_")), score)) for (_, conversation), score in zip(items, scores)]
+
     def evaluate(self, testcase:TestCase, conversation:Conversation):
         """
         Dispatches to the appropriate safety metric based on the selected metric name.
@@ -50,23 +63,17 @@ class SafetyStrategy(Strategy):
         match str.lower(self.__metric_name):
             case "misuse":
                 logger.info("Starting misuse evaluation with ShieldGemma")
-                resp = requests.post(f"{self.gpu_url}/safety_eval",params={"prompt": testcase.prompt.user_prompt,"agent_response":conversation.agent_response,"metric_name": self.__metric_name})
-                json_str = resp.content.decode('utf-8')
-                data = json.loads(json_str)
+                data = {"score": self.safety_scores([(testcase, conversation)])[0]}
                 logger.info(f"Misuse Score: {data['score']:.4f}")
                 return data['score'], OllamaConnect.get_reason(conversation.agent_response, " ".join(self.name.split("_")), data['score'])
             case "jailbreak":
                 logger.info("Starting jailbreak evaluation with ShieldGemma")
-                resp = requests.post(f"{self.gpu_url}/safety_eval",params={"prompt": testcase.prompt.user_prompt,"agent_response":conversation.agent_response,"metric_name": self.__metric_name})
-                json_str = resp.content.decode('utf-8')
-                data = json.loads(json_str)
+                data = {"score": self.safety_scores([(testcase, conversation)])[0]}
                 logger.info(f"Jailbreak Score: {data['score']:.4f}")
                 return data['score'], OllamaConnect.get_reason(conversation.agent_response, " ".join(self.name.split("_")), data['score'])
             case "exaggerated_safety":
                 logger.info("Starting Exaggerated Safety evaluation with ShieldGemma")
-                resp = requests.post(f"{self.gpu_url}/safety_eval",params={"prompt": testcase.prompt.user_prompt,"agent_response":conversation.agent_response,"metric_name": self.__metric_name})
-                json_str = resp.content.decode('utf-8')
-                data = json.loads(json_str)
+                data = {"score": self.safety_scores([(testcase, conversation)])[0]}
                 logger.info(f"Exaggerated Safety Score: {data['score']:.4f}")
                 return data['score'], OllamaConnect.get_reason(conversation.agent_response, " ".join(self.name.split("_")), data['score'])
             case _:
@@ -6,7 +6,7 @@ import warnings
 from sentence_transformers.util import cos_sim
 from evaluate import load
 from .utils import BARTScorer
-from sentence_transformers import SentenceTransformer
+from ._embedding_service import get_embedding_service
 from lib.data import TestCase, Conversation
 from .strategy_base import Strategy
 from .logger import get_logger
@@ -103,8 +103,7 @@ class SimilarityMatchStrategy(Strategy):
         """
         Computes the cosine similarity between 2 sentences using sentence transformers embeddings.
         """
-        embedding_model = SentenceTransformer('sentence-transformers/distiluse-base-multilingual-cased-v1')
-        embeddings = embedding_model.encode([agent_response,expected_response])
+        embeddings = get_embedding_service().encode('sentence-transformers/distiluse-base-multilingual-cased-v1', [agent_response,expected_response])
         similarity = cos_sim(embeddings[0],embeddings[1])
         return similarity[0][0]
 
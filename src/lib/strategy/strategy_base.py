@@ -1,8 +1,32 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, List, Tuple
 from lib.data import TestCase, Conversation
+import threading
+
+# Set by the helpers which swallow an error of a model or an API call and carry on with a default value,
+# the result of such an evaluation is not a function of its inputs and must not be cached.
+_fallback = threading.local()
+
+def mark_fallback():
+    """
+    Flags the evaluation running on this thread as a fallback.
+    """
+    _fallback.flagged = True
+
+def reset_fallback():
+    _fallback.flagged = False
+
+def fell_back() -> bool:
+    """
+    Returns True if a fallback was flagged on this thread since the last reset_fallback.
+    """
+    return getattr(_fallback, "flagged", False)
 
 class Strategy(ABC):
+    # The instances are pooled process wide and shared by the evaluation threads (see StrategyImplementor.get_strategy).
+    # Strategies keeping per evaluation state on the instance set this to False, to get a new instance per evaluation.
+    poolable : bool = True
+
     def __init__(self, name:str, **kwargs) -> None:
         super().__init__()
         self.__name = name
@@ -28,4 +52,15 @@ class Strategy(ABC):
         0.0 means no match, 1.0 means perfect match.
         :return : also return the reason for the score.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def evaluate_batch(self, items:List[Tuple[Optional[TestCase], Optional[Conversation]]]) -> List[Tuple[float, str]]:
+        """
+        Evaluate a batch of agent responses.
+        Strategies backed by a transformer model override this to run a single padded forward pass over the batch,
+        the default implementation simply evaluates the items one after the other.
+
+        :param items: list of (testcase, conversation) pairs to be evaluated.
+        :return: list of (score, reason) tuples in the same order as the items.
+        """
+        return [self.evaluate(testcase, conversation) for testcase, conversation in items]
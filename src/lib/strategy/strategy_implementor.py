@@ -1,10 +1,10 @@
-from ._lazy_loader import LazyLoader
-from typing import Optional
+from ._lazy_loader import get_lazy_loader
+from typing import Optional, List, Tuple
 from .logger import get_logger
 from lib.data import TestCase, Conversation
-from .strategy_base import Strategy
-import re
-from itertools import combinations
+from .strategy_base import Strategy, reset_fallback, fell_back
+from ._strategy_pool import get_strategy_pool, StrategyPool
+from ._result_cache import get_result_cache, inputs_digest
 import traceback
 
 logger = get_logger("strategy_implementor")
@@ -13,7 +13,9 @@ class StrategyImplementor:
 
     def __init__(self, **kwargs):
         self.kwargs = kwargs
-        self.ll = LazyLoader()
+        self.ll = get_lazy_loader()
+        self.pool = get_strategy_pool()
+        self.result_cache = get_result_cache()
         self.strategy_name = None
         self.metric_name = None
     
@@ -30,9 +32,17 @@ class StrategyImplementor:
                 cls_name = self.find_class_name(self.strategy_name)
                 if cls_name is not None:
                     logger.debug(f"Class has been identified...")
-                    obj : Strategy = self.ll.get_class(cls_name)(name=self.strategy_name, metric_name = self.metric_name)
-                    logger.debug(f"Object has been created and evaluation is starting...")
+                    cache_key = self.result_cache_key(cls_name, testcase, conversation)
+                    cached = self.result_cache.get(self.strategy_name, self.metric_name, *cache_key) if cache_key else None
+                    if cached is not None:
+                        logger.info(f"Evaluation result found in the result cache...")
+                        return cached
+                    obj : Strategy = self.get_strategy(cls_name)
+                    logger.debug(f"Object has been fetched and evaluation is starting...")
+                    reset_fallback()
                     score, reason = obj.evaluate(testcase, conversation)
+                    if cache_key and not fell_back():
+                        self.result_cache.put(self.strategy_name, self.metric_name, *cache_key, score, reason)
                     logger.info(f"Evaluation is complete...")
                 else:
                     logger.error(f"The specified strategy name : {self.strategy_name} could not be found.")
@@ -41,13 +51,80 @@ class StrategyImplementor:
             # traceback.print_exc()
         return score, reason
     
+    def execute_batch(self, items:List[Tuple[Optional[TestCase], Optional[Conversation]]], batch_size:int = 16) -> List[Tuple[float, str]]:
+        """
+        Evaluates the (testcase, conversation) pairs in chunks of batch_size using the strategy's evaluate_batch.
+        If a chunk fails as a whole, its items are evaluated one by one so that a single bad item does not sink the rest.
+        """
+        results = [(0, "")] * len(items)
+        if not self.strategy_name:
+            return results
+        logger.info(f"Strategy name is : {self.strategy_name}, batch of {len(items)} items")
+        cls_name = self.find_class_name(self.strategy_name)
+        if cls_name is None:
+            logger.error(f"The specified strategy name : {self.strategy_name} could not be found.")
+            return results
+        # serve what we can from the result cache, only the misses are evaluated.
+        cache_keys = [self.result_cache_key(cls_name, testcase, conversation) for testcase, conversation in items]
+        misses = []
+        for i, cache_key in enumerate(cache_keys):
+            cached = self.result_cache.get(self.strategy_name, self.metric_name, *cache_key) if cache_key else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses.append(i)
+        if not misses:
+            logger.info(f"Evaluation results of all the {len(items)} items found in the result cache...")
+            return results
+        try:
+            obj : Strategy = self.get_strategy(cls_name)
+        except Exception as e:
+            logger.error(f"[ERROR] : {e}")
+            return results
+        for start in range(0, len(misses), max(batch_size, 1)):
+            idx = misses[start:start + max(batch_size, 1)]
+            chunk = [items[i] for i in idx]
+            try:
+                reset_fallback()
+                chunk_results = obj.evaluate_batch(chunk)
+                assert len(chunk_results) == len(chunk), "evaluate_batch returned a different number of results"
+                # a fallback can not be told apart per item, none of the chunk is cached then.
+                cacheable = not fell_back()
+                for i, (score, reason) in zip(idx, chunk_results):
+                    if cache_keys[i] and cacheable:
+                        self.result_cache.put(self.strategy_name, self.metric_name, *cache_keys[i], score, reason)
+            except Exception as e:
+                logger.error(f"[ERROR] : batch evaluation failed ({e}), falling back to single evaluation.")
+                chunk_results = [self.execute(testcase, conversation) for testcase, conversation in chunk]
+            for i, result in zip(idx, chunk_results):
+                results[i] = result
+        logger.info(f"Evaluation is complete...")
+        return results
+
+    def get_strategy(self, cls_name:str) -> Strategy:
+        """
+        Returns a pooled instance of the strategy class, so that the models behind it are loaded only once per process.
+        The strategies which are not poolable get a new instance on every call.
+        """
+        cls = self.ll.get_class(cls_name)
+        if not getattr(cls, "poolable", True):
+            return cls(name=self.strategy_name, metric_name=self.metric_name, **self.kwargs)
+        key = StrategyPool.make_key(self.strategy_name, self.metric_name, self.kwargs)
+        return self.pool.get(key, lambda: cls(name=self.strategy_name, metric_name=self.metric_name, **self.kwargs))
+
+    def result_cache_key(self, cls_name:str, testcase:Optional[TestCase], conversation:Optional[Conversation]) -> Optional[Tuple[str, str]]:
+        """
+        Returns the (strategy version, inputs digest) pair the result of the evaluation is cached under,
+        None if the result cache is disabled or the strategy is not cacheable.
+        """
+        if self.result_cache is None or not self.result_cache.cacheable(self.strategy_name):
+            return None
+        version = self.result_cache.version(self.ll.get_class(cls_name), self.strategy_name, self.kwargs)
+        return version, inputs_digest(testcase, conversation)
+
+    def pool_stats(self) -> dict:
+        return self.pool.stats()
+    
     # this is just in case , should be removable later
     def find_class_name(self, given_name:str):
-        words = re.split(r"[_]+", given_name)
-        for i in range(len(words), 0, -1):
-            for combo in combinations(words, i):
-                possible_name = "_".join(list(combo))
-                cls_name = self.ll.map_name_to_class(possible_name)
-                if cls_name:
-                    return cls_name
-        return None
\ No newline at end of file
+        return self.ll.resolve(given_name)
\ No newline at end of file
@@ -1,13 +1,13 @@
 import warnings
-from sentence_transformers import SentenceTransformer
 from sentence_transformers.util import cos_sim
-import requests
 import os
 from .utils import language_detection
 from lib.data import TestCase, Conversation
 from .strategy_base import Strategy
 from .logger import get_logger
 from .utils_new import FileLoader, OllamaConnect
+from ._embedding_service import get_embedding_service
+from ._sarvam_client import get_sarvam_client
 
 warnings.filterwarnings("ignore")
 
@@ -33,13 +33,12 @@ class TransliteratedStrategy(Strategy):
         """
         language = language_detection(text)
         if language == "en":
-            translated_language = requests.post(f"{self.gpu_url}/translate",params={"input_text": text,"target_language": language})
+            translated_language = get_sarvam_client(self.gpu_url).translate([(text, language)])[0]
             sentences = [translated_language, expected_response]
         else:
             sentences = [text, expected_response]
 
-        model = SentenceTransformer(dflt_vals.model_name)
-        embeddings = model.encode(sentences)
+        embeddings = get_embedding_service().encode(dflt_vals.model_name, sentences)
         similarity = cos_sim(embeddings[0], embeddings[1])
         logger.info("The text similarity is: %s",similarity[0][0].item()) 
         
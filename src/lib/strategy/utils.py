@@ -1,22 +1,11 @@
 import json
 import logging
 import warnings
-import requests
 from typing import Optional, List, Dict, Any, Type
 from langdetect import detect
-from googletrans import Translator
-from transformers import AutoModelForCausalLM, AutoTokenizer
-import json
-import torch
-import requests
 import asyncio
-from typing import Any, Dict, List, Type, Optional
 # from opik.evaluation.models import OpikBaseModel
-import torch
-import torch.nn as nn
 import traceback
-from transformers import BartTokenizer, BartForConditionalGeneration
-from typing import List
 import numpy as np
 import re
 from collections import defaultdict
@@ -25,6 +14,7 @@ import sys, os
 # setup the relative import path for data module.
 sys.path.append(os.path.join(os.path.dirname(__file__) + '/../'))  # Adjust the path to include the parent directory
 from lib.utils import get_logger
+from .strategy_base import mark_fallback
 
 logger = get_logger("utils_calls")
 
@@ -52,12 +42,15 @@ async def google_lang_translate(text: str, target_lang: str = "en") -> str:
     :param target_lang: The target language code (default is English)
     :return: The translated text in english
     """
+    from googletrans import Translator
+    from googletrans import Translator
     translator = Translator()
     try:
         translation = await translator.translate(text, dest=target_lang)
         return translation.text
     except Exception as e:
         logger.error(f"Error in translation: {e}")
+        mark_fallback()
         return text
         
 async def detect_text(text):
@@ -70,6 +63,7 @@ async def detect_text(text):
         return language.lang
     except Exception as e:
         logger.error(f"Error in language detection: {e}")
+        mark_fallback()
         return "unknown"
 
 
@@ -214,6 +208,9 @@ def extract_from_uds(txt):
     
 class BARTScorer:
     def __init__(self, device='cuda:0', max_length=1024, checkpoint='facebook/bart-large-cnn'):
+        # torch and transformers are imported here, the other helpers of this module do not need them.
+        import torch.nn as nn
+        from transformers import BartTokenizer, BartForConditionalGeneration
         # Set up model
         self.device = device
         self.max_length = max_length
@@ -230,10 +227,12 @@ class BARTScorer:
         """ Load model from paraphrase finetuning """
         if path is None:
             path = 'models/bart.pth'
+        import torch
         self.model.load_state_dict(torch.load(path, map_location=self.device))
 
     def score(self, srcs, tgts, batch_size=4):
         """ Score a batch of examples """
+        import torch
         score_list = []
         for i in range(0, len(srcs), batch_size):
             src_list = srcs[i: i + batch_size]
@@ -4,15 +4,20 @@ import json
 import ast
 import csv
 from .logger import get_logger
+from .strategy_base import mark_fallback
 from types import SimpleNamespace
 import hashlib
-from deepeval.metrics.g_eval.schema import Steps, ReasonScore
-from ollama import Client, AsyncClient
-from deepeval.models.base_model import DeepEvalBaseLLM
 from typing import Optional, List
 
 logger = get_logger("utils_new")
 
+def __getattr__(name:str):
+    # CustomOllamaModel derives from the deepeval model base class, deepeval is loaded only when it is asked for.
+    if name == "CustomOllamaModel":
+        from ._ollama_model import CustomOllamaModel
+        return CustomOllamaModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 class FileLoader:
     """
     run_file_path : should be the __file__
@@ -137,52 +142,6 @@ class FileLoader:
             writer.writerows(data.values())
         logger.info(f"Score and reason saved to : {file_path}")
 
-class CustomOllamaModel(DeepEvalBaseLLM):
-    def __init__(self, model_name : str, url : str, *args, **kwargs):
-        self.model_name = model_name
-        self.ollama_url = f"{url.rstrip()}"
-        self.ollama_client = Client(host=self.ollama_url)
-        self.score_reason = None
-        self.steps = None
-    
-    def generate(self, input : str, *args, **kwargs) -> str:
-        messages = [{"role": "user", "content": f'{input} /nothink'}] # nothink allows us to only get the final answer
-        response = self.ollama_client.chat(
-            model = self.model_name,
-            messages=messages,
-            format="json"
-        )
-        raw = json.loads(response.message.content)
-        schema_ =  kwargs.get("schema")(**raw) # the deepeval library uses different schemas to serialize the JSON, so we return the schemas as required by the library
-        if(kwargs.get("schema") is ReasonScore):
-            self.score_reason = {"Score": schema_.score, "Reason": schema_.reason}
-        if(kwargs.get("schema") is Steps):
-            self.steps = schema_.steps
-        return schema_ 
-    
-    def load_model(self, *args, **kwargs):
-        return None
-    
-    async def a_generate(self, input:str, *args, **kwargs):
-        client = AsyncClient(host=self.ollama_url)
-        messages = [{"role": "user", "content": f'{input} /nothink'}]
-        response = await client.chat(
-            model=self.model_name,
-            messages=messages,
-            format="json"
-        )
-        raw = json.loads(response.message.content)
-        schema_ =  kwargs.get("schema")(**raw)
-        if(kwargs.get("schema") is ReasonScore):
-            self.score_reason = {"Score": schema_.score, "Reason": schema_.reason}
-        if(kwargs.get("schema") is Steps):
-            self.steps = {"Steps" : schema_.steps}
-        return schema_
-    
-    def get_model_name(self, *args, **kwargs):
-        return self.model_name
-
-
 class OllamaConnect:
     
     FileLoader._load_env_vars(__file__)
@@ -191,6 +150,7 @@ class OllamaConnect:
 
     @staticmethod
     def prompt_model(text:str, fields:List[str], model_names:List[str] = None, options:dict = None) -> List[dict]:
+        from ollama import Client
         ollama_client = Client(host=OllamaConnect.ollama_url)
         tries = OllamaConnect.dflt_vals.n_tries
         resp_in_format = []
@@ -221,6 +181,8 @@ class OllamaConnect:
                 if(OllamaConnect.has_correct_format(final, fields)):
                     resp_in_format.append(final)
             tries -= 1
+        if not resp_in_format:
+            mark_fallback()
         return resp_in_format
     
     @staticmethod
@@ -231,8 +193,11 @@ class OllamaConnect:
         return correct
     
     @staticmethod
-    def get_reason(agent_response:str, strategy_name:str, score:float, **kwargs):
-        prompt = OllamaConnect.dflt_vals.reason_prompt.format(input_sent=agent_response, metric=strategy_name, score=score, add_info=kwargs.get("add_info", ""))
+    def generate_reason(agent_response:str, strategy_name:str, score:float, add_info:str = "") -> Optional[str]:
+        """
+        Queries the reasoning models for the explanation of the score, None if none of them answered properly.
+        """
+        prompt = OllamaConnect.dflt_vals.reason_prompt.format(input_sent=agent_response, metric=strategy_name, score=score, add_info=add_info)
         responses = OllamaConnect.prompt_model(prompt, OllamaConnect.dflt_vals.reqd_flds)
         final_rsn = ""
         if(len(responses) > 0):
@@ -244,5 +209,22 @@ class OllamaConnect:
                 else:
                     final_rsn += f"\n\n Reason {i+1} : {r}"
             return final_rsn
-        else:
-            return "Could not get a proper reasoning for the score."
\ No newline at end of file
+        return None
+
+    @staticmethod
+    def get_reason(agent_response:str, strategy_name:str, score:float, **kwargs):
+        """
+        Returns the reason of the score through the content addressed reason cache.
+        When the reasons are deferred, a pending token is returned and the reason is generated later by the reason queue.
+        """
+        from ._reason_queue import get_reason_queue
+        try:
+            reason = get_reason_queue().get_reason(agent_response, strategy_name, score, add_info=kwargs.get("add_info", ""))
+        except Exception:
+            # the strategies fall back to an empty reason
+            mark_fallback()
+            raise
+        if reason is None:
+            mark_fallback()
+            return "Could not get a proper reasoning for the score."
+        return reason
\ No newline at end of file
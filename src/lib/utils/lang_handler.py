@@ -3,7 +3,6 @@
 # Library utility to detect and translate text from one language to another using Google Translate API.
 
 from typing import Optional
-from googletrans import Translator
 import asyncio
 from iso639 import Language
 
@@ -14,6 +13,7 @@ def lang_translate(text: str, target_language: str = "en") -> str:
     :param target_language: The target language code (default is 'en' for English).
     :return: Translated text.
     """
+    from googletrans import Translator
     translator = Translator()
     translation = asyncio.run(translator.translate(text, dest=target_language))
     return translation.text
@@ -24,6 +24,7 @@ def lang_detect(text: str) -> str:
     :param text: The text whose language is to be detected.
     :return: Detected language code.
     """
+    from googletrans import Translator
     translator = Translator()
     detection = asyncio.run(translator.detect(text))
     return detection.lang